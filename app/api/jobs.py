@@ -0,0 +1,88 @@
+"""
+🧵 API de Trabajos en Background
+Estado, progreso (polling o SSE) y cancelación de trabajos encolados
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import Config
+from app.services.job_queue import get_job_queue, TERMINAL_STATES
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+async def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    try:
+        job = await get_job_queue().get(job_id)
+    except Exception as e:
+        logger.error(f"❌ Error obteniendo trabajo {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error obteniendo trabajo")
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
+@router.get("", response_model=List[Dict[str, Any]])
+async def list_jobs(
+    tipo: Optional[str] = Query(None, description="Filtrar por tipo de trabajo"),
+    limit: int = Query(20, ge=1, le=100, description="Número de trabajos")
+):
+    """Trabajos más recientes"""
+    try:
+        return await get_job_queue().list_recent(tipo=tipo, limit=limit)
+    except Exception as e:
+        logger.error(f"❌ Error listando trabajos: {e}")
+        raise HTTPException(status_code=500, detail="Error listando trabajos")
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Estado y progreso de un trabajo (polling)"""
+    return await _get_job_or_404(job_id)
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancelar un trabajo pendiente o en curso"""
+    await _get_job_or_404(job_id)
+    try:
+        return await get_job_queue().cancel(job_id)
+    except Exception as e:
+        logger.error(f"❌ Error cancelando trabajo {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error cancelando trabajo")
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Progreso de un trabajo como Server-Sent Events
+
+    Emite el trabajo cada vez que cambia su estado o progreso y cierra el
+    stream cuando llega a un estado final.
+    """
+    await _get_job_or_404(job_id)
+
+    async def stream():
+        last = None
+        while True:
+            try:
+                job = await get_job_queue().get(job_id)
+            except Exception as e:
+                logger.error(f"❌ Error consultando trabajo {job_id}: {e}")
+                job = None
+            if job:
+                snapshot = (job['estado'], json.dumps(job.get('progreso'), sort_keys=True))
+                if snapshot != last:
+                    last = snapshot
+                    yield f"data: {json.dumps(job, default=str)}\n\n"
+                    if job['estado'] in TERMINAL_STATES:
+                        return
+                    await asyncio.sleep(Config.JOBS_SSE_POLL_SECONDS)
+                    continue
+            # Sin cambios: comentario para mantener viva la conexión
+            yield ": ping\n\n"
+            await asyncio.sleep(Config.JOBS_SSE_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,36 @@
+"""
+🪝 API de Webhooks
+Notificaciones entrantes de Airtable
+"""
+
+import logging
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.services.airtable_webhook import get_airtable_webhook
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+@router.post("/airtable")
+async def airtable_notification(request: Request):
+    """
+    Notificación de un webhook de Airtable
+
+    Se valida la firma y se responde de inmediato; la lectura de payloads y
+    la sincronización de los registros cambiados corren en background.
+    """
+    receiver = get_airtable_webhook()
+    if not receiver.enabled:
+        raise HTTPException(status_code=404, detail="Webhook de Airtable no configurado")
+
+    body = (await request.body()).decode('utf-8', errors='replace')
+    try:
+        notification = receiver.verify(body, request.headers.get('X-Airtable-Content-MAC'))
+    except ValueError as e:
+        logger.warning(f"⚠️ Notificación de Airtable rechazada: {e}")
+        raise HTTPException(status_code=401, detail="Firma inválida")
+
+    receiver.notify(notification)
+    return Response(status_code=204)
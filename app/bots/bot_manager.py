@@ -2,6 +2,7 @@ from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQu
 from app.config import Config
 from app.bots.handlers.admin_handlers import AdminHandlers
 from app.bots.handlers.production_handlers import ProductionHandlers
+from app.services.conversation_logger import get_conversation_logger
 import logging
 import asyncio
 
@@ -95,6 +96,13 @@ class BotManager:
             
         except Exception as e:
             logger.error(f"Error deteniendo bots: {e}")
+        finally:
+            # Escribir los logs de conversación pendientes aunque algún bot
+            # no se haya detenido bien
+            try:
+                await get_conversation_logger().flush()
+            except Exception as e:
+                logger.error(f"Error escribiendo logs de conversación pendientes: {e}")
     
     async def run_bots(self):
         """Ejecutar bots en modo continuo"""
@@ -1,7 +1,7 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from app.security.auth import security
-from app.database.supabase import supabase
+from app.database.supabase import async_supabase
 from app.config import Config
 from app.decorators.conversation_logging import log_admin_conversation, log_admin_action, log_unauthorized_access
 import logging
@@ -98,7 +98,7 @@ class AdminHandlers:
             empresa_id = context.args[1]
             
             # Verificar que la empresa existe
-            empresa = supabase.table('empresas').select('*').eq('id', empresa_id).execute()
+            empresa = await async_supabase.execute(async_supabase.table('empresas').select('*').eq('id', empresa_id))
             if not empresa.data:
                 await update.message.reply_text(
                     f"❌ *Empresa no encontrada*\n\n"
@@ -109,15 +109,16 @@ class AdminHandlers:
                 return
             
             # Verificar si el usuario ya existe
-            usuario_existente = supabase.table('usuarios').select('*').eq('chat_id', user_chat_id).execute()
+            usuario_existente = await async_supabase.execute(async_supabase.table('usuarios').select('*').eq('chat_id', user_chat_id))
             
             if usuario_existente.data:
                 # Actualizar usuario existente
-                resultado = supabase.table('usuarios').update({
+                resultado = await async_supabase.execute(async_supabase.table('usuarios').update({
                     'empresa_id': empresa_id,
                     'activo': True,
                     'updated_at': 'now()'
-                }).eq('chat_id', user_chat_id).execute()
+                }).eq('chat_id', user_chat_id))
+                security.invalidate_user(user_chat_id)
                 
                 await update.message.reply_text(
                     f"✅ *Usuario actualizado exitosamente*\n\n"
@@ -128,7 +129,7 @@ class AdminHandlers:
                 )
             else:
                 # Intentar obtener información del usuario desde conversaciones previas
-                conversacion_reciente = supabase.table('conversaciones').select('usuario_nombre').eq('chat_id', user_chat_id).limit(1).execute()
+                conversacion_reciente = await async_supabase.execute(async_supabase.table('conversaciones').select('usuario_nombre').eq('chat_id', user_chat_id).limit(1))
                 
                 # Determinar nombre del usuario
                 if conversacion_reciente.data and conversacion_reciente.data[0].get('usuario_nombre'):
@@ -137,13 +138,14 @@ class AdminHandlers:
                     nombre_usuario = f'Usuario_{user_chat_id}'  # Nombre por defecto
                 
                 # Crear nuevo usuario
-                resultado = supabase.table('usuarios').insert({
+                resultado = await async_supabase.execute(async_supabase.table('usuarios').insert({
                     'chat_id': user_chat_id,
                     'empresa_id': empresa_id,
                     'activo': True,
                     'rol': 'user',
                     'nombre': nombre_usuario
-                }).execute()
+                }))
+                security.invalidate_user(user_chat_id)
                 
                 await update.message.reply_text(
                     f"✅ *Usuario creado exitosamente*\n\n"
@@ -285,7 +287,7 @@ class AdminHandlers:
     async def _show_empresas_list(query):
         """Mostrar lista de empresas"""
         try:
-            response = supabase.client.table('empresas').select('*').eq('activo', True).execute()
+            response = await async_supabase.execute(async_supabase.table('empresas').select('*').eq('activo', True))
             empresas = response.data
             
             if not empresas:
@@ -327,15 +329,15 @@ class AdminHandlers:
         """Mostrar estadísticas del sistema"""
         try:
             # Contar empresas
-            empresas_response = supabase.client.table('empresas').select('id', count='exact').eq('activo', True).execute()
+            empresas_response = await async_supabase.execute(async_supabase.table('empresas').select('id', count='exact').eq('activo', True))
             empresas_count = empresas_response.count if hasattr(empresas_response, 'count') else 0
             
             # Contar usuarios
-            usuarios_response = supabase.client.table('usuarios').select('id', count='exact').eq('activo', True).execute()
+            usuarios_response = await async_supabase.execute(async_supabase.table('usuarios').select('id', count='exact').eq('activo', True))
             usuarios_count = usuarios_response.count if hasattr(usuarios_response, 'count') else 0
             
             # Contar conversaciones
-            conv_response = supabase.client.table('conversaciones').select('id', count='exact').execute()
+            conv_response = await async_supabase.execute(async_supabase.table('conversaciones').select('id', count='exact'))
             conv_count = conv_response.count if hasattr(conv_response, 'count') else 0
             
             text = (
@@ -362,7 +364,7 @@ class AdminHandlers:
         
         try:
             # Obtener datos de la empresa
-            empresa_response = supabase.client.table('empresas').select('*').eq('id', empresa_id).execute()
+            empresa_response = await async_supabase.execute(async_supabase.table('empresas').select('*').eq('id', empresa_id))
             empresa = empresa_response.data[0] if empresa_response.data else None
             
             if not empresa:
@@ -370,7 +372,7 @@ class AdminHandlers:
                 return
             
             # Obtener usuarios de la empresa
-            usuarios_response = supabase.client.table('usuarios').select('*').eq('empresa_id', empresa_id).execute()
+            usuarios_response = await async_supabase.execute(async_supabase.table('usuarios').select('*').eq('empresa_id', empresa_id))
             usuarios = usuarios_response.data
             
             text = f"🏢 **{empresa['nombre']}**\n\n"
@@ -417,9 +419,12 @@ class AdminHandlers:
             admin_chat_id = int(args[-1])
             
             # Crear empresa
-            empresa_id = supabase.create_empresa(rut, nombre, admin_chat_id)
+            empresa_id = await async_supabase.create_empresa(rut, nombre, admin_chat_id)
             
             if empresa_id:
+                security.invalidate_empresa(empresa_id)
+                security.invalidate_user(admin_chat_id)
+                
                 await update.message.reply_text(
                     f"✅ **Empresa creada exitosamente**\n\n"
                     f"**Nombre:** {nombre}\n"
@@ -430,7 +435,7 @@ class AdminHandlers:
                 )
                 
                 # Log de seguridad
-                security.log_security_event(
+                await security.log_security_event(
                     chat_id, 
                     "empresa_creada", 
                     f"Empresa {nombre} (ID: {empresa_id}) creada"
@@ -498,7 +503,7 @@ class AdminHandlers:
     async def _list_empresas(query):
         """Listar empresas registradas"""
         try:
-            empresas = supabase.table('empresas').select('*').limit(10).execute()
+            empresas = await async_supabase.execute(async_supabase.table('empresas').select('*').limit(10))
             
             if not empresas.data:
                 await query.edit_message_text(
@@ -541,7 +546,7 @@ class AdminHandlers:
     async def _list_users(query):
         """Listar usuarios registrados"""
         try:
-            usuarios = supabase.table('usuarios').select('*, empresas(nombre)').limit(10).execute()
+            usuarios = await async_supabase.execute(async_supabase.table('usuarios').select('*, empresas(nombre)').limit(10))
             
             if not usuarios.data:
                 await query.edit_message_text("📋 *Lista de Usuarios*\n\n❌ No hay usuarios registrados", parse_mode='Markdown')
@@ -567,12 +572,12 @@ class AdminHandlers:
         try:
             from datetime import datetime
             
-            empresas_count = supabase.table('empresas').select('id', count='exact').execute()
-            usuarios_count = supabase.table('usuarios').select('id', count='exact').execute()
-            conversaciones_count = supabase.table('conversaciones').select('id', count='exact').execute()
+            empresas_count = await async_supabase.execute(async_supabase.table('empresas').select('id', count='exact'))
+            usuarios_count = await async_supabase.execute(async_supabase.table('usuarios').select('id', count='exact'))
+            conversaciones_count = await async_supabase.execute(async_supabase.table('conversaciones').select('id', count='exact'))
             
             hoy = datetime.now().date().isoformat()
-            conversaciones_hoy = supabase.table('conversaciones').select('id', count='exact').gte('created_at', hoy).execute()
+            conversaciones_hoy = await async_supabase.execute(async_supabase.table('conversaciones').select('id', count='exact').gte('created_at', hoy))
             
             texto = f"📈 *Estadísticas del Sistema*\n\n"
             texto += f"🏢 Empresas: {empresas_count.count}\n"
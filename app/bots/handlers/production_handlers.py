@@ -1,8 +1,9 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from app.security.auth import security
-from app.database.supabase import supabase
+from app.database.supabase import async_supabase
 from app.decorators.conversation_logging import log_production_conversation, log_unauthorized_access
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,10 +21,8 @@ class ProductionHandlers:
     @log_production_conversation
     async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando de inicio para el bot de producción"""
-        chat_id = update.effective_chat.id
-        
-        # Validar usuario
-        validation = security.validate_user(chat_id)
+        # Validar usuario (una sola vez por update, compartido con el logging)
+        validation = await security.validate_request(update, context)
         
         if not validation['valid']:
             # Registrar usuario no autorizado antes de responder
@@ -81,7 +80,7 @@ class ProductionHandlers:
         chat_id = update.effective_chat.id
         
         # Validar usuario en cada callback
-        validation = security.validate_user(chat_id)
+        validation = await security.validate_request(update, context)
         
         if not validation['valid']:
             await query.edit_message_text(validation['message'])
@@ -238,7 +237,7 @@ class ProductionHandlers:
             text += f"Período: {month_name} {year}\n\n"
             
             # Obtener reportes reales de la base de datos
-            reportes = supabase.get_reportes_mensuales(
+            reportes = await async_supabase.get_reportes_mensuales(
                 empresa_id=user_data['empresa_id'],
                 anio=int(year),
                 mes=int(month)
@@ -254,9 +253,11 @@ class ProductionHandlers:
                         text += f"  📝 {reporte['comentarios']}\n"
                     text += f"  📊 Estado: {reporte.get('estado', 'borrador')}\n\n"
                 
-                # Obtener archivos adjuntos
-                for reporte in reportes:
-                    archivos = supabase.get_archivos_reporte(reporte['id'])
+                # Obtener archivos adjuntos (en paralelo)
+                archivos_por_reporte = await asyncio.gather(
+                    *(async_supabase.get_archivos_reporte(reporte['id']) for reporte in reportes)
+                )
+                for reporte, archivos in zip(reportes, archivos_por_reporte):
                     if archivos:
                         text += f"📎 **Archivos de {reporte.get('titulo', 'reporte')}:**\n"
                         for archivo in archivos:
@@ -348,7 +349,7 @@ class ProductionHandlers:
             text += f"Empresa: **{user_data.get('empresa_nombre', 'N/A')}**\n\n"
             
             # Obtener información real de la base de datos
-            info_compania = supabase.get_info_compania(
+            info_compania = await async_supabase.get_info_compania(
                 empresa_id=user_data['empresa_id'],
                 categoria=categoria
             )
@@ -363,9 +364,11 @@ class ProductionHandlers:
                         text += f"  {info['contenido']}\n"
                     text += "\n"
                 
-                # Obtener archivos adjuntos
-                for info in info_compania:
-                    archivos = supabase.get_archivos_info_compania(info['id'])
+                # Obtener archivos adjuntos (en paralelo)
+                archivos_por_info = await asyncio.gather(
+                    *(async_supabase.get_archivos_info_compania(info['id']) for info in info_compania)
+                )
+                for info, archivos in zip(info_compania, archivos_por_info):
                     if archivos:
                         text += f"📎 **Archivos de {info.get('titulo', 'información')}:**\n"
                         for archivo in archivos:
@@ -399,7 +402,7 @@ class ProductionHandlers:
         """Manejar opción de pendientes"""
         try:
             # Obtener pendientes de la empresa
-            pendientes = supabase.get_empresa_data(user_data['empresa_id'], 'pendientes')
+            pendientes = await async_supabase.get_empresa_data(user_data['empresa_id'], 'pendientes')
             
             text = "⏳ **Pendientes**\n\n"
             
@@ -428,8 +431,10 @@ class ProductionHandlers:
         """Manejar opción de CxC y CxP"""
         try:
             # Obtener datos de CxC y CxP de la empresa
-            cxc_data = supabase.get_empresa_data(user_data['empresa_id'], 'cuentas_cobrar')
-            cxp_data = supabase.get_empresa_data(user_data['empresa_id'], 'cuentas_pagar')
+            cxc_data, cxp_data = await asyncio.gather(
+                async_supabase.get_empresa_data(user_data['empresa_id'], 'cuentas_cobrar'),
+                async_supabase.get_empresa_data(user_data['empresa_id'], 'cuentas_pagar')
+            )
             
             text = "💰 **Cuentas por Cobrar y Pagar**\n\n"
             
@@ -520,11 +525,8 @@ class ProductionHandlers:
     @log_production_conversation
     async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Manejar mensajes de texto del bot de producción"""
-        chat_id = update.effective_chat.id
-        message_text = update.message.text
-        
-        # Validar usuario
-        validation = security.validate_user(chat_id)
+        # Validar usuario (una sola vez por update, compartido con el logging)
+        validation = await security.validate_request(update, context)
         
         if not validation['valid']:
             # Registrar usuario no autorizado antes de responder
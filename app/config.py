@@ -13,6 +13,34 @@ class Config:
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
     SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+    SUPABASE_MAX_CONCURRENCY = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "8"))
+    
+    # Pool HTTP compartido por los clientes Supabase
+    SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+    SUPABASE_POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+    SUPABASE_POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+    SUPABASE_POOL_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "30"))
+    SUPABASE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_CONNECT_TIMEOUT_SECONDS", "5"))
+    
+    # Índice de autorización en memoria
+    AUTH_INDEX_REFRESH_SECONDS = int(os.getenv("AUTH_INDEX_REFRESH_SECONDS", "60"))
+    AUTH_INDEX_NEGATIVE_TTL_SECONDS = int(os.getenv("AUTH_INDEX_NEGATIVE_TTL_SECONDS", "60"))
+    AUTH_INDEX_FULL_RELOAD_MINUTES = int(os.getenv("AUTH_INDEX_FULL_RELOAD_MINUTES", "30"))
+    
+    # Logging de conversaciones en lote
+    LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "1000"))
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "50"))
+    LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("LOG_FLUSH_INTERVAL_SECONDS", "2"))
+    LOG_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("LOG_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+    
+    # Dashboard: timeout por fuente de datos
+    DASHBOARD_SOURCE_TIMEOUT_SECONDS = float(os.getenv("DASHBOARD_SOURCE_TIMEOUT_SECONDS", "3"))
+    DASHBOARD_AIRTABLE_TIMEOUT_SECONDS = float(os.getenv("DASHBOARD_AIRTABLE_TIMEOUT_SECONDS", "5"))
+    DASHBOARD_REFRESH_SECONDS = int(os.getenv("DASHBOARD_REFRESH_SECONDS", "30"))
+    DASHBOARD_MAX_AGE_SECONDS = int(os.getenv("DASHBOARD_MAX_AGE_SECONDS", "60"))
+    DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+    DASHBOARD_MAX_PAGE_SIZE = int(os.getenv("DASHBOARD_MAX_PAGE_SIZE", "200"))
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -38,6 +66,37 @@ class Config:
     ENABLE_AUTO_SYNC = os.getenv("ENABLE_AUTO_SYNC", "true").lower() == "true"
     FILE_STORAGE_MODE = os.getenv("FILE_STORAGE_MODE", "url")
     MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+    FILE_STORAGE_PATH = os.getenv("FILE_STORAGE_PATH", "storage/archivos")
+    FILE_STORAGE_PUBLIC_URL = os.getenv("FILE_STORAGE_PUBLIC_URL", "/archivos")
+    FILE_STORAGE_BUCKET = os.getenv("FILE_STORAGE_BUCKET", "archivos")
+    FILE_MIRROR_CONCURRENCY = int(os.getenv("FILE_MIRROR_CONCURRENCY", "4"))
+    FILE_DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("FILE_DOWNLOAD_TIMEOUT_SECONDS", "60"))
+    DOCUMENT_CLASSIFICATION_FILE = os.getenv("DOCUMENT_CLASSIFICATION_FILE")
+    AIRTABLE_MIRROR_REFRESH_SECONDS = int(os.getenv("AIRTABLE_MIRROR_REFRESH_SECONDS", "60"))
+    AIRTABLE_MIRROR_FULL_REFRESH_MINUTES = int(os.getenv("AIRTABLE_MIRROR_FULL_REFRESH_MINUTES", "360"))
+    SYNC_JITTER_SECONDS = int(os.getenv("SYNC_JITTER_SECONDS", "60"))
+    SYNC_LOCK_TTL_SECONDS = int(os.getenv("SYNC_LOCK_TTL_SECONDS", "1800"))
+    SYNC_WATERMARK_OVERLAP_SECONDS = int(os.getenv("SYNC_WATERMARK_OVERLAP_SECONDS", "300"))
+    SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "50"))
+    SYNC_WRITE_WORKERS = int(os.getenv("SYNC_WRITE_WORKERS", "4"))
+    SYNC_PIPELINE_QUEUE_SIZE = int(os.getenv("SYNC_PIPELINE_QUEUE_SIZE", "4"))
+    AIRTABLE_REQUESTS_PER_SECOND = float(os.getenv("AIRTABLE_REQUESTS_PER_SECOND", "5"))
+    AIRTABLE_BATCH_RETRIES = int(os.getenv("AIRTABLE_BATCH_RETRIES", "3"))
+    
+    # Webhook de Airtable (sincronización por notificaciones)
+    AIRTABLE_WEBHOOK_ID = os.getenv("AIRTABLE_WEBHOOK_ID")
+    AIRTABLE_WEBHOOK_MAC_SECRET = os.getenv("AIRTABLE_WEBHOOK_MAC_SECRET")
+    WEBHOOK_COALESCE_SECONDS = float(os.getenv("WEBHOOK_COALESCE_SECONDS", "2"))
+    WEBHOOK_RETRY_SECONDS = float(os.getenv("WEBHOOK_RETRY_SECONDS", "30"))
+    
+    # Cola de trabajos en background
+    JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "5"))
+    JOBS_HEARTBEAT_SECONDS = float(os.getenv("JOBS_HEARTBEAT_SECONDS", "5"))
+    JOBS_STALE_SECONDS = int(os.getenv("JOBS_STALE_SECONDS", "120"))
+    JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    JOBS_RETRY_BACKOFF_SECONDS = int(os.getenv("JOBS_RETRY_BACKOFF_SECONDS", "30"))
+    JOBS_SSE_POLL_SECONDS = float(os.getenv("JOBS_SSE_POLL_SECONDS", "1"))
     
     # App Configuration
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -0,0 +1,192 @@
+"""
+Registro central de clientes Supabase para ACA 3.0
+Un cliente por rol (anon/service) sobre un único pool HTTP compartido
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+import httpx
+from supabase import Client
+from supabase.lib.client_options import SyncClientOptions
+from supafunc import SyncFunctionsClient
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+ROLE_ANON = "anon"
+ROLE_SERVICE = "service"
+
+class _PooledClient(Client):
+    """
+    Cliente Supabase en el que postgrest, storage, functions y auth tienen
+    cada uno su propio `httpx.Client`.
+
+    postgrest, storage3 y supafunc fijan `base_url` y headers sobre el
+    cliente HTTP que reciben: si compartieran uno, el primer acceso a
+    `.storage` dejaría las consultas a tablas apuntando a /storage/v1.
+    Lo que se comparte es el transporte (el pool de conexiones).
+    """
+
+    def __init__(self, supabase_url: str, supabase_key: str, new_http_client: Callable[[], httpx.Client]):
+        self._new_http_client = new_http_client
+        # El cliente de opciones solo lo usa auth (construido en __init__)
+        super().__init__(supabase_url, supabase_key, SyncClientOptions(httpx_client=new_http_client()))
+
+    @property
+    def postgrest(self):
+        if self._postgrest is None:
+            self._postgrest = self._init_postgrest_client(
+                rest_url=self.rest_url,
+                headers=self.options.headers,
+                schema=self.options.schema,
+                timeout=self.options.postgrest_client_timeout,
+                http_client=self._new_http_client()
+            )
+        return self._postgrest
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = self._init_storage_client(
+                storage_url=self.storage_url,
+                headers=self.options.headers,
+                http_client=self._new_http_client()
+            )
+        return self._storage
+
+    @property
+    def functions(self):
+        if self._functions is None:
+            self._functions = SyncFunctionsClient(
+                url=self.functions_url,
+                headers=self.options.headers,
+                http_client=self._new_http_client()
+            )
+        return self._functions
+
+class SupabaseClientRegistry:
+    """
+    Clientes Supabase por rol que comparten un mismo pool de conexiones.
+
+    Cada rol, y dentro de él cada sub-cliente (postgrest, storage,
+    functions, auth), tiene su propio `httpx.Client` con su URL base y los
+    headers apikey/Authorization del rol, pero todos usan el mismo
+    `httpx.HTTPTransport`, así que las conexiones keep-alive y las sesiones
+    TLS (HTTP/2 si está habilitado) se reutilizan entre roles.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Los sub-clientes se crean en su primer uso, fuera de self._lock
+        self._clients_lock = threading.Lock()
+        self._transport: httpx.HTTPTransport = None
+        self._http_clients: List[httpx.Client] = []
+        self._clients: Dict[str, Client] = {}
+
+    def _role_key(self, role: str) -> str:
+        """Obtener la key de Supabase correspondiente a un rol"""
+        if role == ROLE_ANON:
+            return Config.SUPABASE_KEY
+        if role == ROLE_SERVICE:
+            return Config.SUPABASE_SERVICE_KEY
+        raise ValueError(f"Rol de Supabase desconocido: {role}")
+
+    def _get_transport(self) -> httpx.HTTPTransport:
+        """Crear (una vez) el transporte con el pool compartido"""
+        if self._transport is None:
+            self._transport = httpx.HTTPTransport(
+                http2=Config.SUPABASE_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=Config.SUPABASE_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.SUPABASE_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=Config.SUPABASE_POOL_KEEPALIVE_EXPIRY_SECONDS
+                )
+            )
+        return self._transport
+
+    def _new_http_client(self) -> httpx.Client:
+        """Cliente HTTP sobre el transporte compartido"""
+        http_client = httpx.Client(
+            transport=self._get_transport(),
+            timeout=httpx.Timeout(
+                Config.SUPABASE_TIMEOUT_SECONDS,
+                connect=Config.SUPABASE_CONNECT_TIMEOUT_SECONDS
+            ),
+            follow_redirects=True
+        )
+        with self._clients_lock:
+            self._http_clients.append(http_client)
+        return http_client
+
+    def get_client(self, role: str = ROLE_ANON) -> Client:
+        """Obtener el cliente Supabase de un rol (se crea en el primer uso)"""
+        client = self._clients.get(role)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(role)
+            if client is None:
+                key = self._role_key(role)
+                client = _PooledClient(Config.SUPABASE_URL, key, self._new_http_client)
+                self._clients[role] = client
+                logger.info(f"🔌 Cliente Supabase '{role}' creado sobre el pool compartido")
+        return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtener utilización del pool de conexiones"""
+        stats = {
+            "roles": sorted(self._clients.keys()),
+            "http2": Config.SUPABASE_HTTP2,
+            "max_connections": Config.SUPABASE_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": Config.SUPABASE_POOL_MAX_KEEPALIVE,
+            "connections": 0,
+            "active_connections": 0,
+            "idle_connections": 0,
+            "http2_connections": 0,
+            "pending_requests": 0,
+            "utilization": 0.0
+        }
+        if self._transport is None:
+            return stats
+
+        # httpcore no expone métricas públicas; se leen del pool subyacente
+        pool = self._transport._pool
+        connections = list(pool.connections)
+        active = sum(1 for connection in connections if not connection.is_idle())
+        stats.update({
+            "connections": len(connections),
+            "active_connections": active,
+            "idle_connections": len(connections) - active,
+            "http2_connections": sum(
+                1 for connection in connections
+                if "HTTP/2" in connection.info()
+            ),
+            "pending_requests": len(getattr(pool, "_requests", [])),
+            "utilization": round(active / Config.SUPABASE_POOL_MAX_CONNECTIONS, 4)
+        })
+        return stats
+
+    def close(self):
+        """Cerrar los clientes y el pool compartido"""
+        with self._lock:
+            # Cerrar un cliente cierra el transporte compartido (idempotente)
+            with self._clients_lock:
+                http_clients = list(self._http_clients)
+                self._http_clients.clear()
+            for http_client in http_clients:
+                http_client.close()
+            if self._transport is not None:
+                self._transport.close()
+            self._clients.clear()
+            self._transport = None
+
+# Instancia global
+client_registry = SupabaseClientRegistry()
+
+def get_client_registry() -> SupabaseClientRegistry:
+    """Obtener registro de clientes Supabase"""
+    return client_registry
@@ -0,0 +1,93 @@
+"""
+Paginación por cursor (keyset) para ACA 3.0
+Páginas ordenadas por (timestamp, id) descendente sin OFFSET
+"""
+
+import base64
+import json
+import re
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import Config
+from app.database.supabase import async_supabase
+
+# Valores de timestamp aceptados en un cursor (se interpolan en el filtro)
+_TIMESTAMP_RE = re.compile(r'^[0-9T:.+\- Z]+$')
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Ajustar el tamaño de página a los límites configurados"""
+    if not limit or limit < 1:
+        return Config.DASHBOARD_PAGE_SIZE
+    return min(limit, Config.DASHBOARD_MAX_PAGE_SIZE)
+
+def encode_cursor(row: Dict[str, Any], order_column: str) -> str:
+    """Codificar la posición de una fila como cursor opaco"""
+    raw = json.dumps([row.get(order_column), row['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    """
+    Decodificar un cursor (el timestamp es None si la fila no lo tenía)
+
+    Raises:
+        ValueError: si el cursor no es válido
+    """
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if value is not None and (not isinstance(value, str) or not _TIMESTAMP_RE.match(value)):
+        raise ValueError("Cursor inválido")
+    try:
+        row_id = str(uuid.UUID(str(row_id)))
+    except ValueError:
+        raise ValueError("Cursor inválido")
+    return value, row_id
+
+async def fetch_page(query, order_column: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Ejecutar una consulta ya filtrada como página keyset
+
+    Ordena por (order_column, id) descendente, con las filas sin timestamp
+    al final, y continúa después del cursor con
+    `order_column < valor OR (order_column = valor AND id < id_cursor) OR order_column IS NULL`
+    (o `order_column IS NULL AND id < id_cursor` si el cursor está entre
+    las filas sin timestamp), de modo que el costo de cada página no depende
+    de su posición.
+
+    Args:
+        query: Consulta de postgrest con select y filtros aplicados
+        order_column: Columna de timestamp (creado_en / created_at)
+        cursor: Cursor devuelto por la página anterior
+        limit: Tamaño de página (se ajusta a DASHBOARD_MAX_PAGE_SIZE)
+
+    Returns:
+        {"items": [...], "next_cursor": str | None, "count": int | None}
+    """
+    page_size = clamp_page_size(limit)
+
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        if value is None:
+            query = query.is_(order_column, 'null').lt('id', row_id)
+        else:
+            query = query.or_(
+                f'{order_column}.lt."{value}",'
+                f'and({order_column}.eq."{value}",id.lt.{row_id}),'
+                f'{order_column}.is.null'
+            )
+
+    # Se pide una fila extra para saber si hay página siguiente
+    query = query.order(order_column, desc=True, nullsfirst=False).order('id', desc=True).limit(page_size + 1)
+    response = await async_supabase.execute(query)
+
+    rows = response.data or []
+    items = rows[:page_size]
+    next_cursor = encode_cursor(items[-1], order_column) if len(rows) > page_size else None
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "count": response.count
+    }
@@ -1,5 +1,9 @@
-from supabase import create_client, Client
+from supabase import Client
 from app.config import Config
+from app.database.client_registry import ROLE_ANON, get_client_registry
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,7 +19,7 @@ class SupabaseManager:
     
     def __init__(self):
         if self._client is None:
-            self._client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+            self._client = get_client_registry().get_client(ROLE_ANON)
     
     @property
     def client(self) -> Client:
@@ -197,9 +201,109 @@ class SupabaseManager:
             logger.error(f"Error agregando comentario al reporte: {e}")
             return None
 
+class AsyncSupabaseManager:
+    """
+    Versión asíncrona de SupabaseManager.
+
+    Las consultas de PostgREST se ejecutan en un pool de hilos acotado
+    (SUPABASE_MAX_CONCURRENCY), de modo que una consulta lenta no bloquea
+    el event loop compartido por los bots y el dashboard.
+    """
+    
+    def __init__(self, manager: SupabaseManager, max_concurrency: int = None):
+        self._manager = manager
+        self.max_concurrency = max_concurrency or Config.SUPABASE_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="supabase"
+        )
+    
+    @property
+    def client(self) -> Client:
+        return self._manager.client
+    
+    def table(self, table_name: str):
+        """Acceso directo a tablas (construir la consulta no hace I/O)"""
+        return self._manager.table(table_name)
+    
+    async def run(self, func, *args, **kwargs):
+        """Ejecutar una función bloqueante en el pool de Supabase"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+    
+    async def execute(self, query):
+        """Ejecutar una consulta de PostgREST sin bloquear el event loop"""
+        return await self.run(query.execute)
+    
+    async def get_user_by_chat_id(self, chat_id: int):
+        """Obtener usuario por chat_id con validación de seguridad"""
+        return await self.run(self._manager.get_user_by_chat_id, chat_id)
+    
+    async def log_conversation(self, chat_id: int, empresa_id: int, mensaje: str, respuesta: str, tipo: str = "user"):
+        """Registrar conversación en la base de datos"""
+        return await self.run(self._manager.log_conversation, chat_id, empresa_id, mensaje, respuesta, tipo)
+    
+    async def get_empresa_data(self, empresa_id: int, table_name: str):
+        """Obtener datos de una empresa específica con validación de seguridad"""
+        return await self.run(self._manager.get_empresa_data, empresa_id, table_name)
+    
+    async def create_empresa(self, rut: str, nombre: str, admin_chat_id: int):
+        """Crear nueva empresa desde el bot admin"""
+        return await self.run(self._manager.create_empresa, rut, nombre, admin_chat_id)
+    
+    async def get_reportes_mensuales(self, empresa_id, anio=None, mes=None):
+        """Obtener reportes mensuales de una empresa"""
+        return await self.run(self._manager.get_reportes_mensuales, empresa_id, anio, mes)
+    
+    async def get_archivos_reporte(self, reporte_id):
+        """Obtener archivos adjuntos de un reporte"""
+        return await self.run(self._manager.get_archivos_reporte, reporte_id)
+    
+    async def get_comentarios_reporte(self, reporte_id):
+        """Obtener comentarios de un reporte"""
+        return await self.run(self._manager.get_comentarios_reporte, reporte_id)
+    
+    async def get_info_compania(self, empresa_id, categoria=None):
+        """Obtener información de compañía por categoría"""
+        return await self.run(self._manager.get_info_compania, empresa_id, categoria)
+    
+    async def get_archivos_info_compania(self, info_id):
+        """Obtener archivos adjuntos de información de compañía"""
+        return await self.run(self._manager.get_archivos_info_compania, info_id)
+    
+    async def crear_reporte_mensual(self, empresa_id, anio, mes, tipo_reporte, titulo, descripcion=None, comentarios=None):
+        """Crear un nuevo reporte mensual"""
+        return await self.run(
+            self._manager.crear_reporte_mensual,
+            empresa_id, anio, mes, tipo_reporte, titulo, descripcion, comentarios
+        )
+    
+    async def agregar_archivo_reporte(self, reporte_id, nombre_archivo, tipo_archivo, url_archivo, descripcion=None):
+        """Agregar archivo adjunto a un reporte"""
+        return await self.run(
+            self._manager.agregar_archivo_reporte,
+            reporte_id, nombre_archivo, tipo_archivo, url_archivo, descripcion
+        )
+    
+    async def agregar_comentario_reporte(self, reporte_id, usuario_id, comentario, tipo_comentario='general'):
+        """Agregar comentario a un reporte"""
+        return await self.run(
+            self._manager.agregar_comentario_reporte,
+            reporte_id, usuario_id, comentario, tipo_comentario
+        )
+    
+    def shutdown(self):
+        """Liberar el pool de hilos"""
+        self._executor.shutdown(wait=False)
+
 # Instancia global
 supabase = SupabaseManager()
+async_supabase = AsyncSupabaseManager(supabase)
 
 def get_supabase_client() -> SupabaseManager:
     """Obtener instancia del cliente de Supabase"""
-    return supabase 
\ No newline at end of file
+    return supabase
+
+def get_async_supabase_client() -> AsyncSupabaseManager:
+    """Obtener instancia asíncrona del cliente de Supabase"""
+    return async_supabase 
\ No newline at end of file
@@ -4,7 +4,6 @@ Automatiza el registro de todas las interacciones con los bots
 """
 
 import time
-import asyncio
 import logging
 from functools import wraps
 from typing import Callable, Any
@@ -12,9 +11,16 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from app.services.conversation_logger import get_conversation_logger
+from app.security.auth import security
+from app.security.request_context import RequestContext, get_request_context
 
 logger = logging.getLogger(__name__)
 
+async def _resolve_request(update: Update, context: ContextTypes.DEFAULT_TYPE) -> RequestContext:
+    """Obtener el contexto del update con la validación resuelta una sola vez"""
+    await security.validate_request(update, context)
+    return get_request_context(update, context)
+
 def log_conversation(bot_type: str = "production"):
     """
     Decorator para registrar automáticamente conversaciones
@@ -66,17 +72,20 @@ def log_conversation(bot_type: str = "production"):
                 # Calcular tiempo de respuesta
                 response_time_ms = int((time.time() - start_time) * 1000)
                 
-                # Registrar conversación en background
-                asyncio.create_task(
-                    conversation_logger.log_message(
-                        update=update,
-                        response_text=response_text,
-                        bot_type=bot_type,
-                        command=command,
-                        parameters=parameters,
-                        response_time_ms=response_time_ms,
-                        error=error_message
-                    )
+                # Reutilizar la validación hecha por el handler (o resolverla ahora)
+                request = await _resolve_request(update, context)
+                
+                # Encolar conversación (se escribe en lote en background)
+                await conversation_logger.log_message(
+                    update=update,
+                    response_text=response_text,
+                    bot_type=bot_type,
+                    command=command,
+                    parameters=parameters,
+                    response_time_ms=response_time_ms,
+                    error=error_message,
+                    has_access=request.has_access,
+                    empresa_id=request.empresa_id
                 )
         
         return wrapper
@@ -96,11 +105,10 @@ def log_admin_action(action: str):
             conversation_logger = get_conversation_logger()
             
             try:
-                # Verificar que sea usuario autorizado
-                chat_id = update.effective_chat.id
-                has_access = await conversation_logger._check_user_access(chat_id)
+                # Verificar que sea usuario autorizado (validación compartida del update)
+                request = await _resolve_request(update, context)
                 
-                if not has_access:
+                if not request.has_access:
                     # Registrar intento no autorizado
                     await conversation_logger.log_message(
                         update=update,
@@ -129,7 +137,8 @@ def log_admin_action(action: str):
                     bot_type="admin",
                     command=action,
                     response_time_ms=response_time_ms,
-                    has_access=True
+                    has_access=True,
+                    empresa_id=request.empresa_id
                 )
                 
                 return result
@@ -144,7 +153,8 @@ def log_admin_action(action: str):
                     command=action,
                     response_time_ms=response_time_ms,
                     error=str(e),
-                    has_access=True
+                    has_access=True,
+                    empresa_id=get_request_context(update, context).empresa_id
                 )
                 
                 # Re-lanzar excepción
@@ -1,21 +1,36 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 import uvicorn
 import asyncio
+import json
 import logging
+import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.config import Config
 from app.bots.bot_manager import bot_manager
 from app.utils.helpers import setup_logging
 from app.services.airtable_service import get_airtable_service
 from app.services.sync_service import get_sync_service
-from app.database.supabase import get_supabase_client
+from app.services.sync_scheduler import get_sync_scheduler, run_sync_job, SYNC_JOB_TYPE
+from app.services.job_queue import get_job_queue
+from app.services.stats_service import get_stats_service
+from app.services.dashboard_snapshot import DashboardSnapshot
+from app.services import dashboard_listings as listings
+from app.database.supabase import get_async_supabase_client
+from app.database.client_registry import get_client_registry
+from app.security.auth import security
+from app.services.conversation_logger import get_conversation_logger
 from app.api.conversation_logs import router as conversation_router
+from app.api.jobs import router as jobs_router
+from app.api.webhooks import router as webhooks_router
+from app.services.airtable_webhook import get_airtable_webhook
+from app.services.file_mirror import get_attachment_mirror
+from app.services.airtable_mirror import MAX_PAGE_SIZE, get_airtable_mirror
 
 # Configurar logging
 setup_logging()
@@ -32,6 +47,11 @@ app = FastAPI(
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Copias locales de adjuntos de Airtable (FILE_STORAGE_MODE=local)
+if get_attachment_mirror().mode == "local":
+    os.makedirs(Config.FILE_STORAGE_PATH, exist_ok=True)
+    app.mount("/archivos", StaticFiles(directory=Config.FILE_STORAGE_PATH), name="archivos")
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +63,8 @@ app.add_middleware(
 
 # Incluir routers de APIs
 app.include_router(conversation_router)
+app.include_router(jobs_router)
+app.include_router(webhooks_router)
 
 @app.on_event("startup")
 async def startup_event():
@@ -52,6 +74,24 @@ async def startup_event():
         Config.validate()
         logger.info("Configuración validada correctamente")
         
+        # Cargar índice de autorización y refrescarlo en background
+        await security.index.load()
+        security.index.start_refresher()
+        
+        # Snapshot del dashboard reconstruido en background
+        dashboard_snapshot.start_refresher()
+        
+        # Cola de trabajos en background (sincronización manual, etc.)
+        job_queue = get_job_queue()
+        job_queue.register(SYNC_JOB_TYPE, run_sync_job)
+        job_queue.start()
+        
+        # Espejo local de Airtable para listados y estadísticas
+        get_airtable_mirror().start_refresher()
+        
+        # Sincronización automática con Airtable (SYNC_INTERVAL_MINUTES)
+        get_sync_scheduler().start()
+        
         # Inicializar bots
         await bot_manager.initialize_bots()
         logger.info("Bots inicializados correctamente")
@@ -69,6 +109,15 @@ async def shutdown_event():
     """Evento de cierre de la aplicación"""
     try:
         await bot_manager.stop_bots()
+        await security.index.stop_refresher()
+        await dashboard_snapshot.stop_refresher()
+        await get_sync_scheduler().stop()
+        await get_airtable_webhook().stop()
+        await get_airtable_mirror().stop_refresher()
+        get_attachment_mirror().shutdown()
+        await get_job_queue().stop()
+        get_async_supabase_client().shutdown()
+        get_client_registry().close()
         logger.info("Aplicación cerrada correctamente")
     except Exception as e:
         logger.error(f"Error en shutdown: {e}")
@@ -123,7 +172,15 @@ async def get_status():
             "config": {
                 "environment": Config.ENVIRONMENT,
                 "debug": Config.DEBUG
-            }
+            },
+            "supabase_pool": get_client_registry().get_stats(),
+            "auth_index": security.index.get_stats(),
+            "dashboard_snapshot": dashboard_snapshot.get_stats(),
+            "jobs": get_job_queue().get_stats(),
+            "airtable_webhook": get_airtable_webhook().get_stats(),
+            "file_mirror": get_attachment_mirror().get_stats(),
+            "airtable_mirror": get_airtable_mirror().get_stats(),
+            "conversation_log": get_conversation_logger().writer.get_stats()
         }
     except Exception as e:
         logger.error(f"Error obteniendo estado: {e}")
@@ -142,25 +199,75 @@ async def airtable_status():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/airtable/records")
-async def get_airtable_records(empresa: str = None):
-    """Obtener registros de Airtable"""
+async def get_airtable_records(
+    empresa: str = None,
+    estado: str = None,
+    tipo: str = None,
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: Optional[str] = None,
+    stream: bool = False,
+    include_fields: bool = True
+):
+    """
+    Obtener registros de Airtable (desde el espejo local)
+
+    - Con `page_size` u `offset`: una página y el `offset` de la siguiente
+      (None en la última), igual que la API de Airtable
+    - Con `stream=true`: NDJSON, un registro por línea, escrito a medida que
+      se leen las páginas (para recorrer o exportar tablas grandes)
+    - `include_fields=false` omite la copia completa de los campos (`fields`)
+    """
+    mirror = get_airtable_mirror()
+    async_client = get_async_supabase_client()
+    filtros = {"empresa": empresa, "estado": estado, "tipo": tipo, "include_fields": include_fields}
+    size = page_size or (MAX_PAGE_SIZE if stream else 100)
     try:
-        airtable_service = get_airtable_service()
-        if empresa:
-            records = airtable_service.get_records_by_empresa(empresa)
-        else:
-            records = airtable_service.get_all_records()
-        return {"records": records, "count": len(records)}
+        if not (stream or page_size is not None or offset):
+            records = []
+            if mirror.enabled:
+                records = await async_client.run(mirror.query, **filtros)
+            return {"records": records, "count": len(records)}
+
+        # La primera página también valida el offset antes de responder
+        records, siguiente = [], None
+        if mirror.enabled:
+            records, siguiente = await async_client.run(
+                mirror.query_page, page_size=size, offset=offset, **filtros
+            )
+        if not stream:
+            return {"records": records, "count": len(records), "offset": siguiente}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error obteniendo registros: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def lines():
+        page, cursor = records, siguiente
+        try:
+            while True:
+                if page:
+                    yield "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in page)
+                if cursor is None:
+                    return
+                page, cursor = await async_client.run(
+                    mirror.query_page, page_size=size, offset=cursor, **filtros
+                )
+        except Exception as e:
+            # La respuesta ya empezó: el error va como última línea
+            logger.error(f"Error transmitiendo registros: {e}")
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @app.get("/airtable/pending")
 async def get_pending_records():
-    """Obtener registros pendientes de procesar"""
+    """Obtener registros pendientes de procesar (desde el espejo local)"""
     try:
-        airtable_service = get_airtable_service()
-        records = airtable_service.get_pending_records()
+        mirror = get_airtable_mirror()
+        records = []
+        if mirror.enabled:
+            records = await get_async_supabase_client().run(mirror.get_pending_records)
         return {"pending_records": records, "count": len(records)}
     except Exception as e:
         logger.error(f"Error obteniendo pendientes: {e}")
@@ -168,23 +275,45 @@ async def get_pending_records():
 
 @app.get("/airtable/statistics")
 async def get_airtable_statistics():
-    """Obtener estadísticas de Airtable"""
+    """Obtener estadísticas de Airtable (desde el espejo local)"""
     try:
-        airtable_service = get_airtable_service()
-        stats = airtable_service.get_statistics()
+        stats = await get_async_supabase_client().run(get_airtable_mirror().get_statistics)
         return stats
     except Exception as e:
         logger.error(f"Error obteniendo estadísticas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Endpoints de Sincronización
+async def _get_sync_statistics() -> Dict[str, Any]:
+    """Estadísticas de sincronización con el estado del programador"""
+    async_client = get_async_supabase_client()
+    stats, scheduler = await asyncio.gather(
+        async_client.run(get_sync_service().get_sync_statistics),
+        async_client.run(get_sync_scheduler().get_stats)
+    )
+    stats["scheduler"] = scheduler
+    last_run = scheduler.get("last_run")
+    stats["last_sync"] = last_run["finished_at"] if last_run else None
+    return stats
+
 @app.post("/sync/airtable")
-async def sync_from_airtable():
-    """Sincronizar registros desde Airtable a Supabase"""
+async def sync_from_airtable(full: bool = False, resume: bool = False):
+    """
+    Encolar una sincronización de Airtable a Supabase
+    
+    full=true fuerza resincronización completa; resume=true continúa la última
+    sincronización interrumpida desde la bitácora. Responde de inmediato con
+    el ID del trabajo; el progreso se consulta en /jobs/{id} o /jobs/{id}/events.
+    """
     try:
-        sync_service = get_sync_service()
-        result = sync_service.sync_from_airtable()
-        return result
+        job = await get_job_queue().enqueue(SYNC_JOB_TYPE, {'full': full, 'resume': resume})
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "message": "Sincronización encolada",
+            "job_id": job['id'],
+            "status_url": f"/jobs/{job['id']}",
+            "events_url": f"/jobs/{job['id']}/events"
+        })
     except Exception as e:
         logger.error(f"Error en sincronización: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -193,8 +322,7 @@ async def sync_from_airtable():
 async def get_sync_statistics():
     """Obtener estadísticas de sincronización"""
     try:
-        sync_service = get_sync_service()
-        stats = sync_service.get_sync_statistics()
+        stats = await _get_sync_statistics()
         return stats
     except Exception as e:
         logger.error(f"Error obteniendo estadísticas de sync: {e}")
@@ -202,39 +330,92 @@ async def get_sync_statistics():
 
 # ===================== DASHBOARD WEB ENDPOINTS =====================
 
+async def _fetch_dashboard_source(name: str, coro, default: Any, timeout: float = None):
+    """
+    Obtener una fuente del dashboard con timeout propio
+    
+    Returns:
+        (resultado, stale): si la fuente falla o tarda más del timeout se
+        devuelve el valor por defecto marcado como desactualizado
+    """
+    try:
+        result = await asyncio.wait_for(coro, timeout=timeout or Config.DASHBOARD_SOURCE_TIMEOUT_SECONDS)
+        return result, False
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ Fuente del dashboard '{name}' excedió el timeout")
+    except Exception as e:
+        logger.error(f"Error obteniendo fuente del dashboard '{name}': {e}")
+    return default, True
+
 async def get_dashboard_data() -> Dict[str, Any]:
     """Obtener todos los datos necesarios para el dashboard"""
     try:
-        supabase = get_supabase_client()
-        airtable = get_airtable_service()
-        sync_service = get_sync_service()
+        supabase = get_async_supabase_client()
+        airtable = get_airtable_mirror()
+        stats_service = get_stats_service()
+        
+        empty_stats = {'counts': {}, 'reportes_por_tipo': {}}
         
-        # Obtener estadísticas básicas
-        empresas = supabase.table('empresas').select('id').execute()
-        reportes = supabase.table('reportes_mensuales').select('id').execute()
-        archivos = supabase.table('archivos_reportes').select('id').execute()
+        async def supabase_stats():
+            result = await supabase.run(stats_service.get_stats)
+            if "error" in result:
+                # get_stats no lanza: el error se propaga para marcar la fuente
+                raise RuntimeError(result["error"])
+            return result
         
-        # Estadísticas de Airtable
-        airtable_stats = airtable.get_statistics() if airtable.enabled else {"total_records": 0}
+        async def airtable_statistics():
+            if not airtable.enabled:
+                return {"total_records": 0}
+            # Espejo local: una llamada RPC, sin consumir cuota de Airtable
+            result = await supabase.run(airtable.get_statistics)
+            if "error" in result:
+                # get_statistics no lanza: el error se propaga para marcar la fuente
+                raise RuntimeError(result["error"])
+            return result
         
-        # Estado de sincronización
-        sync_stats = sync_service.get_sync_statistics()
+        # Fuentes independientes en paralelo: la latencia es la de la más lenta
+        (
+            (stats, stats_stale),
+            (airtable_stats, airtable_stale),
+            (reportes_recientes, reportes_stale),
+            (conversaciones_recientes, conversaciones_stale)
+        ) = await asyncio.gather(
+            _fetch_dashboard_source('supabase_stats', supabase_stats(), empty_stats),
+            _fetch_dashboard_source(
+                'airtable', airtable_statistics(), {"total_records": 0},
+                timeout=Config.DASHBOARD_AIRTABLE_TIMEOUT_SECONDS
+            ),
+            _fetch_dashboard_source(
+                'reportes_recientes',
+                supabase.execute(supabase.table('reportes_mensuales').select('*').order('creado_en', desc=True).limit(3)),
+                None
+            ),
+            _fetch_dashboard_source(
+                'conversaciones_recientes',
+                supabase.execute(supabase.table('vista_conversaciones_recientes').select('*').limit(3)),
+                None
+            )
+        )
         
-        # Datos para gráfico de reportes por tipo
-        reportes_data = supabase.table('reportes_mensuales').select('tipo_reporte').execute()
-        reportes_por_tipo = {}
-        for reporte in reportes_data.data:
-            tipo = reporte['tipo_reporte'] or 'Sin categoría'
-            reportes_por_tipo[tipo] = reportes_por_tipo.get(tipo, 0) + 1
+        counts = stats['counts']
+        reportes_por_tipo = stats['reportes_por_tipo']
         
-        # Actividad reciente (últimos reportes y conversaciones)
-        reportes_recientes = supabase.table('reportes_mensuales').select('*').order('creado_en', desc=True).limit(3).execute()
-        conversaciones_recientes = supabase.table('vista_conversaciones_recientes').select('*').limit(3).execute()
+        # Airtable deshabilitado también se muestra como sección sin datos
+        airtable_stale = airtable_stale or not airtable.enabled
+        
+        stale_sections = [
+            name for name, stale in (
+                ('supabase_stats', stats_stale),
+                ('airtable', airtable_stale),
+                ('reportes_recientes', reportes_stale),
+                ('conversaciones_recientes', conversaciones_stale)
+            ) if stale
+        ]
         
         recent_activity = []
         
         # Agregar reportes recientes
-        for reporte in reportes_recientes.data:
+        for reporte in reportes_recientes.data if reportes_recientes else []:
             recent_activity.append({
                 'title': reporte['titulo'] or 'Reporte sin título',
                 'description': f"Tipo: {reporte['tipo_reporte']} - Empresa: {reporte['empresa_id'][:8]}...",
@@ -244,7 +425,7 @@ async def get_dashboard_data() -> Dict[str, Any]:
             })
         
         # Agregar conversaciones recientes con chat_id
-        for conv in conversaciones_recientes.data:
+        for conv in conversaciones_recientes.data if conversaciones_recientes else []:
             estado_color = 'success' if conv['estado_usuario'] == 'Autorizado' else 'warning'
             recent_activity.append({
                 'title': f"💬 Conversación - {conv['usuario_nombre'] or 'Usuario'}",
@@ -259,21 +440,21 @@ async def get_dashboard_data() -> Dict[str, Any]:
         
         return {
             'stats': {
-                'empresas': len(empresas.data),
-                'reportes': len(reportes.data),
-                'archivos': len(archivos.data),
+                'empresas': counts.get('empresas', 0),
+                'reportes': counts.get('reportes_mensuales', 0),
+                'archivos': counts.get('archivos_reportes', 0),
                 'airtable': airtable_stats.get('total_records', 0)
             },
             'sync_status': {
-                'success': sync_stats.get('success', False),
-                'processed': sync_stats.get('supabase', {}).get('reportes_mensuales', 0),
+                'success': False,  # Placeholder
+                'processed': counts.get('reportes_mensuales', 0),
                 'failed': 0,  # Placeholder
                 'last_sync': datetime.now().strftime('%Y-%m-%d %H:%M')
             },
             'system_status': {
-                'healthy': True,
-                'supabase': True,
-                'airtable': airtable.enabled,
+                'healthy': not stats_stale,
+                'supabase': not stats_stale,
+                'airtable': airtable.enabled and not airtable_stale,
                 'telegram': True,  # Placeholder
                 'api': True
             },
@@ -281,7 +462,8 @@ async def get_dashboard_data() -> Dict[str, Any]:
                 'labels': list(reportes_por_tipo.keys()),
                 'data': list(reportes_por_tipo.values())
             },
-            'recent_activity': recent_activity
+            'recent_activity': recent_activity,
+            'stale_sections': stale_sections
         }
     except Exception as e:
         logger.error(f"Error obteniendo datos del dashboard: {e}")
@@ -290,9 +472,13 @@ async def get_dashboard_data() -> Dict[str, Any]:
             'sync_status': {'success': False, 'processed': 0, 'failed': 0, 'last_sync': 'Error'},
             'system_status': {'healthy': False, 'supabase': False, 'airtable': False, 'telegram': False, 'api': True},
             'reportes_chart_data': {'labels': [], 'data': []},
-            'recent_activity': []
+            'recent_activity': [],
+            'stale_sections': ['supabase_stats', 'airtable', 'reportes_recientes', 'conversaciones_recientes']
         }
 
+# Snapshot en memoria: las páginas no recalculan el dashboard en cada visita
+dashboard_snapshot = DashboardSnapshot(get_dashboard_data)
+
 @app.get("/", response_class=HTMLResponse)
 async def redirect_to_dashboard():
     """Redirigir la raíz al dashboard"""
@@ -311,7 +497,7 @@ async def redirect_to_dashboard():
 async def dashboard_main(request: Request):
     """Dashboard principal"""
     try:
-        data = await get_dashboard_data()
+        data = await dashboard_snapshot.get()
         return templates.TemplateResponse("dashboard.html", {
             "request": request,
             **data
@@ -320,58 +506,187 @@ async def dashboard_main(request: Request):
         logger.error(f"Error en dashboard principal: {e}")
         raise HTTPException(status_code=500, detail="Error cargando el dashboard")
 
+def _page_fragment(template_name: str, context: Dict[str, Any], page: Dict[str, Any]) -> Dict[str, Any]:
+    """Renderizar las filas de una página para agregarlas desde el navegador"""
+    return {
+        "html": templates.get_template(template_name).render(**context),
+        "next_cursor": page['next_cursor']
+    }
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    """Convertir un filtro de formulario (puede venir vacío) a entero"""
+    return int(value) if value and value.isdigit() else None
+
 @app.get("/dashboard/empresas", response_class=HTMLResponse)
-async def dashboard_empresas(request: Request):
-    """Vista de empresas"""
+async def dashboard_empresas(
+    request: Request,
+    estado: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Vista de empresas (primera página)"""
     try:
-        supabase = get_supabase_client()
-        empresas = supabase.table('empresas').select('*').execute()
+        page, summary = await asyncio.gather(
+            listings.get_empresas_page(limit=limit, estado=estado, q=q),
+            listings.get_empresas_summary()
+        )
         
         return templates.TemplateResponse("empresas.html", {
             "request": request,
-            "empresas": empresas.data
+            "empresas": page['items'],
+            "total": page['count'],
+            "next_cursor": page['next_cursor'],
+            "summary": summary,
+            "filters": {"estado": estado or '', "q": q or ''}
         })
     except Exception as e:
         logger.error(f"Error en dashboard de empresas: {e}")
         raise HTTPException(status_code=500, detail="Error cargando empresas")
 
+@app.get("/dashboard/empresas/page")
+async def dashboard_empresas_page(
+    cursor: str,
+    estado: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Página siguiente de empresas"""
+    try:
+        page = await listings.get_empresas_page(cursor=cursor, limit=limit, estado=estado, q=q)
+        return _page_fragment("partials/empresas_rows.html", {"empresas": page['items']}, page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error paginando empresas: {e}")
+        raise HTTPException(status_code=500, detail="Error cargando empresas")
+
 @app.get("/dashboard/reportes", response_class=HTMLResponse)
-async def dashboard_reportes(request: Request):
-    """Vista de reportes"""
+async def dashboard_reportes(
+    request: Request,
+    empresa: Optional[str] = None,
+    tipo: Optional[str] = None,
+    estado: Optional[str] = None,
+    anio: Optional[str] = None,
+    mes: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Vista de reportes (primera página)"""
     try:
-        supabase = get_supabase_client()
-        reportes = supabase.table('reportes_mensuales').select('*').order('creado_en', desc=True).execute()
+        page, summary = await asyncio.gather(
+            listings.get_reportes_page(
+                limit=limit, empresa=empresa, tipo=tipo, estado=estado,
+                anio=_optional_int(anio), mes=_optional_int(mes), q=q
+            ),
+            listings.get_reportes_summary()
+        )
         
         return templates.TemplateResponse("reportes.html", {
             "request": request,
-            "reportes": reportes.data
+            "reportes": page['items'],
+            "total": page['count'],
+            "next_cursor": page['next_cursor'],
+            "summary": summary,
+            "filters": {
+                "empresa": empresa or '', "tipo": tipo or '', "estado": estado or '',
+                "anio": anio or '', "mes": mes or '', "q": q or ''
+            }
         })
     except Exception as e:
         logger.error(f"Error en dashboard de reportes: {e}")
         raise HTTPException(status_code=500, detail="Error cargando reportes")
 
+@app.get("/dashboard/reportes/page")
+async def dashboard_reportes_page(
+    cursor: str,
+    empresa: Optional[str] = None,
+    tipo: Optional[str] = None,
+    estado: Optional[str] = None,
+    anio: Optional[str] = None,
+    mes: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Página siguiente de reportes"""
+    try:
+        page = await listings.get_reportes_page(
+            cursor=cursor, limit=limit, empresa=empresa, tipo=tipo, estado=estado,
+            anio=_optional_int(anio), mes=_optional_int(mes), q=q
+        )
+        return _page_fragment("partials/reportes_rows.html", {"reportes": page['items']}, page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error paginando reportes: {e}")
+        raise HTTPException(status_code=500, detail="Error cargando reportes")
+
 @app.get("/dashboard/archivos", response_class=HTMLResponse) 
-async def dashboard_archivos(request: Request):
-    """Vista de archivos"""
+async def dashboard_archivos(
+    request: Request,
+    reporte: Optional[str] = None,
+    tipo: Optional[str] = None,
+    estado: Optional[str] = None,
+    tamanio: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Vista de archivos (primera página)"""
     try:
-        supabase = get_supabase_client()
-        archivos = supabase.table('archivos_reportes').select('*').order('created_at', desc=True).execute()
+        page, summary = await asyncio.gather(
+            listings.get_archivos_page(
+                limit=limit, reporte=reporte, tipo=tipo, estado=estado, tamanio=tamanio, q=q
+            ),
+            listings.get_archivos_summary()
+        )
         
         return templates.TemplateResponse("archivos.html", {
             "request": request,
-            "archivos": archivos.data
+            "archivos": page['items'],
+            "total": page['count'],
+            "next_cursor": page['next_cursor'],
+            "summary": summary,
+            "filters": {
+                "reporte": reporte or '', "tipo": tipo or '', "estado": estado or '',
+                "tamanio": tamanio or '', "q": q or ''
+            }
         })
     except Exception as e:
         logger.error(f"Error en dashboard de archivos: {e}")
         raise HTTPException(status_code=500, detail="Error cargando archivos")
 
+@app.get("/dashboard/archivos/page")
+async def dashboard_archivos_page(
+    cursor: str,
+    reporte: Optional[str] = None,
+    tipo: Optional[str] = None,
+    estado: Optional[str] = None,
+    tamanio: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Página siguiente de archivos (filas de lista y tarjetas de grilla)"""
+    try:
+        page = await listings.get_archivos_page(
+            cursor=cursor, limit=limit, reporte=reporte, tipo=tipo, estado=estado, tamanio=tamanio, q=q
+        )
+        fragment = _page_fragment("partials/archivos_rows.html", {"archivos": page['items']}, page)
+        fragment["grid_html"] = templates.get_template("partials/archivos_cards.html").render(archivos=page['items'])
+        return fragment
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error paginando archivos: {e}")
+        raise HTTPException(status_code=500, detail="Error cargando archivos")
+
 @app.get("/dashboard/airtable", response_class=HTMLResponse)
 async def dashboard_airtable(request: Request):
     """Vista de Airtable"""
     try:
-        airtable = get_airtable_service()
-        records = airtable.get_all_records() if airtable.enabled else []
-        stats = airtable.get_statistics() if airtable.enabled else {}
+        airtable = get_airtable_mirror()
+        supabase = get_async_supabase_client()
+        records, stats = await asyncio.gather(
+            supabase.run(airtable.query), supabase.run(airtable.get_statistics)
+        ) if airtable.enabled else ([], {})
         
         return templates.TemplateResponse("airtable.html", {
             "request": request,
@@ -387,8 +702,7 @@ async def dashboard_airtable(request: Request):
 async def dashboard_sync(request: Request):
     """Vista de sincronización"""
     try:
-        sync_service = get_sync_service()
-        stats = sync_service.get_sync_statistics()
+        stats = await _get_sync_statistics()
         
         return templates.TemplateResponse("sync.html", {
             "request": request,
@@ -3,7 +3,9 @@ Módulo de autenticación y seguridad para ACA 3.0
 """
 
 import logging
-from app.database.supabase import supabase
+from app.database.supabase import async_supabase
+from app.security.auth_index import AuthIndex
+from app.security.request_context import get_request_context
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +16,35 @@ class SecurityManager:
         # Chat IDs de administradores - usar el ADMIN_CHAT_ID de la configuración
         from app.config import Config
         self.admin_chat_ids = [Config.ADMIN_CHAT_ID] if Config.ADMIN_CHAT_ID else [123456789]
+        # Índice en memoria chat_id → (usuario, empresa)
+        self.index = AuthIndex()
     
-    def validate_user(self, chat_id: int):
+    async def validate_user(self, chat_id: int):
         """Validar usuario y obtener sus datos"""
         try:
-            user = supabase.get_user_by_chat_id(chat_id)
+            cached = self.index.lookup(chat_id)
+            
+            if cached is not None:
+                user, empresa_data = cached
+            else:
+                # Consulta directa: un error se propaga y no se recuerda como
+                # "no registrado" (get_user_by_chat_id devuelve None en ambos casos)
+                usuarios = await async_supabase.execute(
+                    async_supabase.table('usuarios').select('*').eq('chat_id', chat_id).eq('activo', True)
+                )
+                user = usuarios.data[0] if usuarios.data else None
+                empresa_data = None
+                
+                if user:
+                    # Obtener datos de la empresa (desde el índice si ya está cargada)
+                    empresa_data = self.index.get_empresa(user['empresa_id'])
+                    if empresa_data is None:
+                        empresa = await async_supabase.execute(
+                            async_supabase.table('empresas').select('*').eq('id', user['empresa_id'])
+                        )
+                        empresa_data = empresa.data[0] if empresa.data else None
+                
+                self.index.store(chat_id, user, empresa_data)
             
             if not user:
                 return {
@@ -26,17 +52,12 @@ class SecurityManager:
                     'message': "❌ Usuario no registrado. Contacta al administrador para registrarte."
                 }
             
-            # Obtener datos de la empresa
-            empresa = supabase.client.table('empresas').select('*').eq('id', user['empresa_id']).execute()
-            
-            if not empresa.data:
+            if not empresa_data:
                 return {
                     'valid': False,
                     'message': "❌ Empresa no encontrada. Contacta al administrador."
                 }
             
-            empresa_data = empresa.data[0]
-            
             return {
                 'valid': True,
                 'user_data': {
@@ -57,11 +78,31 @@ class SecurityManager:
                 'message': "❌ Error de validación. Intenta nuevamente."
             }
     
+    async def validate_request(self, update, context):
+        """
+        Validar al usuario de un update una sola vez
+        
+        El resultado queda en el contexto del update, de modo que decoradores,
+        handlers y logger reutilizan la misma validación.
+        """
+        request = get_request_context(update, context)
+        if not request.validated:
+            request.validation = await self.validate_user(request.chat_id)
+        return request.validation
+    
+    def invalidate_user(self, chat_id: int):
+        """Invalidar la entrada de un usuario en el índice de autorización"""
+        self.index.invalidate_user(chat_id)
+    
+    def invalidate_empresa(self, empresa_id: str):
+        """Invalidar la entrada de una empresa en el índice de autorización"""
+        self.index.invalidate_empresa(empresa_id)
+    
     def is_admin(self, chat_id: int):
         """Verificar si el usuario es administrador"""
         return chat_id in self.admin_chat_ids
     
-    def log_security_event(self, chat_id: int, event_type: str, description: str):
+    async def log_security_event(self, chat_id: int, event_type: str, description: str):
         """Registrar evento de seguridad"""
         try:
             data = {
@@ -70,7 +111,7 @@ class SecurityManager:
                 'description': description,
                 'timestamp': 'now()'
             }
-            supabase.client.table('security_logs').insert(data).execute()
+            await async_supabase.execute(async_supabase.table('security_logs').insert(data))
         except Exception as e:
             logger.error(f"Error registrando evento de seguridad: {e}")
 
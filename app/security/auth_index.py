@@ -0,0 +1,199 @@
+"""
+Índice de autorización en memoria para ACA 3.0
+chat_id → (usuario, empresa) para validar usuarios sin consultar Supabase
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import Config
+from app.database.supabase import async_supabase
+
+logger = logging.getLogger(__name__)
+
+class AuthIndex:
+    """
+    Índice local de usuarios activos y sus empresas.
+
+    Se carga completo al iniciar la aplicación y luego se refresca de forma
+    incremental usando `updated_at` de `usuarios` y `empresas`. Como el
+    refresco incremental no ve filas borradas, cada
+    AUTH_INDEX_FULL_RELOAD_MINUTES se vuelve a cargar completo. Los chat_id
+    no registrados se recuerdan por un tiempo corto para no consultar la base
+    de datos en cada mensaje de un usuario no autorizado.
+    """
+
+    def __init__(self, refresh_seconds: int = None, negative_ttl_seconds: int = None):
+        self.refresh_seconds = refresh_seconds or Config.AUTH_INDEX_REFRESH_SECONDS
+        self.negative_ttl_seconds = negative_ttl_seconds or Config.AUTH_INDEX_NEGATIVE_TTL_SECONDS
+        self.full_reload_seconds = Config.AUTH_INDEX_FULL_RELOAD_MINUTES * 60
+        self._loaded_at: Optional[float] = None
+        self._users: Dict[int, Dict[str, Any]] = {}
+        self._empresas: Dict[str, Dict[str, Any]] = {}
+        self._negative: Dict[int, float] = {}
+        self._users_watermark: Optional[str] = None
+        self._empresas_watermark: Optional[str] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.loaded = False
+        self.last_refresh: Optional[datetime] = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, chat_id: int) -> Optional[Tuple[Optional[Dict], Optional[Dict]]]:
+        """
+        Buscar un chat_id en el índice
+
+        Returns:
+            (usuario, empresa) si está indexado, (None, None) si se sabe que no
+            está registrado, o None si hay que consultar la base de datos
+        """
+        user = self._users.get(chat_id)
+        if user is not None:
+            self.hits += 1
+            return user, self._empresas.get(user['empresa_id'])
+
+        expires_at = self._negative.get(chat_id)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                self.hits += 1
+                return None, None
+            del self._negative[chat_id]
+
+        self.misses += 1
+        return None
+
+    def get_empresa(self, empresa_id: str) -> Optional[Dict[str, Any]]:
+        """Obtener una empresa indexada"""
+        return self._empresas.get(empresa_id)
+
+    def store(self, chat_id: int, user: Optional[Dict[str, Any]], empresa: Optional[Dict[str, Any]] = None):
+        """
+        Guardar el resultado de una consulta hecha tras un miss
+
+        `user=None` solo debe pasarse cuando la consulta respondió sin filas;
+        un error de la consulta no es una respuesta negativa.
+        """
+        if user is None:
+            self._negative[chat_id] = time.monotonic() + self.negative_ttl_seconds
+            return
+
+        self._negative.pop(chat_id, None)
+        self._users[chat_id] = user
+        if empresa is not None:
+            self._empresas[empresa['id']] = empresa
+
+    def invalidate_user(self, chat_id: int):
+        """Eliminar un chat_id del índice (se recarga en la siguiente validación)"""
+        self._users.pop(chat_id, None)
+        self._negative.pop(chat_id, None)
+
+    def invalidate_empresa(self, empresa_id: str):
+        """Eliminar una empresa del índice"""
+        self._empresas.pop(empresa_id, None)
+
+    async def load(self):
+        """Carga completa de usuarios activos y empresas"""
+        try:
+            usuarios, empresas = await asyncio.gather(
+                async_supabase.execute(async_supabase.table('usuarios').select('*').eq('activo', True)),
+                async_supabase.execute(async_supabase.table('empresas').select('*'))
+            )
+
+            self._users = {int(user['chat_id']): user for user in usuarios.data or []}
+            self._empresas = {empresa['id']: empresa for empresa in empresas.data or []}
+            self._negative.clear()
+            self._users_watermark = self._max_updated_at(usuarios.data)
+            self._empresas_watermark = self._max_updated_at(empresas.data)
+            self.loaded = True
+            self._loaded_at = time.monotonic()
+            self.last_refresh = datetime.now()
+
+            logger.info(f"🔐 Índice de autorización cargado: {len(self._users)} usuarios, {len(self._empresas)} empresas")
+        except Exception as e:
+            logger.error(f"Error cargando índice de autorización: {e}")
+
+    async def refresh(self):
+        """Refresco incremental: solo filas modificadas desde el último refresco"""
+        if not self.loaded or time.monotonic() - self._loaded_at >= self.full_reload_seconds:
+            # Carga completa: la inicial y la periódica que quita los borrados
+            await self.load()
+            return
+
+        try:
+            usuarios_query = async_supabase.table('usuarios').select('*')
+            if self._users_watermark:
+                usuarios_query = usuarios_query.gt('updated_at', self._users_watermark)
+            empresas_query = async_supabase.table('empresas').select('*')
+            if self._empresas_watermark:
+                empresas_query = empresas_query.gt('updated_at', self._empresas_watermark)
+
+            usuarios, empresas = await asyncio.gather(
+                async_supabase.execute(usuarios_query),
+                async_supabase.execute(empresas_query)
+            )
+
+            for user in usuarios.data or []:
+                chat_id = int(user['chat_id'])
+                self._negative.pop(chat_id, None)
+                if user.get('activo'):
+                    self._users[chat_id] = user
+                else:
+                    self._users.pop(chat_id, None)
+
+            for empresa in empresas.data or []:
+                self._empresas[empresa['id']] = empresa
+
+            self._users_watermark = self._max_updated_at(usuarios.data, self._users_watermark)
+            self._empresas_watermark = self._max_updated_at(empresas.data, self._empresas_watermark)
+            self.last_refresh = datetime.now()
+
+            if usuarios.data or empresas.data:
+                logger.info(f"🔐 Índice de autorización actualizado: {len(usuarios.data or [])} usuarios, {len(empresas.data or [])} empresas modificadas")
+        except Exception as e:
+            logger.error(f"Error refrescando índice de autorización: {e}")
+
+    async def _refresh_loop(self):
+        """Bucle de refresco periódico"""
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.refresh()
+
+    def start_refresher(self):
+        """Iniciar el refresco periódico en background"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop_refresher(self):
+        """Detener el refresco periódico"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtener estadísticas del índice"""
+        total = self.hits + self.misses
+        return {
+            "loaded": self.loaded,
+            "users": len(self._users),
+            "empresas": len(self._empresas),
+            "negative_entries": len(self._negative),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None
+        }
+
+    @staticmethod
+    def _max_updated_at(rows, current: Optional[str] = None) -> Optional[str]:
+        """Obtener el mayor updated_at de un conjunto de filas"""
+        values = [row['updated_at'] for row in rows or [] if row.get('updated_at')]
+        if current:
+            values.append(current)
+        return max(values) if values else None
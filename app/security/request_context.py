@@ -0,0 +1,52 @@
+"""
+Contexto por update de Telegram para ACA 3.0
+Guarda el resultado de la validación para que decoradores, handlers y
+logger lo compartan sin repetir la consulta de autorización
+"""
+
+from typing import Any, Dict, Optional
+from telegram import Update
+from telegram.ext import ContextTypes
+
+# Atributo donde se guarda el contexto (CallbackContext se crea una vez por update)
+REQUEST_CONTEXT_ATTR = "aca_request"
+
+class RequestContext:
+    """Estado compartido durante el procesamiento de un update"""
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.validation: Optional[Dict[str, Any]] = None
+
+    @property
+    def validated(self) -> bool:
+        """Si ya se resolvió la validación del usuario"""
+        return self.validation is not None
+
+    @property
+    def has_access(self) -> Optional[bool]:
+        """Acceso del usuario (None si todavía no se validó)"""
+        if self.validation is None:
+            return None
+        return self.validation['valid']
+
+    @property
+    def user_data(self) -> Optional[Dict[str, Any]]:
+        """Datos del usuario validado"""
+        if not self.has_access:
+            return None
+        return self.validation['user_data']
+
+    @property
+    def empresa_id(self) -> Optional[str]:
+        """Empresa del usuario validado"""
+        user_data = self.user_data
+        return user_data['empresa_id'] if user_data else None
+
+def get_request_context(update: Update, context: ContextTypes.DEFAULT_TYPE) -> RequestContext:
+    """Obtener (o crear) el contexto del update actual"""
+    request = getattr(context, REQUEST_CONTEXT_ATTR, None)
+    if request is None:
+        request = RequestContext(update.effective_chat.id)
+        setattr(context, REQUEST_CONTEXT_ATTR, request)
+    return request
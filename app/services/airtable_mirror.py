@@ -0,0 +1,359 @@
+"""
+🪞 Espejo de Airtable ACA 3.0
+Copia de la tabla de Airtable en Supabase para listados y estadísticas sin gastar cuota
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import re
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import Config
+from app.database.supabase import get_supabase_client
+from app.services.airtable_service import TABLE_FIELDS, get_airtable_service
+from app.services.sync_state import get_sync_state
+
+logger = logging.getLogger(__name__)
+
+# Filas por consulta al leer el espejo (límite habitual de PostgREST)
+MAX_PAGE_SIZE = 1000
+
+# Columnas del espejo sin la copia completa de los campos de Airtable
+_COLUMNS_SIN_CAMPOS = 'airtable_id, empresa, tipo_documento, estado, fecha_subida, comentarios, archivos, creado_en_airtable'
+
+# Formato de las partes de un cursor (se interpolan en el filtro de PostgREST)
+_RECORD_ID_RE = re.compile(r'^rec[A-Za-z0-9]{14}$')
+_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?([+-]\d{2}:\d{2}|Z)$')
+
+def _encode_offset(row: Dict[str, Any]) -> str:
+    """Cursor opaco con la clave de orden de la última fila entregada"""
+    clave = json.dumps([row['creado_en_airtable'], row['airtable_id']])
+    return base64.urlsafe_b64encode(clave.encode('utf-8')).decode('ascii')
+
+def _decode_offset(offset: str) -> Tuple[Optional[str], str]:
+    """
+    Raises:
+        ValueError: si el cursor no es uno emitido por query_page
+    """
+    try:
+        creado, airtable_id = json.loads(base64.urlsafe_b64decode(offset.encode('ascii')))
+    except Exception:
+        raise ValueError("offset inválido")
+    if not isinstance(airtable_id, str) or not _RECORD_ID_RE.match(airtable_id):
+        raise ValueError("offset inválido")
+    if creado is not None and not (isinstance(creado, str) and _TIMESTAMP_RE.match(creado)):
+        raise ValueError("offset inválido")
+    return creado, airtable_id
+
+class AirtableMirror:
+    """
+    Espejo de la tabla de Airtable en `airtable_registros`
+    (ver database/migrations/airtable_registros.sql).
+
+    Un refresher trae cada AIRTABLE_MIRROR_REFRESH_SECONDS solo los registros
+    modificados desde el refresco anterior (LAST_MODIFIED_TIME()). Cada
+    AIRTABLE_MIRROR_FULL_REFRESH_MINUTES se recorre la tabla completa y se
+    borran del espejo los registros que ya no existen en Airtable. Los
+    refrescos de distintos workers no se solapan (lock en Supabase).
+
+    Los endpoints de solo lectura consultan el espejo; a Airtable solo le
+    hablan este refresher y la sincronización.
+    """
+
+    TABLE = 'airtable_registros'
+    LOCK_NAME = 'airtable_mirror'
+    STATE_KEY = 'airtable_mirror'
+
+    def __init__(self):
+        self.airtable = get_airtable_service()
+        self.supabase = get_supabase_client()
+        self.state = get_sync_state()
+        self.refresh_seconds = Config.AIRTABLE_MIRROR_REFRESH_SECONDS
+        self.full_refresh_seconds = Config.AIRTABLE_MIRROR_FULL_REFRESH_MINUTES * 60
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+        self.last_refresh: Optional[Dict[str, Any]] = None
+        self.refreshes = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.airtable.enabled
+
+    # ===================== REFRESCO =====================
+
+    def _row(self, record: Dict[str, Any], seen_at: str) -> Dict[str, Any]:
+        """Fila del espejo para un registro en el formato de get_all_records"""
+        return {
+            'airtable_id': record['id'],
+            'empresa': record['empresa'],
+            'tipo_documento': record['tipo_documento'],
+            'estado': record['estado'] or 'Pendiente',
+            'fecha_subida': record['fecha_subida'],
+            'comentarios': record['comentarios'],
+            'archivos': record['archivos'],
+            'campos': record['fields'],
+            'creado_en_airtable': record['created_time'],
+            'actualizado_en': seen_at
+        }
+
+    def refresh(self, full: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Traer los cambios de Airtable al espejo
+
+        Args:
+            full: Recorrer toda la tabla aunque no toque la reconciliación
+
+        Returns:
+            Resumen del refresco, o None si otro worker lo está ejecutando
+
+        Raises:
+            Exception: si falla la lectura de Airtable o la escritura del espejo
+        """
+        acquired = self.state.try_lock(self.LOCK_NAME, self.owner, Config.SYNC_LOCK_TTL_SECONDS)
+        if acquired is False:
+            return None
+        try:
+            saved = self.state.get(self.STATE_KEY) or {}
+            started_at = datetime.now(timezone.utc)
+            full_at = datetime.fromisoformat(saved['full_at']) if saved.get('full_at') else None
+            if full_at is None or (started_at - full_at).total_seconds() >= self.full_refresh_seconds:
+                full = True
+            modified_since = None
+            if not full:
+                # Mismo margen que la sincronización por diferencias de reloj
+                modified_since = datetime.fromisoformat(saved['since']) - timedelta(
+                    seconds=Config.SYNC_WATERMARK_OVERLAP_SECONDS
+                )
+
+            seen_at = started_at.isoformat()
+            upserted = 0
+            for page in self.airtable.iterate_record_pages(modified_since, fields=list(TABLE_FIELDS)):
+                if page:
+                    self.supabase.table(self.TABLE).upsert(
+                        [self._row(record, seen_at) for record in page], on_conflict='airtable_id'
+                    ).execute()
+                    upserted += len(page)
+
+            deleted = 0
+            if full:
+                # Lo que este recorrido completo no vio ya no existe en Airtable
+                response = self.supabase.table(self.TABLE).delete().lt('actualizado_en', seen_at).execute()
+                deleted = len(response.data or [])
+
+            self.state.set(self.STATE_KEY, {
+                'since': seen_at,
+                'full_at': seen_at if full else saved.get('full_at')
+            })
+        finally:
+            if acquired:
+                self.state.unlock(self.LOCK_NAME, self.owner)
+
+        self.refreshes += 1
+        self.last_refresh = {
+            "at": seen_at,
+            "mode": "full" if full else "delta",
+            "upserted": upserted,
+            "deleted": deleted,
+            "duration_seconds": round((datetime.now(timezone.utc) - started_at).total_seconds(), 2)
+        }
+        if upserted or deleted:
+            logger.info(f"🪞 Espejo de Airtable ({self.last_refresh['mode']}): {upserted} actualizados, {deleted} eliminados")
+        return self.last_refresh
+
+    def mark_processed(self, record_ids: List[str]):
+        """Reflejar en el espejo los registros que la sincronización marcó como procesados"""
+        if not record_ids:
+            return
+        try:
+            self.supabase.table(self.TABLE).update({'estado': 'Procesado'}).in_('airtable_id', record_ids).execute()
+        except Exception as e:
+            # El siguiente refresco los corrige igual
+            logger.warning(f"⚠️ No se pudo actualizar el espejo de Airtable: {e}")
+
+    # ===================== CONSULTAS =====================
+
+    def _to_record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Registro en el mismo formato que AirtableService.get_all_records"""
+        record = {
+            'id': row['airtable_id'],
+            'created_time': row['creado_en_airtable'],
+            'empresa': row['empresa'],
+            'fecha_subida': row['fecha_subida'],
+            'tipo_documento': row['tipo_documento'],
+            'archivos': row['archivos'],
+            'estado': row['estado'],
+            'comentarios': row['comentarios']
+        }
+        if 'campos' in row:
+            record['fields'] = row['campos']
+        return record
+
+    def query_page(
+        self,
+        empresa: Optional[str] = None,
+        estado: Optional[str] = None,
+        tipo: Optional[str] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        offset: Optional[str] = None,
+        include_fields: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Una página de registros del espejo, más recientes primero
+
+        La paginación es por clave (creado_en_airtable, airtable_id), no por
+        posición: cada página cuesta lo mismo sin importar su profundidad y
+        los registros que entran o salen entre páginas no desplazan al resto.
+
+        Args:
+            empresa: Valor exacto del campo Empresa
+            estado: Valor exacto de Estado subida
+            tipo: Valor exacto de Tipo documento
+            page_size: Registros por página (máximo MAX_PAGE_SIZE)
+            offset: Cursor devuelto por la página anterior
+            include_fields: Incluir la copia completa de los campos (`fields`)
+
+        Returns:
+            (registros, cursor de la página siguiente o None si es la última)
+
+        Raises:
+            ValueError: si el offset no es válido
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        query = self.supabase.table(self.TABLE).select('*' if include_fields else _COLUMNS_SIN_CAMPOS)
+        if empresa:
+            query = query.eq('empresa', empresa)
+        if estado:
+            query = query.eq('estado', estado)
+        if tipo:
+            query = query.eq('tipo_documento', tipo)
+        if offset:
+            creado, airtable_id = _decode_offset(offset)
+            # Orden descendente con NULL primero: tras los NULL vienen las fechas
+            if creado is None:
+                query = query.or_(f'creado_en_airtable.not.is.null,and(creado_en_airtable.is.null,airtable_id.gt."{airtable_id}")')
+            else:
+                query = query.or_(
+                    f'creado_en_airtable.lt."{creado}",'
+                    f'and(creado_en_airtable.eq."{creado}",airtable_id.gt."{airtable_id}")'
+                )
+        # Una fila de más para saber si hay página siguiente
+        response = query.order('creado_en_airtable', desc=True, nullsfirst=True).order('airtable_id') \
+            .limit(page_size + 1).execute()
+        filas = response.data or []
+        next_offset = _encode_offset(filas[page_size - 1]) if len(filas) > page_size else None
+        return [self._to_record(fila) for fila in filas[:page_size]], next_offset
+
+    def iterate_pages(
+        self,
+        empresa: Optional[str] = None,
+        estado: Optional[str] = None,
+        tipo: Optional[str] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        offset: Optional[str] = None,
+        include_fields: bool = True
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Recorrer el espejo página a página (mismos argumentos que query_page)"""
+        while True:
+            records, offset = self.query_page(empresa, estado, tipo, page_size, offset, include_fields)
+            if records:
+                yield records
+            if offset is None:
+                return
+
+    def query(
+        self,
+        empresa: Optional[str] = None,
+        estado: Optional[str] = None,
+        tipo: Optional[str] = None,
+        include_fields: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Todos los registros del espejo, más recientes primero
+
+        Args:
+            empresa: Valor exacto del campo Empresa
+            estado: Valor exacto de Estado subida
+            tipo: Valor exacto de Tipo documento
+            include_fields: Incluir la copia completa de los campos (`fields`)
+        """
+        pages = self.iterate_pages(empresa, estado, tipo, include_fields=include_fields)
+        return [record for page in pages for record in page]
+
+    def get_pending_records(self) -> List[Dict[str, Any]]:
+        """Registros pendientes de sincronizar según el espejo"""
+        return self.query(estado='Pendiente')
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Estadísticas de Airtable calculadas sobre el espejo"""
+        if not self.enabled:
+            return {"enabled": False}
+        try:
+            stats = self.supabase.client.rpc('airtable_registros_estadisticas', {}).execute().data
+            return {
+                "enabled": True,
+                "total_records": stats['total_records'],
+                "pending_records": stats['pending_records'],
+                "processed_records": stats['total_records'] - stats['pending_records'],
+                "by_empresa": stats['by_empresa'],
+                "by_tipo": stats['by_tipo'],
+                "base_id": self.airtable.base_id,
+                "table_name": self.airtable.table_name,
+                "mirror_updated_at": stats['updated_at']
+            }
+        except Exception as e:
+            logger.error(f"❌ Error obteniendo estadísticas del espejo de Airtable: {e}")
+            return {"enabled": True, "error": str(e)}
+
+    # ===================== REFRESHER =====================
+
+    async def _loop(self):
+        """Bucle de refresco periódico"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error refrescando espejo de Airtable: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start_refresher(self):
+        """Iniciar el refresco periódico (si Airtable está configurado)"""
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"🪞 Espejo de Airtable refrescado cada {self.refresh_seconds}s")
+
+    async def stop_refresher(self):
+        """Detener el refresco periódico"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del refresher en este proceso"""
+        return {
+            "enabled": self.enabled,
+            "refresh_seconds": self.refresh_seconds,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "last_refresh": self.last_refresh
+        }
+
+# Instancia global
+airtable_mirror = AirtableMirror()
+
+def get_airtable_mirror() -> AirtableMirror:
+    """Obtener el espejo de Airtable"""
+    return airtable_mirror
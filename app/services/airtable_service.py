@@ -5,9 +5,13 @@ Gestión documental integrada con Supabase
 
 import os
 import logging
+import threading
+import time
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from pyairtable import Api
+from pyairtable.formulas import match, to_formula_str
 try:
     from pyairtable.exceptions import AirtableError
 except ImportError:
@@ -15,10 +19,43 @@ except ImportError:
     class AirtableError(Exception):
         pass
 
+from ..config import Config
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# IDs por fórmula RECORD_ID() al pedir registros puntuales
+_IDS_PER_FORMULA = 50
+
+# Campos que necesitan las estadísticas
+_STATISTICS_FIELDS = ('Empresa', 'Tipo documento', 'Estado subida')
+
+# Campos de la tabla "ACA - Gestión Documental" (ver docs/airtable_setup_guide.md)
+TABLE_FIELDS = (
+    'Empresa', 'Fecha subida', 'Tipo documento', 'Archivo adjunto',
+    'Estado subida', 'Comentarios', 'Fecha procesado', 'Supabase ID'
+)
+
+def build_formula(*parts: Optional[str], filters: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Combinar condiciones de fórmula con AND
+    
+    Args:
+        parts: Fórmulas ya armadas (se ignoran las vacías)
+        filters: Igualdades {campo: valor}; nombres y valores se escapan, de
+            modo que un valor con comillas o llaves no altera la fórmula
+    
+    Returns:
+        Fórmula para filterByFormula, o None si no hay condiciones
+    """
+    condiciones = [part for part in parts if part]
+    if filters:
+        condiciones.append(str(match(filters)))
+    if not condiciones:
+        return None
+    return condiciones[0] if len(condiciones) == 1 else f"AND({', '.join(condiciones)})"
+
 class AirtableService:
     """
     Servicio para integración con Airtable
@@ -34,6 +71,13 @@ class AirtableService:
         self.base_id = os.getenv('AIRTABLE_BASE_ID')
         self.table_name = os.getenv('AIRTABLE_TABLE_NAME', 'ACA - Gestión Documental')
         self.view_name = os.getenv('AIRTABLE_VIEW_NAME', 'Grid view')
+        self.api_url = os.getenv('AIRTABLE_API_URL', 'https://api.airtable.com')
+        self._table_id: Optional[str] = None
+        
+        # Ritmo de escrituras por lote (Airtable admite 5 requests/s por base)
+        self._write_interval = 1.0 / max(Config.AIRTABLE_REQUESTS_PER_SECOND, 0.1)
+        self._write_lock = threading.Lock()
+        self._last_write = 0.0
         
         # Debug: imprimir valores para verificar
         logger.info(f"🔍 Debug Airtable - API Key: {'✅ Configurado' if self.api_key else '❌ Faltante'}")
@@ -46,7 +90,7 @@ class AirtableService:
             return
             
         try:
-            self.api = Api(self.api_key)
+            self.api = Api(self.api_key, endpoint_url=self.api_url)
             self.table = self.api.table(self.base_id, self.table_name)
             self.enabled = True
             logger.info("✅ Airtable configurado correctamente")
@@ -70,7 +114,7 @@ class AirtableService:
         
         try:
             # Intentar obtener información de la tabla
-            records = self.table.all(max_records=1)
+            records = self.table.all(max_records=1, fields=['Estado subida'])
             
             return {
                 "success": True,
@@ -95,12 +139,37 @@ class AirtableService:
                 "configured": True
             }
     
-    def get_all_records(self, empresa_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _read_options(
+        self,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None,
+        formula: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Parámetros de lectura para la API (solo los indicados)"""
+        options = {}
+        if fields is not None:
+            options['fields'] = list(fields)
+        if view:
+            options['view'] = view
+        if formula:
+            options['formula'] = formula
+        return options
+    
+    def get_all_records(
+        self,
+        empresa_filter: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Obtener todos los registros de Airtable
         
         Args:
             empresa_filter: Filtrar por empresa específica
+            fields: Campos a pedir (None = todos)
+            view: Vista de Airtable (aplica sus filtros y orden)
+            filters: Igualdades {campo: valor} adicionales
             
         Returns:
             Lista de registros
@@ -112,26 +181,11 @@ class AirtableService:
         try:
             if empresa_filter:
                 # Filtrar por empresa
-                formula = f"{{Empresa}} = '{empresa_filter}'"
-                records = self.table.all(formula=formula)
-            else:
-                records = self.table.all()
+                filters = {**(filters or {}), 'Empresa': empresa_filter}
+            records = self.table.all(**self._read_options(fields, view, build_formula(filters=filters)))
             
             # Procesar registros para formato consistente
-            processed_records = []
-            for record in records:
-                processed_record = {
-                    'id': record['id'],
-                    'fields': record['fields'],
-                    'created_time': record.get('createdTime'),
-                    'empresa': record['fields'].get('Empresa'),
-                    'fecha_subida': record['fields'].get('Fecha subida'),
-                    'tipo_documento': record['fields'].get('Tipo documento'),
-                    'archivos': record['fields'].get('Archivo adjunto', []),
-                    'estado': record['fields'].get('Estado subida', 'Pendiente'),
-                    'comentarios': record['fields'].get('Comentarios', '')
-                }
-                processed_records.append(processed_record)
+            processed_records = [self._to_record(record) for record in records]
             
             logger.info(f"📊 Obtenidos {len(processed_records)} registros de Airtable")
             return processed_records
@@ -143,6 +197,43 @@ class AirtableService:
             logger.error(f"❌ Error general: {e}")
             return []
     
+    def _to_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Formato de registro usado por los listados"""
+        return {
+            'id': record['id'],
+            'fields': record['fields'],
+            'created_time': record.get('createdTime'),
+            'empresa': record['fields'].get('Empresa'),
+            'fecha_subida': record['fields'].get('Fecha subida'),
+            'tipo_documento': record['fields'].get('Tipo documento'),
+            'archivos': record['fields'].get('Archivo adjunto', []),
+            'estado': record['fields'].get('Estado subida', 'Pendiente'),
+            'comentarios': record['fields'].get('Comentarios', '')
+        }
+    
+    def iterate_record_pages(
+        self,
+        modified_since: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorrer todos los registros página a página (propaga errores de Airtable)
+        
+        Args:
+            modified_since: Solo registros modificados después de esta fecha (UTC)
+            fields: Campos a pedir (None = todos)
+            view: Vista de Airtable
+        
+        Yields:
+            Listas de hasta 100 registros en el formato de get_all_records
+        """
+        if not self.enabled:
+            return
+        formula = self._modified_since_formula(modified_since) if modified_since else None
+        for page in self.table.iterate(**self._read_options(fields, view, formula)):
+            yield [self._to_record(record) for record in page]
+    
     def create_record(self, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Crear un nuevo registro en Airtable
@@ -215,70 +306,268 @@ class AirtableService:
         Returns:
             True si se actualizó correctamente
         """
+        result = self.update_record(record_id, self._processed_fields(supabase_id))
+        return result is not None
+    
+    def _processed_fields(self, supabase_id: Optional[str] = None) -> Dict[str, Any]:
+        """Campos que marcan un registro como procesado"""
         # Formato de fecha compatible con Airtable (YYYY-MM-DD)
-        fecha_procesado = datetime.now().strftime('%Y-%m-%d')
-        
         fields = {
             'Estado subida': 'Procesado',
-            'Fecha procesado': fecha_procesado
+            'Fecha procesado': datetime.now().strftime('%Y-%m-%d')
         }
-        
         if supabase_id:
             fields['Supabase ID'] = supabase_id
+        return fields
+    
+    def _wait_write_slot(self):
+        """Espaciar las escrituras para respetar el límite de requests/s de la base"""
+        with self._write_lock:
+            wait = self._last_write + self._write_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_write = time.monotonic()
+    
+    def mark_many_as_processed(self, items: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """
+        Marcar varios registros como procesados con batch_update
         
-        result = self.update_record(record_id, fields)
-        return result is not None
+        Los registros se envían en grupos de 10 (máximo de Airtable por request)
+        espaciados según AIRTABLE_REQUESTS_PER_SECOND. Un grupo que falla se
+        reintenta con backoff hasta AIRTABLE_BATCH_RETRIES veces.
+        
+        Args:
+            items: Pares (record_id, supabase_id)
+            
+        Returns:
+            IDs de Airtable que no se pudieron marcar
+        """
+        if not items:
+            return []
+        if not self.enabled:
+            logger.warning("Airtable no está habilitado")
+            return [record_id for record_id, _ in items]
+        
+        updates = [
+            {'id': record_id, 'fields': self._processed_fields(supabase_id)}
+            for record_id, supabase_id in items
+        ]
+        
+        failed = []
+        size = Api.MAX_RECORDS_PER_REQUEST
+        for inicio in range(0, len(updates), size):
+            chunk = updates[inicio:inicio + size]
+            for intento in range(Config.AIRTABLE_BATCH_RETRIES + 1):
+                self._wait_write_slot()
+                try:
+                    self.table.batch_update(chunk)
+                    break
+                except Exception as e:
+                    if intento == Config.AIRTABLE_BATCH_RETRIES:
+                        logger.error(f"❌ Error marcando {len(chunk)} registros como procesados: {e}")
+                        failed.extend(update['id'] for update in chunk)
+                    else:
+                        logger.warning(f"⚠️ Reintentando lote de {len(chunk)} registros ({intento + 1}): {e}")
+                        time.sleep(0.5 * 2 ** intento)
+        
+        logger.info(f"✅ {len(updates) - len(failed)} registros marcados como procesados en {(len(updates) + size - 1) // size} requests")
+        return failed
+    
+    def _pending_formula(self, modified_since: Optional[datetime] = None) -> str:
+        """Fórmula de registros pendientes, opcionalmente modificados desde una fecha (UTC)"""
+        # Filtrar por estado pendiente
+        formula = "OR({Estado subida} = 'Pendiente', {Estado subida} = '')"
+        if modified_since:
+            formula = f"AND({formula}, {self._modified_since_formula(modified_since)})"
+        return formula
     
-    def get_pending_records(self) -> List[Dict[str, Any]]:
+    def _modified_since_formula(self, modified_since: datetime) -> str:
+        """Filtro incremental evaluado en Airtable con LAST_MODIFIED_TIME()"""
+        since = modified_since.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        return f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{since}'))"
+    
+    def _to_pending_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Formato de registro pendiente usado por la sincronización"""
+        return {
+            'id': record['id'],
+            'fields': record['fields'],
+            'empresa': record['fields'].get('Empresa'),
+            'tipo_documento': record['fields'].get('Tipo documento'),
+            'archivos': record['fields'].get('Archivo adjunto', []),
+            'comentarios': record['fields'].get('Comentarios', '')
+        }
+    
+    def iterate_pending_pages(
+        self,
+        modified_since: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None,
+        formula: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
         """
-        Obtener registros pendientes de procesar
+        Recorrer los registros pendientes página a página (propaga errores de Airtable)
+        
+        Cada página se pide a Airtable recién al avanzar el iterador, de modo
+        que quien consume puede procesar una página mientras llega la siguiente.
+        
+        Args:
+            modified_since: Solo registros modificados después de esta fecha (UTC)
+            fields: Campos a pedir (None = todos)
+            view: Vista de Airtable
+            formula: Condición adicional (se combina con AND); los valores
+                deben venir escapados, por ejemplo con build_formula(filters=...)
+        
+        Yields:
+            Listas de hasta 100 registros pendientes
+        """
+        if not self.enabled:
+            return
+        formula = build_formula(self._pending_formula(modified_since), formula)
+        for page in self.table.iterate(**self._read_options(fields, view, formula)):
+            yield [self._to_pending_record(record) for record in page]
+    
+    def iterate_pending_pages_by_ids(
+        self,
+        record_ids: List[str],
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None,
+        formula: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorrer solo los registros indicados que sigan pendientes (propaga errores de Airtable)
+        
+        Los IDs se piden en grupos con RECORD_ID() en la fórmula para no
+        exceder el largo de URL de Airtable.
+        
+        Args:
+            record_ids: IDs de Airtable (por ejemplo, los cambiados según un webhook)
+            fields: Campos a pedir (None = todos)
+            view: Vista de Airtable
+            formula: Condición adicional (se combina con AND)
+        
+        Yields:
+            Listas de registros pendientes
+        """
+        if not self.enabled:
+            return
+        for inicio in range(0, len(record_ids), _IDS_PER_FORMULA):
+            ids = ", ".join(f"RECORD_ID() = {to_formula_str(record_id)}" for record_id in record_ids[inicio:inicio + _IDS_PER_FORMULA])
+            formula_ids = build_formula(self._pending_formula(), f"OR({ids})", formula)
+            for page in self.table.iterate(**self._read_options(fields, view, formula_ids)):
+                yield [self._to_pending_record(record) for record in page]
+    
+    def get_table_id(self) -> str:
+        """ID de la tabla (tbl...), necesario para leer los payloads de webhooks"""
+        if self._table_id is None:
+            # Table.id consulta el esquema de la base si se configuró por nombre
+            self._table_id = self.table.id
+        return self._table_id
+    
+    def fetch_webhook_changes(self, webhook_id: str, cursor: int) -> Tuple[List[str], int]:
+        """
+        Leer los payloads de un webhook desde un cursor (propaga errores de Airtable)
+        
+        Solo se consideran registros creados o modificados en la tabla de
+        gestión documental; los eliminados se ignoran porque la sincronización
+        no borra filas en Supabase.
+        
+        Args:
+            webhook_id: ID del webhook (ach...)
+            cursor: Primer payload a leer
+        
+        Returns:
+            (IDs de registros cambiados, cursor siguiente)
+        """
+        table_id = self.get_table_id()
+        url = self.api.build_url('bases', self.base_id, 'webhooks', webhook_id, 'payloads')
+        record_ids = set()
+        payloads = 0
+        while True:
+            response = self.api.get(url, params={'cursor': cursor})
+            for payload in response.get('payloads', []):
+                payloads += 1
+                cambios = payload.get('changedTablesById', {}).get(table_id, {})
+                record_ids.update(cambios.get('createdRecordsById', {}))
+                record_ids.update(cambios.get('changedRecordsById', {}))
+            cursor = response.get('cursor', cursor)
+            if not response.get('mightHaveMore'):
+                break
+        
+        logger.info(f"🪝 Webhook {webhook_id}: {payloads} payloads, {len(record_ids)} registros cambiados")
+        return sorted(record_ids), cursor
+    
+    def fetch_pending_records(
+        self,
+        modified_since: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None,
+        formula: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtener registros pendientes de procesar (propaga errores de Airtable)
+        
+        Args:
+            modified_since: Solo registros modificados después de esta fecha (UTC).
+                Si es None se recorren todos los pendientes.
+            fields: Campos a pedir (None = todos)
+            view: Vista de Airtable
+            formula: Condición adicional (se combina con AND)
         
         Returns:
             Lista de registros pendientes
         """
-        if not self.enabled:
-            return []
+        processed_records = [
+            record
+            for page in self.iterate_pending_pages(modified_since, fields, view, formula)
+            for record in page
+        ]
         
-        try:
-            # Filtrar por estado pendiente
-            formula = "OR({Estado subida} = 'Pendiente', {Estado subida} = '')"
-            records = self.table.all(formula=formula)
-            
-            processed_records = []
-            for record in records:
-                processed_record = {
-                    'id': record['id'],
-                    'fields': record['fields'],
-                    'empresa': record['fields'].get('Empresa'),
-                    'tipo_documento': record['fields'].get('Tipo documento'),
-                    'archivos': record['fields'].get('Archivo adjunto', []),
-                    'comentarios': record['fields'].get('Comentarios', '')
-                }
-                processed_records.append(processed_record)
-            
+        if modified_since:
+            logger.info(f"📋 Encontrados {len(processed_records)} registros pendientes modificados desde {modified_since.isoformat()}")
+        else:
             logger.info(f"📋 Encontrados {len(processed_records)} registros pendientes")
-            return processed_records
-            
+        return processed_records
+    
+    def get_pending_records(
+        self,
+        modified_since: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None,
+        formula: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtener registros pendientes de procesar
+        
+        Returns:
+            Lista de registros pendientes (vacía si hay error)
+        """
+        try:
+            return self.fetch_pending_records(modified_since, fields, view, formula)
         except Exception as e:
             logger.error(f"❌ Error obteniendo registros pendientes: {e}")
             return []
     
-    def get_records_by_empresa(self, empresa_name: str) -> List[Dict[str, Any]]:
+    def get_records_by_empresa(self, empresa_name: str, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Obtener registros de una empresa específica
         
         Args:
             empresa_name: Nombre de la empresa
+            fields: Campos a pedir (None = todos)
             
         Returns:
             Lista de registros de la empresa
         """
-        return self.get_all_records(empresa_filter=empresa_name)
+        return self.get_all_records(empresa_filter=empresa_name, fields=fields)
     
     def get_statistics(self) -> Dict[str, Any]:
         """
         Obtener estadísticas de Airtable
         
+        Una sola pasada por las páginas de `table.iterate()`, pidiendo solo los
+        campos necesarios: los contadores se actualizan página a página sin
+        guardar los registros, y los pendientes salen del mismo recorrido.
+        
         Returns:
             Diccionario con estadísticas
         """
@@ -286,28 +575,28 @@ class AirtableService:
             return {"enabled": False}
         
         try:
-            all_records = self.get_all_records()
-            pending_records = self.get_pending_records()
-            
-            # Contar por empresa
-            empresas = {}
-            for record in all_records:
-                empresa = record.get('empresa', 'Sin empresa')
-                empresas[empresa] = empresas.get(empresa, 0) + 1
+            total = 0
+            pendientes = 0
+            empresas: Counter = Counter()
+            tipos: Counter = Counter()
             
-            # Contar por tipo
-            tipos = {}
-            for record in all_records:
-                tipo = record.get('tipo_documento', 'Sin tipo')
-                tipos[tipo] = tipos.get(tipo, 0) + 1
+            for page in self.table.iterate(**self._read_options(_STATISTICS_FIELDS)):
+                for record in page:
+                    fields = record['fields']
+                    total += 1
+                    # Mismo criterio que _pending_formula (campo vacío = pendiente)
+                    if fields.get('Estado subida', '') in ('Pendiente', ''):
+                        pendientes += 1
+                    empresas[fields.get('Empresa') or 'Sin empresa'] += 1
+                    tipos[fields.get('Tipo documento') or 'Sin tipo'] += 1
             
             return {
                 "enabled": True,
-                "total_records": len(all_records),
-                "pending_records": len(pending_records),
-                "processed_records": len(all_records) - len(pending_records),
-                "by_empresa": empresas,
-                "by_tipo": tipos,
+                "total_records": total,
+                "pending_records": pendientes,
+                "processed_records": total - pendientes,
+                "by_empresa": dict(empresas),
+                "by_tipo": dict(tipos),
                 "base_id": self.base_id,
                 "table_name": self.table_name
             }
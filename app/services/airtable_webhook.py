@@ -0,0 +1,172 @@
+"""
+🪝 Webhooks de Airtable ACA 3.0
+Sincronización por notificaciones: solo se leen los registros que cambiaron
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from pyairtable.models import WebhookNotification
+
+from app.config import Config
+from app.services.airtable_service import get_airtable_service
+from app.services.sync_state import get_sync_state
+from app.services.sync_scheduler import get_sync_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Notificaciones recordadas para descartar reenvíos de Airtable
+_SEEN_LIMIT = 1000
+
+class AirtableWebhookReceiver:
+    """
+    Recibe las notificaciones de un webhook de Airtable y sincroniza solo
+    los registros cambiados.
+
+    La notificación no trae datos: solo avisa que hay payloads nuevos. Por
+    eso las notificaciones se agrupan: la primera programa una lectura tras
+    WEBHOOK_COALESCE_SECONDS y las que llegan mientras tanto (o durante la
+    sincronización) se atienden en esa misma lectura o en una sola más.
+    Los payloads se leen desde el cursor guardado en `sync_estado`, que solo
+    avanza cuando la sincronización de esos registros terminó; si hay otra
+    sincronización en curso o falla, se reintenta tras WEBHOOK_RETRY_SECONDS.
+    """
+
+    CURSOR_KEY = 'airtable_webhook_cursor'
+    MAX_RETRIES = 5
+
+    def __init__(self):
+        self.webhook_id = Config.AIRTABLE_WEBHOOK_ID
+        self.mac_secret = Config.AIRTABLE_WEBHOOK_MAC_SECRET
+        self.coalesce_seconds = Config.WEBHOOK_COALESCE_SECONDS
+        self.retry_seconds = Config.WEBHOOK_RETRY_SECONDS
+        self._seen: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self.received = 0
+        self.duplicates = 0
+        self.coalesced = 0
+        self.runs = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.webhook_id and self.mac_secret)
+
+    def verify(self, body: str, mac_header: str) -> WebhookNotification:
+        """
+        Validar la firma X-Airtable-Content-MAC de una notificación
+
+        Raises:
+            ValueError: si la firma o el cuerpo no son válidos
+        """
+        return WebhookNotification.from_request(body, mac_header or '', self.mac_secret)
+
+    def notify(self, notification: WebhookNotification) -> bool:
+        """
+        Registrar una notificación ya validada
+
+        Returns:
+            True si se programó (o se sumó a) una lectura de payloads
+        """
+        if notification.webhook.id != self.webhook_id:
+            logger.warning(f"⚠️ Notificación de un webhook desconocido: {notification.webhook.id}")
+            return False
+
+        key = (notification.webhook.id, notification.timestamp.isoformat())
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen[key] = None
+        if len(self._seen) > _SEEN_LIMIT:
+            self._seen.popitem(last=False)
+
+        self.received += 1
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        else:
+            self.coalesced += 1
+        return True
+
+    async def _drain(self):
+        """Leer payloads y sincronizar mientras sigan llegando notificaciones"""
+        await asyncio.sleep(self.coalesce_seconds)
+        retries = 0
+        while self._dirty:
+            self._dirty = False
+            try:
+                ok = await self._process()
+            except Exception as e:
+                logger.error(f"❌ Error procesando webhook de Airtable: {e}")
+                self.last_error = str(e)
+                ok = False
+
+            if ok:
+                retries = 0
+            elif retries < self.MAX_RETRIES:
+                # Los payloads siguen en Airtable desde el mismo cursor
+                retries += 1
+                await asyncio.sleep(self.retry_seconds)
+                self._dirty = True
+            else:
+                logger.warning("⚠️ Webhook de Airtable sin procesar tras varios intentos; lo recogerá la sincronización programada")
+
+    async def _process(self) -> bool:
+        """
+        Sincronizar los registros cambiados desde el último cursor
+
+        Returns:
+            True si el cursor avanzó
+        """
+        state = get_sync_state()
+        key = f"{self.CURSOR_KEY}:{self.webhook_id}"
+        saved = await asyncio.to_thread(state.get, key)
+        cursor = saved['cursor'] if saved else 1
+
+        record_ids, next_cursor = await asyncio.to_thread(
+            get_airtable_service().fetch_webhook_changes, self.webhook_id, cursor
+        )
+        if record_ids:
+            result = await get_sync_scheduler().run(trigger="webhook", record_ids=record_ids)
+            if not result.get("success"):
+                self.last_error = result.get("message")
+                logger.info(f"🪝 Sincronización por webhook pospuesta: {result.get('message')}")
+                return False
+            self.runs += 1
+
+        if next_cursor != cursor:
+            await asyncio.to_thread(state.set, key, {'cursor': next_cursor})
+        self.last_error = None
+        return True
+
+    async def stop(self):
+        """Detener la lectura en curso (el cursor queda donde estaba)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de notificaciones en este proceso"""
+        return {
+            "enabled": self.enabled,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "coalesced": self.coalesced,
+            "runs": self.runs,
+            "processing": self._task is not None and not self._task.done(),
+            "last_error": self.last_error
+        }
+
+# Instancia global
+airtable_webhook = AirtableWebhookReceiver()
+
+def get_airtable_webhook() -> AirtableWebhookReceiver:
+    """Obtener el receptor de webhooks de Airtable"""
+    return airtable_webhook
@@ -0,0 +1,145 @@
+"""
+📦 Escritor por lotes de logs de conversaciones
+Cola acotada en memoria que se vacía en lotes por tamaño o por tiempo
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+class ConversationLogWriter:
+    """
+    Cola acotada para registrar conversaciones en lotes.
+
+    Los handlers solo encolan filas; un worker en background las escribe en
+    lotes de `batch_size` o cada `flush_interval` segundos, lo que ocurra
+    primero. Si la cola está llena se espera como máximo `enqueue_timeout`
+    segundos (backpressure) y luego la fila se descarta y se cuenta.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        max_queue_size: int = None,
+        batch_size: int = None,
+        flush_interval: float = None,
+        enqueue_timeout: float = None
+    ):
+        self._write_batch = write_batch
+        self.max_queue_size = max_queue_size or Config.LOG_QUEUE_MAX_SIZE
+        self.batch_size = batch_size or Config.LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.LOG_FLUSH_INTERVAL_SECONDS
+        self.enqueue_timeout = enqueue_timeout if enqueue_timeout is not None else Config.LOG_ENQUEUE_TIMEOUT_SECONDS
+
+        # Se crean dentro del event loop (Python 3.9 los asocia al crearlos)
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush: Optional[datetime] = None
+
+    def _ensure_started(self):
+        """Crear la cola y lanzar el worker si no está corriendo"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._batch_ready = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def enqueue(self, row: Dict[str, Any]) -> bool:
+        """
+        Encolar una fila de log
+
+        Returns:
+            True si quedó en cola, False si se descartó por sobrecarga
+        """
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    logger.warning(f"⚠️ Cola de logs llena, {self.dropped} conversaciones descartadas")
+                return False
+
+        self.enqueued += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    async def _run(self):
+        """Worker: vaciar la cola por tamaño de lote o por intervalo"""
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+
+            await self._flush_pending()
+
+            if self._stopping and self._queue.empty():
+                return
+
+    async def _flush_pending(self):
+        """Escribir todo lo que hay en la cola en lotes de batch_size"""
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._write_batch(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"❌ Error escribiendo lote de {len(batch)} conversaciones: {e}")
+
+            self.batches += 1
+            self.last_flush = datetime.now()
+
+    async def drain(self):
+        """Escribir las entradas pendientes y detener el worker"""
+        if self._queue is None:
+            return
+
+        self._stopping = True
+        self._batch_ready.set()
+
+        if self._worker and not self._worker.done():
+            await self._worker
+        self._worker = None
+
+        # Entradas encoladas mientras el worker terminaba
+        await self._flush_pending()
+        logger.info(f"📦 Cola de logs vaciada: {self.written} escritas, {self.dropped} descartadas")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtener estadísticas de la cola"""
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "batch_size": self.batch_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush": self.last_flush.isoformat() if self.last_flush else None
+        }
@@ -6,9 +6,11 @@ Registra todas las interacciones con los bots de Telegram
 import logging
 import json
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from telegram import Update, User
-from app.database.supabase import get_supabase_client
+from app.database.supabase import async_supabase
+from app.database.client_registry import ROLE_SERVICE, get_client_registry
+from app.services.conversation_log_writer import ConversationLogWriter
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +18,10 @@ class ConversationLogger:
     """Servicio para registrar conversaciones de Telegram"""
     
     def __init__(self):
-        from supabase import create_client
-        from app.config import Config
         # Usar service key para operaciones de logging (evitar RLS)
-        self.supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+        self.supabase = get_client_registry().get_client(ROLE_SERVICE)
+        # Cola acotada: los logs se escriben en lotes en background
+        self.writer = ConversationLogWriter(self._write_batch)
     
     async def log_message(
         self,
@@ -30,10 +32,11 @@ class ConversationLogger:
         parameters: Dict[str, Any] = None,
         response_time_ms: int = None,
         error: str = None,
-        has_access: bool = None
-    ) -> Optional[str]:
+        has_access: bool = None,
+        empresa_id: str = None
+    ) -> bool:
         """
-        Registra un mensaje y su respuesta en la base de datos (TODOS los usuarios)
+        Encola un mensaje y su respuesta para registrarlo en lote (TODOS los usuarios)
         
         Args:
             update: Update de Telegram
@@ -43,93 +46,90 @@ class ConversationLogger:
             parameters: Parámetros del comando
             response_time_ms: Tiempo de respuesta en milisegundos
             error: Mensaje de error si ocurrió
-            has_access: Si el usuario tiene acceso autorizado (None = detectar automáticamente)
+            has_access: Si el usuario tiene acceso autorizado (None = lo resuelve la función SQL)
+            empresa_id: Empresa del usuario si ya se validó (evita buscarla de nuevo)
             
         Returns:
-            ID de la conversación registrada
+            True si quedó en cola, False si se descartó
         """
         try:
             # Extraer información completa del usuario y mensaje
             user_data = self._extract_user_data(update)
             message_data = self._extract_message_data(update)
             
-            # Detectar si tiene acceso si no se especifica
-            if has_access is None:
-                has_access = await self._check_user_access(user_data["chat_id"])
-            
-            # Insertar usando función SQL simplificada (orden corregido)
-            result = self.supabase.rpc(
-                'log_conversacion_simple',
-                {
-                    'p_chat_id': user_data['chat_id'],
-                    'p_mensaje': message_data['text'],
-                    'p_user_id': user_data['user_id'],
-                    'p_respuesta': response_text or error,
-                    'p_first_name': user_data['first_name'],
-                    'p_last_name': user_data['last_name'],
-                    'p_username': user_data['username'],
-                    'p_bot_tipo': bot_type,
-                    'p_tiene_acceso': has_access
-                }
-            ).execute()
-            
-            if result.data:
-                conversation_id = result.data[0] if isinstance(result.data, list) else result.data
-                logger.info(f"💬 Conversación registrada: {conversation_id}")
-                return conversation_id
-            else:
-                logger.warning("⚠️ No se pudo obtener ID de conversación")
-                return None
-                
-        except Exception as e:
-            logger.error(f"❌ Error registrando conversación: {e}")
-            # Intentar registro directo si falla la función
-            return await self._log_direct_insert(user_data, message_data, response_text, bot_type, command, parameters, error)
-    
-    async def _log_direct_insert(
-        self, 
-        user_data: Dict, 
-        message_data: Dict, 
-        response_text: str, 
-        bot_type: str,
-        command: str,
-        parameters: Dict,
-        error: str
-    ) -> Optional[str]:
-        """Inserción directa como fallback"""
-        try:
-            # Buscar empresa_id si existe usuario registrado
-            empresa_id = None
-            user_check = self.supabase.table('usuarios').select('empresa_id').eq('chat_id', user_data['chat_id']).execute()
-            if user_check.data:
-                empresa_id = user_check.data[0]['empresa_id']
-            
-            # Insertar conversación directamente
-            result = self.supabase.table('conversaciones').insert({
+            return await self.writer.enqueue({
                 'chat_id': user_data['chat_id'],
-                'empresa_id': empresa_id,
+                'user_id': user_data['user_id'],
+                'first_name': user_data['first_name'],
+                'last_name': user_data['last_name'],
+                'username': user_data['username'],
                 'mensaje': message_data['text'],
                 'respuesta': response_text or error,
-                'usuario_nombre': f"{user_data['first_name'] or ''} {user_data['last_name'] or ''}".strip() or user_data.get('username', 'Usuario Desconocido'),
-                'usuario_username': user_data['username'],
                 'bot_tipo': bot_type,
+                'tiene_acceso': has_access,
+                'empresa_id': empresa_id,
                 'comando': command,
                 'parametros': parameters,
+                'tiempo_respuesta_ms': response_time_ms,
+                'message_id': message_data['message_id'],
+                'error': error is not None
+            })
+                
+        except Exception as e:
+            logger.error(f"❌ Error encolando conversación: {e}")
+            return False
+    
+    async def _write_batch(self, rows: List[Dict[str, Any]]):
+        """Escribir un lote de conversaciones sin bloquear el event loop"""
+        return await async_supabase.run(self._write_batch_sync, rows)
+    
+    def _write_batch_sync(self, rows: List[Dict[str, Any]]) -> int:
+        """Escribir un lote con la función SQL masiva (una sola llamada RPC)"""
+        try:
+            result = self.supabase.rpc('log_conversaciones_batch', {'p_rows': rows}).execute()
+            logger.info(f"💬 {len(rows)} conversaciones registradas en lote")
+            return result.data or 0
+        except Exception as e:
+            logger.error(f"❌ Error registrando lote de conversaciones: {e}")
+            # Intentar registro directo si falla la función
+            return self._insert_batch_direct(rows)
+    
+    def _insert_batch_direct(self, rows: List[Dict[str, Any]]) -> int:
+        """Inserción directa en lote como fallback"""
+        # Buscar empresa_id solo de los usuarios que no vienen validados (una sola consulta)
+        empresas = {}
+        chat_ids = list({row['chat_id'] for row in rows if not row.get('empresa_id')})
+        if chat_ids:
+            user_check = self.supabase.table('usuarios').select('chat_id, empresa_id').in_('chat_id', chat_ids).execute()
+            empresas = {user['chat_id']: user['empresa_id'] for user in user_check.data or []}
+        
+        registros = []
+        for row in rows:
+            registros.append({
+                'chat_id': row['chat_id'],
+                'empresa_id': row.get('empresa_id') or empresas.get(row['chat_id']),
+                'mensaje': row['mensaje'],
+                'respuesta': row['respuesta'],
+                'usuario_nombre': f"{row['first_name'] or ''} {row['last_name'] or ''}".strip() or row.get('username') or 'Usuario Desconocido',
+                'usuario_username': row['username'],
+                'bot_tipo': row['bot_tipo'],
+                'comando': row['comando'],
+                'parametros': row['parametros'],
+                'tiempo_respuesta_ms': row['tiempo_respuesta_ms'],
                 'metadata': {
-                    'message_id': message_data['message_id'],
+                    'message_id': row['message_id'],
                     'fallback_insert': True,
-                    'error': error is not None
+                    'error': row['error']
                 }
-            }).execute()
-            
-            if result.data:
-                conversation_id = result.data[0]['id']
-                logger.info(f"💬 Conversación registrada (fallback): {conversation_id}")
-                return conversation_id
-                
-        except Exception as e:
-            logger.error(f"❌ Error en fallback de conversación: {e}")
-            return None
+            })
+        
+        result = self.supabase.table('conversaciones').insert(registros).execute()
+        logger.info(f"💬 {len(registros)} conversaciones registradas (fallback)")
+        return len(result.data or [])
+    
+    async def flush(self):
+        """Escribir los logs pendientes y detener el worker de la cola"""
+        await self.writer.drain()
     
     def _extract_user_data(self, update: Update) -> Dict[str, Any]:
         """Extrae datos COMPLETOS del usuario de Telegram"""
@@ -146,21 +146,6 @@ class ConversationLogger:
             "is_premium": getattr(user, 'is_premium', False) if user else False
         }
     
-    async def _check_user_access(self, chat_id: int) -> bool:
-        """Verifica si un usuario tiene acceso autorizado"""
-        try:
-            result = self.supabase.table('usuarios')\
-                .select('id')\
-                .eq('chat_id', chat_id)\
-                .eq('activo', True)\
-                .execute()
-            
-            return len(result.data) > 0 if result.data else False
-            
-        except Exception as e:
-            logger.error(f"❌ Error verificando acceso usuario {chat_id}: {e}")
-            return False
-    
     def _extract_message_data(self, update: Update) -> Dict[str, Any]:
         """Extrae datos del mensaje"""
         message = update.effective_message
@@ -0,0 +1,151 @@
+"""
+📄 Listados paginados del Dashboard ACA 3.0
+Consultas filtradas en el servidor para reportes, archivos y empresas
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, Optional
+
+from app.database.supabase import async_supabase
+from app.database.pagination import fetch_page
+from app.services.stats_service import get_stats_service
+
+logger = logging.getLogger(__name__)
+
+# Filtro de tipo de archivo del dashboard → patrón sobre tipo_archivo (MIME)
+ARCHIVO_TIPOS = {
+    'pdf': '*pdf*',
+    'excel': '*excel*',
+    'word': '*word*'
+}
+
+# Filtro de tamaño del dashboard → rango en bytes [desde, hasta)
+ARCHIVO_TAMANIOS = {
+    'small': (None, 1024 * 1024),
+    'medium': (1024 * 1024, 10 * 1024 * 1024),
+    'large': (10 * 1024 * 1024, None)
+}
+
+def _select(table_name: str, first_page: bool):
+    """
+    Select base; el total filtrado solo se estima en la primera página
+
+    `estimated` es exacto en conjuntos chicos y usa la estimación del
+    planner en los grandes, sin recorrer todas las filas filtradas.
+    """
+    return async_supabase.table(table_name).select('*', count='estimated' if first_page else None)
+
+async def _head_count(query) -> Optional[int]:
+    """Ejecutar un conteo head-only"""
+    try:
+        response = await async_supabase.execute(query)
+        return response.count or 0
+    except Exception as e:
+        logger.error(f"Error en conteo del dashboard: {e}")
+        return None
+
+def _count_query(table_name: str):
+    """Consulta de conteo sin transferir filas"""
+    return async_supabase.table(table_name).select('id', count='exact', head=True)
+
+# ===================== REPORTES =====================
+
+async def get_reportes_page(
+    cursor: str = None,
+    limit: int = None,
+    empresa: str = None,
+    tipo: str = None,
+    estado: str = None,
+    anio: int = None,
+    mes: int = None,
+    q: str = None
+) -> Dict[str, Any]:
+    """Página de reportes mensuales ordenada por (creado_en, id)"""
+    query = _select('reportes_mensuales', cursor is None)
+    if empresa:
+        query = query.eq('empresa_id', empresa)
+    if tipo:
+        query = query.eq('tipo_reporte', tipo)
+    if estado:
+        query = query.eq('estado', estado)
+    if anio:
+        query = query.eq('anio', anio)
+    if mes:
+        query = query.eq('mes', mes)
+    if q:
+        query = query.ilike('titulo', f'*{q}*')
+    return await fetch_page(query, 'creado_en', cursor, limit)
+
+async def get_reportes_summary() -> Dict[str, Any]:
+    """Tarjetas de resumen de reportes (conteos en el servidor)"""
+    inicio_mes = date.today().replace(day=1).isoformat()
+    stats, este_mes, desde_airtable = await asyncio.gather(
+        async_supabase.run(get_stats_service().get_stats),
+        _head_count(_count_query('reportes_mensuales').gte('creado_en', inicio_mes)),
+        _head_count(_count_query('reportes_mensuales').not_.is_('airtable_id', 'null'))
+    )
+    return {
+        'este_mes': este_mes,
+        'tipos': sorted(stats['reportes_por_tipo'].keys()),
+        'desde_airtable': desde_airtable
+    }
+
+# ===================== ARCHIVOS =====================
+
+def _filter_archivos(query, reporte: str = None, tipo: str = None, estado: str = None, tamanio: str = None, q: str = None):
+    """Aplicar filtros del listado de archivos"""
+    if reporte:
+        query = query.eq('reporte_id', reporte)
+    if tipo in ARCHIVO_TIPOS:
+        query = query.ilike('tipo_archivo', ARCHIVO_TIPOS[tipo])
+    if estado == 'active':
+        query = query.eq('activo', True)
+    elif estado == 'inactive':
+        query = query.eq('activo', False)
+    if tamanio in ARCHIVO_TAMANIOS:
+        desde, hasta = ARCHIVO_TAMANIOS[tamanio]
+        if desde is not None:
+            query = query.gte('tamanio_bytes', desde)
+        if hasta is not None:
+            query = query.lt('tamanio_bytes', hasta)
+    if q:
+        query = query.ilike('nombre_archivo', f'*{q}*')
+    return query
+
+async def get_archivos_page(cursor: str = None, limit: int = None, **filters) -> Dict[str, Any]:
+    """Página de archivos de reportes ordenada por (created_at, id)"""
+    query = _filter_archivos(_select('archivos_reportes', cursor is None), **filters)
+    return await fetch_page(query, 'created_at', cursor, limit)
+
+async def get_archivos_summary() -> Dict[str, Any]:
+    """Tarjetas de resumen de archivos (conteos en el servidor)"""
+    stats, pdfs, activos = await asyncio.gather(
+        async_supabase.run(get_stats_service().get_stats),
+        _head_count(_count_query('archivos_reportes').eq('tipo_archivo', 'application/pdf')),
+        _head_count(_count_query('archivos_reportes').eq('activo', True))
+    )
+    return {
+        'pdfs': pdfs,
+        'mb_totales': round(stats.get('archivos_reportes_bytes', 0) / 1024 / 1024, 1),
+        'activos': activos
+    }
+
+# ===================== EMPRESAS =====================
+
+async def get_empresas_page(cursor: str = None, limit: int = None, estado: str = None, q: str = None) -> Dict[str, Any]:
+    """Página de empresas ordenada por (created_at, id)"""
+    query = _select('empresas', cursor is None)
+    if estado == 'activo':
+        query = query.eq('activo', True)
+    elif estado == 'inactivo':
+        query = query.eq('activo', False)
+    if q:
+        query = query.ilike('nombre', f'*{q}*')
+    return await fetch_page(query, 'created_at', cursor, limit)
+
+async def get_empresas_summary() -> Dict[str, Any]:
+    """Tarjetas de resumen de empresas (conteos en el servidor)"""
+    activas = await _head_count(_count_query('empresas').eq('activo', True))
+    return {'activas': activas}
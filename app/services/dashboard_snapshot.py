@@ -0,0 +1,114 @@
+"""
+📸 Snapshot del Dashboard ACA 3.0
+Datos del dashboard precalculados en memoria (stale-while-revalidate)
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+class DashboardSnapshot:
+    """
+    Último payload del dashboard generado en background.
+
+    Un refresher lo reconstruye cada `refresh_seconds`. Las páginas leen el
+    snapshot en memoria; si tiene más de `max_age_seconds` se devuelve igual
+    y se lanza una única reconstrucción en background. Solo el primer request
+    (sin snapshot todavía) espera la construcción.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Awaitable[Dict[str, Any]]],
+        refresh_seconds: int = None,
+        max_age_seconds: int = None
+    ):
+        self._build = build
+        self.refresh_seconds = refresh_seconds or Config.DASHBOARD_REFRESH_SECONDS
+        self.max_age_seconds = max_age_seconds or Config.DASHBOARD_MAX_AGE_SECONDS
+        self._data: Optional[Dict[str, Any]] = None
+        self.generated_at: Optional[datetime] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.served = 0
+        self.stale_served = 0
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """Antigüedad del snapshot actual"""
+        if self.generated_at is None:
+            return None
+        return (datetime.now() - self.generated_at).total_seconds()
+
+    async def _rebuild(self):
+        """Reconstruir el snapshot"""
+        try:
+            data = await self._build()
+            self._data = data
+            self.generated_at = datetime.now()
+            self.builds += 1
+        except Exception as e:
+            logger.error(f"Error reconstruyendo snapshot del dashboard: {e}")
+
+    def trigger_refresh(self) -> asyncio.Task:
+        """Lanzar una reconstrucción si no hay otra en curso (single-flight)"""
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild())
+        return self._rebuild_task
+
+    async def get(self) -> Dict[str, Any]:
+        """Obtener el payload del dashboard desde memoria"""
+        if self._data is None:
+            # shield: si el request se cancela la construcción compartida sigue
+            await asyncio.shield(self.trigger_refresh())
+            if self._data is None:
+                # La construcción falló: el builder ya devuelve un payload vacío en error
+                return await self._build()
+        elif self.age_seconds > self.max_age_seconds:
+            self.stale_served += 1
+            self.trigger_refresh()
+
+        self.served += 1
+        return {
+            **self._data,
+            'snapshot_generated_at': self.generated_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    async def _refresh_loop(self):
+        """Bucle de refresco periódico"""
+        while True:
+            await asyncio.shield(self.trigger_refresh())
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start_refresher(self):
+        """Iniciar el refresco periódico en background"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop_refresher(self):
+        """Detener el refresco periódico"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtener estadísticas del snapshot"""
+        return {
+            "generated_at": self.generated_at.isoformat() if self.generated_at else None,
+            "age_seconds": round(self.age_seconds, 1) if self.generated_at else None,
+            "refresh_seconds": self.refresh_seconds,
+            "max_age_seconds": self.max_age_seconds,
+            "builds": self.builds,
+            "served": self.served,
+            "stale_served": self.stale_served
+        }
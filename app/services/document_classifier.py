@@ -0,0 +1,159 @@
+"""
+🏷️ Clasificación de documentos para sincronización ACA 3.0
+Tabla de reglas (Supabase, archivo JSON o por defecto) compilada en expresiones regulares
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Reglas por defecto, en orden de prioridad:
+# (palabras clave, categoría, es reporte mensual)
+# Categoría None: la regla solo marca reporte mensual y no define categoría
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {'palabras': ['balance general'], 'categoria': 'Balance General', 'reporte_mensual': False},
+    {'palabras': ['estado de resultados'], 'categoria': 'Estado de Resultados', 'reporte_mensual': False},
+    {'palabras': ['flujo de caja'], 'categoria': 'Flujo de Caja', 'reporte_mensual': True},
+    {'palabras': ['estado de situación'], 'categoria': 'Estado de Situación', 'reporte_mensual': False},
+    {'palabras': ['balance'], 'categoria': 'Balance', 'reporte_mensual': True},
+    {'palabras': ['resultados'], 'categoria': 'Resultados', 'reporte_mensual': True},
+    {'palabras': ['flujo'], 'categoria': 'Flujo', 'reporte_mensual': False},
+    {'palabras': ['legal', 'contrato', 'escritura', 'registro'], 'categoria': 'Legal', 'reporte_mensual': False},
+    {'palabras': ['tributario', 'impuesto', 'declaracion', 'renta'], 'categoria': 'Tributaria', 'reporte_mensual': False},
+    {'palabras': ['carpeta', 'tributaria'], 'categoria': 'Carpeta Tributaria', 'reporte_mensual': False},
+    {'palabras': ['estados financieros'], 'categoria': None, 'reporte_mensual': True},
+]
+
+# Patrón que nunca coincide (tabla sin reglas de ese tipo)
+_NUNCA = re.compile(r'(?!)')
+
+def _compile(rules: List[Dict[str, Any]]) -> Tuple[Pattern, List[str], Pattern]:
+    """
+    Compilar las reglas
+
+    Returns:
+        (regex de categoría, categoría por grupo, regex de reporte mensual)
+
+    La regex de categoría es una alternancia anclada `^(?:.*?(?P<c0>...)|.*?(?P<c1>...))`:
+    cada alternativa se prueba sobre todo el texto antes de pasar a la
+    siguiente, así gana la regla de mayor prioridad aunque otra palabra
+    aparezca antes en el texto.
+    """
+    alternativas = []
+    categorias = []
+    reporte = []
+    for rule in rules:
+        palabras = rule['palabras']
+        if isinstance(palabras, str):
+            palabras = [palabras]
+        palabras = [p.lower() for p in palabras if p and p.strip()]
+        if not palabras:
+            continue
+        patron = '|'.join(re.escape(p) for p in palabras)
+        if rule.get('categoria'):
+            alternativas.append(f".*?(?P<c{len(categorias)}>{patron})")
+            categorias.append(rule['categoria'])
+        if rule.get('reporte_mensual'):
+            reporte.extend(palabras)
+
+    categoria_re = re.compile(f"^(?:{'|'.join(alternativas)})", re.DOTALL) if alternativas else _NUNCA
+    reporte_re = re.compile('|'.join(re.escape(p) for p in reporte)) if reporte else _NUNCA
+    return categoria_re, categorias, reporte_re
+
+class DocumentClassifier:
+    """
+    Clasifica el `Tipo documento` de Airtable en categoría y destino
+    (reporte mensual o información de compañía).
+
+    Las reglas se leen de la tabla `clasificacion_documentos` (ver
+    database/migrations/clasificacion_documentos.sql); si no existe o está
+    vacía, del JSON en DOCUMENT_CLASSIFICATION_FILE, y si no, de
+    DEFAULT_RULES. Se compilan una vez por carga y el resultado de cada
+    `tipo_documento` distinto se memoriza hasta la siguiente carga.
+
+    - Categoría: la de la regla de mayor prioridad con alguna palabra en el
+      texto; sin coincidencias, el propio texto (o 'General')
+    - Reporte mensual: si aparece alguna palabra de una regla marcada como tal
+    """
+
+    TABLE = 'clasificacion_documentos'
+
+    def __init__(self, supabase=None):
+        """
+        Args:
+            supabase: Cliente de Supabase (SupabaseManager); sin él solo se
+                usan el archivo o las reglas por defecto
+        """
+        self.supabase = supabase
+        self.source = 'default'
+        self._set_rules(DEFAULT_RULES)
+
+    def _set_rules(self, rules: List[Dict[str, Any]]):
+        # Reglas compiladas y memoria se reemplazan juntas (los hilos de
+        # escritura pueden estar clasificando durante una recarga)
+        self._state = (*_compile(rules), {})
+        self.rules = len(rules)
+
+    def _rules_from_table(self) -> List[Dict[str, Any]]:
+        response = self.supabase.table(self.TABLE).select('palabras, categoria, reporte_mensual') \
+            .eq('activo', True).order('prioridad').order('id').execute()
+        return response.data or []
+
+    def _rules_from_file(self, path: str) -> List[Dict[str, Any]]:
+        with open(path, encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    def load(self) -> int:
+        """
+        Cargar y compilar las reglas (si una fuente falla se prueba la siguiente)
+
+        Returns:
+            Número de reglas cargadas
+        """
+        fuentes = []
+        if self.supabase is not None:
+            fuentes.append((self.TABLE, self._rules_from_table))
+        if Config.DOCUMENT_CLASSIFICATION_FILE:
+            fuentes.append((Config.DOCUMENT_CLASSIFICATION_FILE, lambda: self._rules_from_file(Config.DOCUMENT_CLASSIFICATION_FILE)))
+
+        for nombre, leer in fuentes:
+            try:
+                rules = leer()
+                if rules:
+                    self._set_rules(rules)
+                    self.source = nombre
+                    logger.info(f"🏷️ {len(rules)} reglas de clasificación cargadas desde {nombre}")
+                    return len(rules)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudieron cargar reglas de clasificación desde {nombre}: {e}")
+
+        self._set_rules(DEFAULT_RULES)
+        self.source = 'default'
+        return len(DEFAULT_RULES)
+
+    def classify(self, tipo_documento: Optional[str]) -> Tuple[str, bool]:
+        """
+        Clasificar un tipo de documento (resultado memorizado)
+
+        Returns:
+            (categoría, es reporte mensual)
+        """
+        tipo_documento = tipo_documento or ''
+        categoria_re, categorias, reporte_re, cache = self._state
+        resultado = cache.get(tipo_documento)
+        if resultado is None:
+            texto = tipo_documento.lower()
+            match = categoria_re.match(texto.strip())
+            categoria = categorias[int(match.lastgroup[1:])] if match else (tipo_documento.strip() or 'General')
+            resultado = (categoria, reporte_re.search(texto) is not None)
+            cache[tipo_documento] = resultado
+        return resultado
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de las reglas cargadas"""
+        return {"source": self.source, "rules": self.rules, "cached": len(self._state[3])}
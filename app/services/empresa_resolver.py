@@ -0,0 +1,103 @@
+"""
+🏢 Resolución de empresas para sincronización ACA 3.0
+Empresas activas precargadas una vez por ejecución y búsquedas memorizadas
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# RUT chileno: 12345678-9 o 12.345.678-9 (dentro de un texto o como valor completo)
+_RUT_EN_TEXTO_RE = re.compile(r'(\d{1,2}\.?\d{3}\.?\d{3}-[0-9kK])')
+
+# Tamaño de página al precargar (límite habitual de filas de PostgREST)
+_PAGE_SIZE = 1000
+
+def normalizar_rut(rut: str) -> str:
+    """Normalizar RUT: sin puntos ni espacios y con K mayúscula"""
+    return rut.replace('.', '').replace(' ', '').upper()
+
+def normalizar_nombre(nombre: str) -> str:
+    """Normalizar nombre: espacios colapsados y sin distinguir mayúsculas"""
+    return ' '.join(nombre.split()).casefold()
+
+def extraer_rut(texto: str) -> Optional[str]:
+    """Extraer el RUT normalizado del formato 'Nombre (RUT)' o de un RUT directo"""
+    match = _RUT_EN_TEXTO_RE.search(texto)
+    return normalizar_rut(match.group(1)) if match else None
+
+class EmpresaResolver:
+    """
+    Resuelve el texto `empresa` de Airtable a una fila de `empresas`.
+
+    `load()` trae las empresas activas una sola vez y las indexa por RUT y
+    por nombre normalizados; cada texto distinto se resuelve a lo sumo una
+    vez y se memoriza. Se crea uno por ejecución de sincronización para que
+    las empresas nuevas se vean en la siguiente.
+    """
+
+    def __init__(self, supabase):
+        """
+        Args:
+            supabase: Cliente de Supabase (SupabaseManager)
+        """
+        self.supabase = supabase
+        self._por_rut: Dict[str, Dict[str, Any]] = {}
+        self._por_nombre: Dict[str, Dict[str, Any]] = {}
+        self._resueltos: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.loaded = False
+
+    def load(self) -> int:
+        """
+        Precargar las empresas activas
+
+        Returns:
+            Número de empresas cargadas
+
+        Raises:
+            Exception: si la consulta a Supabase falla
+        """
+        empresas = []
+        inicio = 0
+        while True:
+            response = self.supabase.table('empresas').select('*').eq('activo', True) \
+                .order('id').range(inicio, inicio + _PAGE_SIZE - 1).execute()
+            filas = response.data or []
+            empresas.extend(filas)
+            if len(filas) < _PAGE_SIZE:
+                break
+            inicio += _PAGE_SIZE
+
+        for empresa in empresas:
+            if empresa.get('rut'):
+                self._por_rut.setdefault(normalizar_rut(empresa['rut']), empresa)
+            if empresa.get('nombre'):
+                self._por_nombre.setdefault(normalizar_nombre(empresa['nombre']), empresa)
+
+        self.loaded = True
+        logger.info(f"🏢 {len(empresas)} empresas activas precargadas para sincronización")
+        return len(empresas)
+
+    def resolve(self, nombre: str) -> Optional[Dict[str, Any]]:
+        """Buscar empresa por RUT (más confiable) o por nombre; resultado memorizado"""
+        if nombre in self._resueltos:
+            return self._resueltos[nombre]
+
+        empresa = None
+        rut = extraer_rut(nombre)
+        if rut:
+            empresa = self._por_rut.get(rut)
+        if empresa is None:
+            empresa = self._por_nombre.get(normalizar_nombre(nombre))
+
+        if empresa is None:
+            logger.warning(f"⚠️ Empresa no encontrada: {nombre}")
+        self._resueltos[nombre] = empresa
+        return empresa
+
+    @property
+    def unresolved(self) -> List[str]:
+        """Textos de empresa que no se pudieron resolver en esta ejecución"""
+        return sorted(nombre for nombre, empresa in self._resueltos.items() if empresa is None)
@@ -0,0 +1,224 @@
+"""
+📎 Copia de archivos adjuntos ACA 3.0
+Descarga en streaming de adjuntos de Airtable a almacenamiento propio
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import Config
+from app.database.client_registry import ROLE_SERVICE, get_client_registry
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de cada bloque leído de la descarga
+_CHUNK_SIZE = 1024 * 1024
+
+MODE_URL = 'url'
+MODE_LOCAL = 'local'
+MODE_SUPABASE = 'supabase'
+
+class FileTooLargeError(Exception):
+    """El archivo supera MAX_FILE_SIZE_MB"""
+
+class AttachmentMirror:
+    """
+    Copia los adjuntos de Airtable (cuyas URLs vencen) a un almacenamiento estable.
+
+    Según FILE_STORAGE_MODE:
+    - `url`: no se copia nada, se guarda la URL de Airtable
+    - `local`: archivos en FILE_STORAGE_PATH, servidos en FILE_STORAGE_PUBLIC_URL
+    - `supabase`: objetos en el bucket FILE_STORAGE_BUCKET de Supabase Storage
+
+    Cada archivo se descarga por bloques a un temporal mientras se calcula su
+    SHA-256, así la memoria usada no depende del tamaño. La clave de
+    almacenamiento es el hash: un contenido ya guardado no se vuelve a subir.
+    Las descargas de todos los lotes comparten un pool de
+    FILE_MIRROR_CONCURRENCY hilos.
+    """
+
+    def __init__(self):
+        self.mode = Config.FILE_STORAGE_MODE.lower()
+        self.max_bytes = Config.MAX_FILE_SIZE_MB * 1024 * 1024
+        self.storage_path = Config.FILE_STORAGE_PATH
+        self.public_url = Config.FILE_STORAGE_PUBLIC_URL.rstrip('/')
+        self.bucket = Config.FILE_STORAGE_BUCKET
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.reused = 0
+        self.too_large = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+
+        if self.mode not in (MODE_URL, MODE_LOCAL, MODE_SUPABASE):
+            logger.warning(f"⚠️ FILE_STORAGE_MODE desconocido '{self.mode}', se guardan solo URLs")
+            self.mode = MODE_URL
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_URL
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(Config.FILE_MIRROR_CONCURRENCY, 1),
+                    thread_name_prefix="file-mirror"
+                )
+            return self._executor
+
+    # ===================== DESCARGA =====================
+
+    def _temp_dir(self) -> Optional[str]:
+        """Temporales junto al destino local para moverlos sin copiar"""
+        if self.mode != MODE_LOCAL:
+            return None
+        path = os.path.join(self.storage_path, '.tmp')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _download(self, url: str, destino) -> Tuple[str, int]:
+        """
+        Descargar por bloques a un archivo abierto
+
+        Returns:
+            (SHA-256 en hexadecimal, tamaño en bytes)
+
+        Raises:
+            FileTooLargeError: si supera MAX_FILE_SIZE_MB
+            httpx.HTTPError: si la descarga falla
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        timeout = httpx.Timeout(Config.FILE_DOWNLOAD_TIMEOUT_SECONDS)
+        with httpx.stream('GET', url, timeout=timeout, follow_redirects=True) as response:
+            response.raise_for_status()
+            declared = int(response.headers.get('Content-Length') or 0)
+            if declared > self.max_bytes:
+                raise FileTooLargeError(f"{declared} bytes")
+            for chunk in response.iter_bytes(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise FileTooLargeError(f"más de {self.max_bytes} bytes")
+                sha256.update(chunk)
+                destino.write(chunk)
+        return sha256.hexdigest(), size
+
+    # ===================== ALMACENAMIENTO =====================
+
+    def _store_local(self, temp_path: str, key: str) -> Tuple[str, bool]:
+        destino = os.path.join(self.storage_path, key)
+        if os.path.exists(destino):
+            return f"{self.public_url}/{key}", False
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(temp_path, destino)
+        return f"{self.public_url}/{key}", True
+
+    def _store_supabase(self, temp_path: str, key: str, content_type: Optional[str]) -> Tuple[str, bool]:
+        # Storage tiene su propio cliente HTTP en el registro: usarlo no altera
+        # la URL base de las consultas a tablas del mismo rol
+        bucket = get_client_registry().get_client(ROLE_SERVICE).storage.from_(self.bucket)
+        nuevo = not bucket.exists(key)
+        if nuevo:
+            with open(temp_path, 'rb') as archivo:
+                # El archivo abierto se envía por bloques, sin cargarlo en memoria
+                bucket.upload(key, archivo, {
+                    'content-type': content_type or 'application/octet-stream',
+                    'upsert': 'true'
+                })
+        return bucket.get_public_url(key), nuevo
+
+    def mirror(self, archivo: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copiar un adjunto y devolver su información con la URL estable
+
+        Args:
+            archivo: {'nombre', 'url', 'tipo', 'tamaño', 'airtable_id'}
+
+        Raises:
+            FileTooLargeError: si supera MAX_FILE_SIZE_MB
+            Exception: si la descarga o el almacenamiento fallan
+        """
+        declared = archivo.get('tamaño') or 0
+        if declared > self.max_bytes:
+            raise FileTooLargeError(f"{declared} bytes")
+
+        temp = tempfile.NamedTemporaryFile(dir=self._temp_dir(), delete=False)
+        try:
+            with temp:
+                sha256, size = self._download(archivo['url'], temp)
+            key = f"{sha256[:2]}/{sha256}"
+            if self.mode == MODE_LOCAL:
+                url, nuevo = self._store_local(temp.name, key)
+            else:
+                url, nuevo = self._store_supabase(temp.name, key, archivo.get('tipo'))
+        finally:
+            if os.path.exists(temp.name):
+                os.unlink(temp.name)
+
+        with self._lock:
+            self.bytes_downloaded += size
+            if nuevo:
+                self.stored += 1
+            else:
+                self.reused += 1
+        return {**archivo, 'url': url, 'tamaño': size}
+
+    def mirror_many(self, archivos: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional[Exception]]]:
+        """
+        Copiar varios adjuntos en el pool compartido
+
+        Returns:
+            Por cada adjunto, (información resultante, error o None). Si el
+            archivo supera el tamaño máximo se conserva la URL de Airtable.
+        """
+        futures = [self.executor.submit(self.mirror, archivo) for archivo in archivos]
+        results = []
+        for archivo, future in zip(archivos, futures):
+            try:
+                results.append((future.result(), None))
+            except FileTooLargeError as e:
+                with self._lock:
+                    self.too_large += 1
+                logger.warning(f"⚠️ Archivo {archivo.get('nombre')} supera {Config.MAX_FILE_SIZE_MB} MB ({e}); se guarda la URL de Airtable")
+                results.append((archivo, None))
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.error(f"❌ Error copiando archivo {archivo.get('nombre')}: {e}")
+                results.append((archivo, e))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de copia de archivos en este proceso"""
+        return {
+            "mode": self.mode,
+            "stored": self.stored,
+            "reused": self.reused,
+            "too_large": self.too_large,
+            "failed": self.failed,
+            "bytes_downloaded": self.bytes_downloaded
+        }
+
+    def shutdown(self):
+        """Cerrar el pool de descargas"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+# Instancia global
+attachment_mirror = AttachmentMirror()
+
+def get_attachment_mirror() -> AttachmentMirror:
+    """Obtener el servicio de copia de archivos"""
+    return attachment_mirror
@@ -0,0 +1,343 @@
+"""
+🧵 Cola de trabajos en background ACA 3.0
+Trabajos largos persistidos en Supabase y ejecutados por workers async
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import Config
+from app.database.supabase import async_supabase
+
+logger = logging.getLogger(__name__)
+
+# Estados de un trabajo
+STATE_PENDING = 'pendiente'
+STATE_RUNNING = 'en_curso'
+STATE_DONE = 'completado'
+STATE_FAILED = 'fallido'
+STATE_CANCELLED = 'cancelado'
+TERMINAL_STATES = (STATE_DONE, STATE_FAILED, STATE_CANCELLED)
+
+class JobDeferred(Exception):
+    """
+    El trabajo no puede ejecutarse todavía (por ejemplo, el recurso está
+    ocupado): se reprograma sin consumir un intento
+    """
+
+    def __init__(self, message: str, delay_seconds: float):
+        super().__init__(message)
+        self.delay_seconds = delay_seconds
+
+class JobContext:
+    """Trabajo en ejecución visto por su handler"""
+
+    def __init__(self, job: Dict[str, Any]):
+        self.id = job['id']
+        self.params = job.get('parametros') or {}
+        self.attempt = job.get('intentos', 1)
+        self.progress_data: Optional[Dict[str, Any]] = None
+
+    def progress(self, data: Dict[str, Any]):
+        """Informar progreso (se guarda con el siguiente latido)"""
+        self.progress_data = data
+
+JobHandler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+
+class JobQueue:
+    """
+    Cola de trabajos sobre la tabla `jobs` (ver database/migrations/jobs.sql).
+
+    Los endpoints encolan y responden de inmediato con el ID del trabajo.
+    JOBS_WORKERS workers por proceso toman trabajos con `jobs_tomar()`
+    (SKIP LOCKED), guardan un latido con el progreso cada
+    JOBS_HEARTBEAT_SECONDS y, si el trabajo falla, lo reprograman con backoff
+    hasta `max_intentos`. Un trabajo cuyo worker murió se retoma cuando su
+    latido supera JOBS_STALE_SECONDS. La cancelación se marca en la fila y el
+    worker la aplica en el siguiente latido.
+    """
+
+    TABLE = 'jobs'
+
+    def __init__(self):
+        self.workers = max(Config.JOBS_WORKERS, 1)
+        self.poll_seconds = Config.JOBS_POLL_SECONDS
+        self.heartbeat_seconds = Config.JOBS_HEARTBEAT_SECONDS
+        self.stale_seconds = Config.JOBS_STALE_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._max_attempts: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.cancelled = 0
+
+    @property
+    def wakeup(self) -> asyncio.Event:
+        """Evento creado dentro del event loop"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def register(self, tipo: str, handler: JobHandler, max_attempts: int = None):
+        """Registrar el handler de un tipo de trabajo"""
+        self._handlers[tipo] = handler
+        self._max_attempts[tipo] = max_attempts or Config.JOBS_MAX_ATTEMPTS
+
+    # ===================== API =====================
+
+    async def enqueue(self, tipo: str, parametros: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Encolar un trabajo
+
+        Raises:
+            ValueError: si el tipo no tiene handler registrado
+        """
+        if tipo not in self._handlers:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        response = await async_supabase.execute(async_supabase.table(self.TABLE).insert({
+            'tipo': tipo,
+            'parametros': parametros or {},
+            'max_intentos': self._max_attempts[tipo]
+        }))
+        job = response.data[0]
+        self.wakeup.set()
+        logger.info(f"🧵 Trabajo {tipo} encolado: {job['id']}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Obtener un trabajo por ID"""
+        response = await async_supabase.execute(
+            async_supabase.table(self.TABLE).select('*').eq('id', job_id).limit(1)
+        )
+        return response.data[0] if response.data else None
+
+    async def list_recent(self, tipo: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Trabajos más recientes"""
+        query = async_supabase.table(self.TABLE).select('*')
+        if tipo:
+            query = query.eq('tipo', tipo)
+        response = await async_supabase.execute(query.order('creado_en', desc=True).limit(limit))
+        return response.data or []
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancelar un trabajo
+
+        Uno pendiente se cancela de inmediato; uno en curso se marca y su
+        worker lo detiene en el siguiente latido. Si el latido ya venció (el
+        worker murió) se cierra aquí; si vence después, lo cierra jobs_tomar.
+        """
+        response = await async_supabase.execute(
+            async_supabase.table(self.TABLE).update({
+                'estado': STATE_CANCELLED,
+                'cancelar': True,
+                'finalizado_en': datetime.now(timezone.utc).isoformat()
+            }).eq('id', job_id).eq('estado', STATE_PENDING)
+        )
+        if response.data:
+            self.cancelled += 1
+            return response.data[0]
+        await async_supabase.execute(
+            async_supabase.table(self.TABLE).update({'cancelar': True}).eq('id', job_id).eq('estado', STATE_RUNNING)
+        )
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.stale_seconds)
+        response = await async_supabase.execute(
+            async_supabase.table(self.TABLE).update({
+                'estado': STATE_CANCELLED,
+                'finalizado_en': datetime.now(timezone.utc).isoformat()
+            }).eq('id', job_id).eq('estado', STATE_RUNNING).lt('latido_en', stale_before.isoformat())
+        )
+        if response.data:
+            self.cancelled += 1
+            return response.data[0]
+        return await self.get(job_id)
+
+    # ===================== WORKERS =====================
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Tomar el siguiente trabajo disponible"""
+        response = await async_supabase.execute(async_supabase.client.rpc('jobs_tomar', {
+            'p_worker': self.owner,
+            'p_tipos': list(self._handlers),
+            'p_stale_segundos': self.stale_seconds
+        }))
+        return response.data[0] if response.data else None
+
+    async def _update(self, job_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Actualizar la fila de un trabajo tomado por este worker"""
+        response = await async_supabase.execute(
+            async_supabase.table(self.TABLE).update(fields).eq('id', job_id).eq('worker', self.owner)
+        )
+        return response.data[0] if response.data else None
+
+    async def _finish(self, job_id: str, estado: str, **fields):
+        """Cerrar un trabajo en un estado final"""
+        await self._update(job_id, {
+            'estado': estado,
+            'finalizado_en': datetime.now(timezone.utc).isoformat(),
+            **fields
+        })
+
+    async def _execute(self, job: Dict[str, Any]):
+        """Ejecutar un trabajo con latidos, cancelación y reintentos"""
+        job_id = job['id']
+        if job['intentos'] > job['max_intentos']:
+            # Retomado tras caídas del worker más veces que las permitidas
+            self.failed += 1
+            await self._finish(job_id, STATE_FAILED, error="Se superó el máximo de intentos")
+            return
+
+        ctx = JobContext(job)
+        task = asyncio.create_task(self._handlers[job['tipo']](ctx))
+        cancel_requested = False
+        lost = False
+        last_beat = time.monotonic()
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=self.heartbeat_seconds)
+                if task.done():
+                    break
+                try:
+                    row = await self._update(job_id, {
+                        'latido_en': datetime.now(timezone.utc).isoformat(),
+                        'progreso': ctx.progress_data
+                    })
+                except Exception as e:
+                    # El trabajo sigue; solo se abandona si el latido ya venció
+                    # y otro worker puede haberlo retomado
+                    logger.warning(f"⚠️ Error registrando latido del trabajo {job_id}: {e}")
+                    if time.monotonic() - last_beat >= self.stale_seconds and not lost:
+                        logger.error(f"❌ Trabajo {job_id} sin latido por {self.stale_seconds}s, se detiene")
+                        lost = True
+                        task.cancel()
+                    continue
+                last_beat = time.monotonic()
+                if row is None:
+                    # La fila ya no es de este worker: otro la retomó por latido
+                    # vencido. Seguir ejecutando duplicaría el trabajo.
+                    logger.error(f"❌ Trabajo {job_id} retomado por otro worker, se detiene aquí")
+                    lost = True
+                    task.cancel()
+                    break
+                if row.get('cancelar'):
+                    cancel_requested = True
+                    task.cancel()
+        except asyncio.CancelledError:
+            # Cierre de la aplicación: el trabajo queda en curso y se retoma
+            # cuando su latido venza
+            task.cancel()
+            raise
+
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if lost:
+                # Lo retoma el worker que encuentre el latido vencido
+                return
+            if not cancel_requested:
+                raise
+            self.cancelled += 1
+            logger.info(f"🛑 Trabajo {job_id} cancelado")
+            await self._finish(job_id, STATE_CANCELLED, progreso=ctx.progress_data)
+            return
+        except JobDeferred as e:
+            logger.info(f"⏸️ Trabajo {job['tipo']} {job_id} reprogramado en {e.delay_seconds:.0f}s: {e}")
+            await self._update(job_id, {
+                'estado': STATE_PENDING,
+                # jobs_tomar sumó un intento al tomarlo
+                'intentos': job['intentos'] - 1,
+                'progreso': ctx.progress_data,
+                'disponible_en': (datetime.now(timezone.utc) + timedelta(seconds=e.delay_seconds)).isoformat()
+            })
+            return
+        except Exception as e:
+            logger.error(f"❌ Trabajo {job['tipo']} {job_id} falló (intento {job['intentos']}): {e}")
+            if job['intentos'] < job['max_intentos']:
+                self.retried += 1
+                backoff = Config.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (job['intentos'] - 1)
+                await self._update(job_id, {
+                    'estado': STATE_PENDING,
+                    'error': str(e),
+                    'progreso': ctx.progress_data,
+                    'disponible_en': (datetime.now(timezone.utc) + timedelta(seconds=backoff)).isoformat()
+                })
+            else:
+                self.failed += 1
+                await self._finish(job_id, STATE_FAILED, error=str(e), progreso=ctx.progress_data)
+            return
+
+        if lost:
+            # Terminó antes de atender la cancelación; la fila ya no es de este worker
+            return
+        self.completed += 1
+        await self._finish(job_id, STATE_DONE, resultado=result, progreso=ctx.progress_data, error=None)
+        logger.info(f"✅ Trabajo {job['tipo']} {job_id} completado")
+
+    async def _worker(self, numero: int):
+        """Bucle de un worker"""
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Error tomando trabajos de la cola: {e}")
+                job = None
+
+            if job is None:
+                self.wakeup.clear()
+                # asyncio.wait (no wait_for): wait_for puede tragarse la
+                # cancelación si el evento se activa en el mismo instante
+                waiter = asyncio.ensure_future(self.wakeup.wait())
+                try:
+                    await asyncio.wait({waiter}, timeout=self.poll_seconds)
+                finally:
+                    waiter.cancel()
+                continue
+
+            logger.info(f"🧵 Worker {numero} ejecutando trabajo {job['tipo']} {job['id']}")
+            try:
+                await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error ejecutando trabajo {job['id']}: {e}")
+
+    def start(self):
+        """Iniciar los workers"""
+        if not self._handlers or any(not task.done() for task in self._tasks):
+            return
+        self._tasks = [asyncio.create_task(self._worker(numero)) for numero in range(self.workers)]
+        logger.info(f"🧵 Cola de trabajos iniciada con {self.workers} workers")
+
+    async def stop(self):
+        """Detener los workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtener estadísticas de la cola en este proceso"""
+        return {
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "types": sorted(self._handlers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "cancelled": self.cancelled
+        }
+
+# Instancia global
+job_queue = JobQueue()
+
+def get_job_queue() -> JobQueue:
+    """Obtener la cola de trabajos"""
+    return job_queue
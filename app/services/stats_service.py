@@ -0,0 +1,103 @@
+"""
+📊 Servicio de Estadísticas ACA 3.0
+Conteos y agregados calculados en Supabase sin descargar filas
+"""
+
+import logging
+from typing import Dict, Any
+from ..database.supabase import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Tablas contadas para dashboard y sincronización
+COUNTED_TABLES = (
+    'empresas',
+    'reportes_mensuales',
+    'info_compania',
+    'archivos_reportes',
+    'archivos_info_compania'
+)
+
+class StatsService:
+    """
+    Estadísticas de Supabase para dashboard y sincronización.
+
+    Usa la función `estadisticas_dashboard()` (una sola llamada RPC). Si la
+    migración no está instalada cae a conteos head-only por tabla y a la vista
+    `vista_reportes_por_tipo`; en ningún caso se transfieren filas completas.
+    """
+
+    def __init__(self):
+        """Inicializar servicio de estadísticas"""
+        self.supabase = get_supabase_client()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener conteos por tabla y reportes por tipo
+
+        Returns:
+            {"counts": {tabla: total}, "reportes_por_tipo": {tipo: total},
+             "archivos_reportes_bytes": total}; si alguna consulta falla se
+            agrega "error" y los valores afectados quedan en 0
+        """
+        try:
+            response = self.supabase.client.rpc('estadisticas_dashboard', {}).execute()
+            data = response.data or {}
+            return {
+                "counts": {table: data.get(table, 0) for table in COUNTED_TABLES},
+                "reportes_por_tipo": data.get('reportes_por_tipo') or {},
+                "archivos_reportes_bytes": data.get('archivos_reportes_bytes', 0)
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ RPC estadisticas_dashboard no disponible, usando conteos por tabla: {e}")
+
+        errors = []
+        counts = {}
+        for table in COUNTED_TABLES:
+            try:
+                counts[table] = self._count_exact(table)
+            except Exception as e:
+                logger.error(f"Error contando registros de {table}: {e}")
+                errors.append(f"{table}: {e}")
+                counts[table] = 0
+        try:
+            reportes_por_tipo = self._get_reportes_por_tipo()
+        except Exception as e:
+            logger.error(f"Error obteniendo reportes por tipo: {e}")
+            errors.append(f"reportes_por_tipo: {e}")
+            reportes_por_tipo = {}
+
+        stats = {
+            "counts": counts,
+            "reportes_por_tipo": reportes_por_tipo,
+            # La suma de tamaños requiere la función RPC
+            "archivos_reportes_bytes": 0
+        }
+        if errors:
+            stats["error"] = "; ".join(errors)
+        return stats
+
+    def _count_exact(self, table_name: str) -> int:
+        """Contar filas de una tabla sin transferirlas (HEAD + count=exact)"""
+        response = self.supabase.table(table_name).select('id', count='exact', head=True).execute()
+        return response.count or 0
+
+    def count(self, table_name: str) -> int:
+        """Contar filas de una tabla sin transferirlas (0 si falla)"""
+        try:
+            return self._count_exact(table_name)
+        except Exception as e:
+            logger.error(f"Error contando registros de {table_name}: {e}")
+            return 0
+
+    def _get_reportes_por_tipo(self) -> Dict[str, int]:
+        """Reportes agrupados por tipo desde la vista agregada"""
+        response = self.supabase.table('vista_reportes_por_tipo').select('tipo_reporte, total').execute()
+        return {row['tipo_reporte']: row['total'] for row in response.data}
+
+# Instancia global del servicio
+stats_service = StatsService()
+
+def get_stats_service() -> StatsService:
+    """Obtener instancia del servicio de estadísticas"""
+    return stats_service
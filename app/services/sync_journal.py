@@ -0,0 +1,135 @@
+"""
+📒 Bitácora de sincronización ACA 3.0
+Ejecuciones y etapa de cada registro para reanudar sincronizaciones interrumpidas
+"""
+
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from ..database.supabase import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Etapas de un registro dentro de una ejecución
+STAGE_RESOLVED = 'resolved'
+STAGE_WRITTEN = 'written'
+STAGE_ACKNOWLEDGED = 'acknowledged'
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Timestamp de Postgres → datetime (Python 3.9 solo acepta 3 o 6 decimales)"""
+    if not value:
+        return None
+    value = value.replace('Z', '+00:00')
+    match = re.match(r'^(.*\.)(\d+)(.*)$', value)
+    if match:
+        value = match.group(1) + match.group(2).ljust(6, '0')[:6] + match.group(3)
+    return datetime.fromisoformat(value)
+
+class SyncJournal:
+    """
+    Acceso a `sync_runs` / `sync_run_items` (ver database/migrations/sync_journal.sql).
+
+    La bitácora es de mejor esfuerzo: un error al escribirla se registra en el
+    log pero no detiene la sincronización (reprocesar un registro es idempotente).
+    """
+
+    def __init__(self):
+        """Inicializar acceso a la bitácora"""
+        self.supabase = get_supabase_client()
+
+    def start_run(self, modo: str, iniciado_en: datetime, desde: Optional[datetime] = None) -> Optional[str]:
+        """Registrar el inicio de una ejecución y devolver su ID"""
+        try:
+            response = self.supabase.table('sync_runs').insert({
+                'modo': modo,
+                'estado': 'en_curso',
+                'desde': desde.isoformat() if desde else None,
+                'iniciado_en': iniciado_en.isoformat()
+            }).execute()
+            return response.data[0]['id'] if response.data else None
+        except Exception as e:
+            logger.error(f"Error registrando inicio de sincronización: {e}")
+            return None
+
+    def finish_run(self, run_id: Optional[str], estado: str, resumen: Dict[str, Any]):
+        """Registrar el fin de una ejecución (completada / fallida)"""
+        if not run_id:
+            return
+        try:
+            self.supabase.table('sync_runs').update({
+                'estado': estado,
+                'finalizado_en': datetime.now(timezone.utc).isoformat(),
+                'resumen': resumen
+            }).eq('id', run_id).execute()
+        except Exception as e:
+            logger.error(f"Error registrando fin de sincronización {run_id}: {e}")
+
+    def record(self, run_id: Optional[str], etapa: str, items: List[Dict[str, Any]]):
+        """
+        Registrar la etapa alcanzada por varios registros en una sola escritura
+
+        Args:
+            run_id: Ejecución
+            etapa: resolved / written / acknowledged
+            items: Dicts con airtable_id, empresa_id y supabase_id (se sobrescriben
+                en cada etapa, por lo que deben venir completos)
+        """
+        if not run_id or not items:
+            return
+        ahora = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {
+                'run_id': run_id,
+                'airtable_id': item['airtable_id'],
+                'etapa': etapa,
+                'empresa_id': item.get('empresa_id'),
+                'supabase_id': item.get('supabase_id'),
+                'actualizado_en': ahora
+            }
+            for item in items
+        ]
+        try:
+            self.supabase.table('sync_run_items').upsert(rows, on_conflict='run_id,airtable_id').execute()
+        except Exception as e:
+            logger.error(f"Error registrando etapa '{etapa}' de {len(rows)} registros: {e}")
+
+    def get_resumable_run(self) -> Optional[Dict[str, Any]]:
+        """
+        Última ejecución si quedó sin completar (interrumpida o fallida)
+
+        Las ejecuciones por webhook cubren solo algunos registros y no se
+        consideran: lo que dejen pendiente lo recoge la siguiente incremental.
+
+        Returns:
+            Fila de sync_runs con `desde` e `iniciado_en` como datetime, o None
+        """
+        response = self.supabase.table('sync_runs').select('*').neq('modo', 'webhook') \
+            .order('iniciado_en', desc=True).limit(1).execute()
+        if not response.data or response.data[0]['estado'] == 'completada':
+            return None
+        run = response.data[0]
+        run['desde'] = _parse_timestamp(run.get('desde'))
+        run['iniciado_en'] = _parse_timestamp(run.get('iniciado_en'))
+        return run
+
+    def get_items(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """Registros de una ejecución por airtable_id"""
+        items = {}
+        inicio = 0
+        while True:
+            response = self.supabase.table('sync_run_items').select('airtable_id, etapa, empresa_id, supabase_id') \
+                .eq('run_id', run_id).order('airtable_id').range(inicio, inicio + 999).execute()
+            filas = response.data or []
+            for fila in filas:
+                items[fila['airtable_id']] = fila
+            if len(filas) < 1000:
+                return items
+            inicio += 1000
+
+# Instancia global
+sync_journal = SyncJournal()
+
+def get_sync_journal() -> SyncJournal:
+    """Obtener acceso a la bitácora de sincronización"""
+    return sync_journal
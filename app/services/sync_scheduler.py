@@ -0,0 +1,261 @@
+"""
+⏰ Sincronización programada ACA 3.0
+Ejecuciones periódicas y manuales de Airtable → Supabase sin solaparse
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import Config
+from app.services.sync_service import get_sync_service
+from app.services.sync_state import get_sync_state
+from app.services.job_queue import JobContext, JobDeferred
+
+logger = logging.getLogger(__name__)
+
+class SyncScheduler:
+    """
+    Punto único de entrada para ejecutar la sincronización.
+
+    Cada ejecución (manual o programada) pasa por un lock local y por un lock
+    en Supabase (`sync_lock_adquirir`), de modo que no se solapan ni dentro
+    del proceso ni entre workers. Si ya hay una en curso, la nueva se rechaza.
+    El lock de Supabase se renueva mientras la ejecución sigue en curso.
+    El resultado de la última ejecución se guarda en `sync_estado`.
+    """
+
+    LOCK_NAME = 'airtable_sync'
+    LAST_RUN_KEY = 'airtable_last_run'
+
+    def __init__(self):
+        self.interval_seconds = Config.SYNC_INTERVAL_MINUTES * 60
+        self.jitter_seconds = Config.SYNC_JITTER_SECONDS
+        self.lock_ttl_seconds = Config.SYNC_LOCK_TTL_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.next_run_at: Optional[datetime] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.rejected = 0
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Lock local creado dentro del event loop"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def running(self) -> bool:
+        return self._lock is not None and self._lock.locked()
+
+    def _busy(self) -> Dict[str, Any]:
+        self.rejected += 1
+        return {
+            "success": False,
+            "message": "Ya hay una sincronización en curso",
+            "details": {"busy": True}
+        }
+
+    async def run(
+        self,
+        trigger: str = "manual",
+        full_resync: bool = False,
+        resume: bool = False,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        record_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Ejecutar una sincronización si no hay otra en curso
+
+        Args:
+            trigger: Origen de la ejecución (manual / scheduled / job / webhook)
+            full_resync: Ignorar la marca de agua
+            resume: Reanudar la última ejecución sin completar
+            progress: Callback de progreso de SyncService
+            record_ids: Sincronizar solo estos registros de Airtable
+
+        Returns:
+            Resultado de SyncService.sync_from_airtable
+        """
+        if self.lock.locked():
+            return self._busy()
+
+        async with self.lock:
+            state = get_sync_state()
+            acquired = await asyncio.to_thread(state.try_lock, self.LOCK_NAME, self.owner, self.lock_ttl_seconds)
+            if acquired is False:
+                logger.info("⏭️ Sincronización omitida: otro worker la está ejecutando")
+                return self._busy()
+
+            started_at = datetime.now(timezone.utc)
+            sync = get_sync_service().sync_from_airtable(
+                full_resync=full_resync, resume=resume, progress=progress, record_ids=record_ids
+            )
+            try:
+                if acquired:
+                    result = await self._run_with_lease(sync)
+                else:
+                    # Sin lock en Supabase (función no instalada): solo el local
+                    result = await sync
+            finally:
+                if acquired:
+                    await asyncio.to_thread(state.unlock, self.LOCK_NAME, self.owner)
+
+            finished_at = datetime.now(timezone.utc)
+            details = result.get("details") or {}
+            self.last_run = {
+                "trigger": trigger,
+                "started_at": started_at.isoformat(),
+                "finished_at": finished_at.isoformat(),
+                "duration_seconds": round((finished_at - started_at).total_seconds(), 2),
+                "success": result.get("success", False),
+                "message": result.get("message"),
+                "mode": details.get("mode"),
+                "processed": details.get("processed", 0),
+                "failed": details.get("failed", 0),
+                "skipped": details.get("skipped", 0)
+            }
+            await asyncio.to_thread(state.set, self.LAST_RUN_KEY, self.last_run)
+            return result
+
+    async def _run_with_lease(self, sync) -> Dict[str, Any]:
+        """
+        Ejecutar la sincronización renovando el lock de Supabase
+
+        El lease se renueva cada tercio de SYNC_LOCK_TTL_SECONDS. Si otro
+        worker lo tomó, o no se pudo renovar antes de que venza, la
+        sincronización se detiene para no solaparse con la de ese worker
+        (la siguiente ejecución la retoma desde el journal).
+        """
+        state = get_sync_state()
+        task = asyncio.ensure_future(sync)
+        renew_seconds = max(self.lock_ttl_seconds / 3, 1)
+        renewed_at = time.monotonic()
+        lost = None
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=renew_seconds)
+                if task.done():
+                    break
+                renewed = await asyncio.to_thread(state.try_lock, self.LOCK_NAME, self.owner, self.lock_ttl_seconds)
+                if renewed:
+                    renewed_at = time.monotonic()
+                    continue
+                if renewed is False:
+                    lost = "otro worker tomó el lock"
+                elif time.monotonic() - renewed_at >= self.lock_ttl_seconds:
+                    lost = "no se pudo renovar el lock antes de su vencimiento"
+                else:
+                    continue
+                logger.error(f"❌ Sincronización detenida: {lost}")
+                task.cancel()
+                break
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if lost is None:
+                raise
+            return {
+                "success": False,
+                "message": f"Sincronización detenida: {lost}",
+                "details": {"lock_lost": True}
+            }
+
+    def _next_delay(self) -> float:
+        """Intervalo con variación aleatoria para no coincidir entre workers"""
+        return self.interval_seconds + random.uniform(0, self.jitter_seconds)
+
+    async def _loop(self):
+        """Bucle de sincronización periódica"""
+        while True:
+            delay = self._next_delay()
+            self.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+            try:
+                result = await self.run(trigger="scheduled")
+                logger.info(f"⏰ Sincronización programada: {result.get('message')}")
+            except Exception as e:
+                logger.error(f"Error en sincronización programada: {e}")
+
+    def start(self):
+        """Iniciar la sincronización periódica (si ENABLE_AUTO_SYNC y Airtable están activos)"""
+        if not Config.ENABLE_AUTO_SYNC:
+            logger.info("⏰ Sincronización automática desactivada (ENABLE_AUTO_SYNC=false)")
+            return
+        if not get_sync_service().airtable.enabled:
+            logger.info("⏰ Sincronización automática no iniciada: Airtable no está configurado")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"⏰ Sincronización automática cada {Config.SYNC_INTERVAL_MINUTES} minutos")
+
+    async def stop(self):
+        """Detener la sincronización periódica"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.next_run_at = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estado del programador y última ejecución
+
+        La última ejecución se lee de sync_estado para incluir las de otros
+        workers; si no está disponible se usa la de este proceso.
+        """
+        last_run = get_sync_state().get(self.LAST_RUN_KEY) or self.last_run
+        return {
+            "auto_sync": self._task is not None and not self._task.done(),
+            "interval_minutes": Config.SYNC_INTERVAL_MINUTES,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "running": self.running,
+            "rejected": self.rejected,
+            "last_run": last_run
+        }
+
+# Instancia global
+sync_scheduler = SyncScheduler()
+
+def get_sync_scheduler() -> SyncScheduler:
+    """Obtener el programador de sincronización"""
+    return sync_scheduler
+
+# Tipo de trabajo de la cola para sincronizaciones manuales
+SYNC_JOB_TYPE = 'sync_airtable'
+
+async def run_sync_job(job: JobContext) -> Dict[str, Any]:
+    """
+    Handler de la cola de trabajos para POST /sync/airtable
+
+    Raises:
+        JobDeferred: si ya hay una sincronización en curso (se reprograma
+            sin consumir intentos)
+        RuntimeError: si la sincronización no se pudo ejecutar (la cola reintenta)
+    """
+    result = await sync_scheduler.run(
+        trigger="job",
+        full_resync=bool(job.params.get('full')),
+        resume=bool(job.params.get('resume')),
+        progress=job.progress
+    )
+    if (result.get("details") or {}).get("busy"):
+        raise JobDeferred(result["message"], Config.JOBS_RETRY_BACKOFF_SECONDS)
+    if not result.get("success"):
+        raise RuntimeError(result.get("message") or "Error en sincronización")
+    return result
@@ -3,11 +3,20 @@
 Sincronización entre Airtable → Supabase
 """
 
+import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from .airtable_service import get_airtable_service
+from .airtable_mirror import get_airtable_mirror
 from ..database.supabase import get_supabase_client
+from .stats_service import get_stats_service
+from .sync_state import get_sync_state
+from .sync_journal import get_sync_journal, STAGE_RESOLVED, STAGE_WRITTEN, STAGE_ACKNOWLEDGED
+from .empresa_resolver import EmpresaResolver
+from .file_mirror import get_attachment_mirror
+from .document_classifier import DocumentClassifier
+from ..config import Config
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -21,12 +30,57 @@ class SyncService:
     def __init__(self):
         """Inicializar servicio de sincronización"""
         self.airtable = get_airtable_service()
+        self.airtable_mirror = get_airtable_mirror()
         self.supabase = get_supabase_client()
+        self.stats = get_stats_service()
+        self.state = get_sync_state()
+        self.journal = get_sync_journal()
+        self.mirror = get_attachment_mirror()
+        self.classifier = DocumentClassifier(self.supabase)
         
-    def sync_from_airtable(self) -> Dict[str, Any]:
+    # Clave en sync_estado con la marca de agua de la última sincronización exitosa
+    WATERMARK_KEY = 'airtable_watermark'
+    
+    # Campos de Airtable que usa la sincronización (el resto no se descarga)
+    SYNC_FIELDS = ['Empresa', 'Tipo documento', 'Archivo adjunto', 'Comentarios']
+    
+    async def sync_from_airtable(
+        self,
+        full_resync: bool = False,
+        resume: bool = False,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        record_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Sincronizar registros desde Airtable hacia Supabase
         
+        Por defecto es incremental: solo se piden a Airtable los registros
+        pendientes modificados desde la última sincronización exitosa.
+        
+        Pipeline por etapas conectadas con colas acotadas:
+        páginas de Airtable → resolución de empresa → escritura en Supabase
+        (SYNC_WRITE_WORKERS en paralelo) → marcado en Airtable. La página
+        siguiente se pide mientras la actual se escribe.
+        
+        Cada ejecución y la etapa de cada registro quedan en la bitácora
+        (sync_runs / sync_run_items). Con `resume` se continúa la última
+        ejecución interrumpida: los registros ya escritos solo se marcan en
+        Airtable y no se vuelven a escribir.
+        
+        Con `record_ids` (webhook de Airtable) solo se leen esos registros, si
+        siguen pendientes, y la marca de agua no se modifica.
+        
+        Una ejecución completada siempre avanza la marca de agua. Los registros
+        omitidos o fallidos no cambian en Airtable y quedarían fuera de la
+        ventana siguiente, así que sus IDs se guardan junto a la marca y la
+        próxima ejecución incremental los vuelve a leer por ID.
+        
+        Args:
+            full_resync: Ignorar la marca de agua y recorrer todos los pendientes
+            resume: Reanudar la última ejecución sin completar
+            progress: Callback con los contadores tras cada lote marcado
+            record_ids: Sincronizar solo estos registros de Airtable
+        
         Returns:
             Resultado de la sincronización
         """
@@ -37,86 +91,92 @@ class SyncService:
                 "details": {}
             }
         
+        run_id = None
         try:
-            # Obtener registros pendientes de Airtable
-            pending_records = self.airtable.get_pending_records()
+            run = await asyncio.to_thread(self.journal.get_resumable_run) if resume and record_ids is None else None
+            retry_ids: List[str] = []
+            if record_ids is not None:
+                # Registros avisados por un webhook: sin ventana de fechas
+                run_started_at = datetime.now(timezone.utc)
+                modified_since = None
+                mode = "webhook"
+                run_id = await asyncio.to_thread(self.journal.start_run, mode, run_started_at, None)
+            elif run:
+                # Misma ventana y misma marca de agua que la ejecución interrumpida
+                run_id = run['id']
+                run_started_at = run['iniciado_en']
+                modified_since = run['desde']
+                mode = "resume"
+                if modified_since:
+                    retry_ids = await asyncio.to_thread(self._get_retry_ids)
+            else:
+                if resume:
+                    logger.info("📒 No hay sincronización interrumpida para reanudar")
+                # La marca de agua se toma antes de leer: lo modificado durante la
+                # ejecución se vuelve a evaluar en la siguiente
+                run_started_at = datetime.now(timezone.utc)
+                modified_since = None if full_resync else await asyncio.to_thread(self._get_watermark)
+                mode = "incremental" if modified_since else "full"
+                if modified_since:
+                    # Un recorrido completo ya incluye los pendientes de antes
+                    retry_ids = await asyncio.to_thread(self._get_retry_ids)
+                run_id = await asyncio.to_thread(self.journal.start_run, mode, run_started_at, modified_since)
+            
+            results = {
+                "processed": 0,
+                "failed": 0,
+                "skipped": 0,
+                "errors": [],
+                "mode": mode,
+                "unresolved_empresas": []
+            }
+            # IDs omitidos o fallidos en esta ejecución (no se devuelven)
+            pending_ids: set = set()
+            
+            logger.info(f"🔄 Iniciando sincronización {mode}")
             
-            if not pending_records:
+            # Empresas activas en memoria: una sola consulta por ejecución
+            # (se carga mientras llega la primera página)
+            empresas = EmpresaResolver(self.supabase)
+            
+            # Reanudación: los ya escritos solo se marcan y no vuelven a escribirse
+            exclude = await self._resume_run(run_id, results, pending_ids) if run else set()
+            
+            total = await self._run_pipeline(
+                modified_since, empresas, results, run_id, exclude, progress, record_ids, retry_ids, pending_ids
+            )
+            total += len(exclude)
+            
+            if total == 0:
+                if mode != "webhook":
+                    await asyncio.to_thread(self._save_watermark, run_started_at, mode, [])
+                await asyncio.to_thread(self.journal.finish_run, run_id, 'completada', {"processed": 0, "failed": 0, "skipped": 0})
                 return {
                     "success": True,
                     "message": "No hay registros pendientes para sincronizar",
                     "details": {
                         "processed": 0,
                         "failed": 0,
-                        "skipped": 0
+                        "skipped": 0,
+                        "mode": mode
                     }
                 }
             
-            results = {
-                "processed": 0,
-                "failed": 0,
-                "skipped": 0,
-                "errors": []
-            }
+            results["unresolved_empresas"] = empresas.unresolved
+            if results["unresolved_empresas"]:
+                logger.warning(f"⚠️ Empresas no encontradas en Supabase: {', '.join(results['unresolved_empresas'])}")
+                logger.info("💡 Asegúrate de que el RUT coincida o usa formato 'Nombre (RUT)'")
             
-            logger.info(f"🔄 Iniciando sincronización de {len(pending_records)} registros")
+            # La marca avanza siempre; los omitidos o fallidos se reintentan por ID.
+            # Un webhook cubre solo algunos registros y no la mueve.
+            if mode != "webhook":
+                await asyncio.to_thread(self._save_watermark, run_started_at, mode, sorted(pending_ids))
+                if pending_ids:
+                    logger.info(f"🔁 {len(pending_ids)} registros omitidos o fallidos se reintentarán en la siguiente sincronización")
             
-            for record in pending_records:
-                try:
-                    # Validar que el registro tenga empresa
-                    empresa_name = record.get('empresa')
-                    if not empresa_name:
-                        logger.warning(f"⚠️ Registro {record['id']} sin empresa")
-                        results["skipped"] += 1
-                        continue
-                    
-                    # Limpiar espacios extra
-                    empresa_name = empresa_name.strip() if isinstance(empresa_name, str) else empresa_name
-                    
-                    # Buscar empresa en Supabase (por RUT o nombre)
-                    empresa = self._get_empresa_by_name(empresa_name)
-                    if not empresa:
-                        logger.warning(f"⚠️ Empresa '{empresa_name}' no encontrada en Supabase")
-                        logger.info("💡 Asegúrate de que el RUT coincida o usa formato 'Nombre (RUT)'")
-                        results["skipped"] += 1
-                        continue
-                    
-                    # Procesar archivos si existen
-                    archivos_info = []
-                    archivos = record.get('archivos', [])
-                    for archivo in archivos:
-                        archivo_info = {
-                            'nombre': archivo.get('filename'),
-                            'url': archivo.get('url'),
-                            'tipo': archivo.get('type'),
-                            'tamaño': archivo.get('size'),
-                            'airtable_id': archivo.get('id')
-                        }
-                        archivos_info.append(archivo_info)
-                    
-                    # Determinar tipo de documento y tabla destino
-                    tipo_documento = record.get('tipo_documento', '')
-                    if self._is_reporte_mensual(tipo_documento):
-                        # Sincronizar como reporte mensual
-                        supabase_id = self._sync_reporte_mensual(record, empresa['id'], archivos_info)
-                    else:
-                        # Sincronizar como información de compañía
-                        supabase_id = self._sync_info_compania(record, empresa['id'], archivos_info)
-                    
-                    if supabase_id:
-                        # Marcar como procesado en Airtable
-                        self.airtable.mark_as_processed(record['id'], supabase_id)
-                        results["processed"] += 1
-                        logger.info(f"✅ Registro {record['id']} procesado exitosamente")
-                    else:
-                        results["failed"] += 1
-                        logger.error(f"❌ Error procesando registro {record['id']}")
-                
-                except Exception as e:
-                    results["failed"] += 1
-                    error_msg = f"Error procesando registro {record['id']}: {str(e)}"
-                    results["errors"].append(error_msg)
-                    logger.error(f"❌ {error_msg}")
+            await asyncio.to_thread(self.journal.finish_run, run_id, 'completada', {
+                key: results[key] for key in ("processed", "failed", "skipped", "mode")
+            })
             
             # Log final
             logger.info(f"🎉 Sincronización completada: {results['processed']} procesados, {results['failed']} fallidos, {results['skipped']} omitidos")
@@ -130,81 +190,433 @@ class SyncService:
         except Exception as e:
             error_msg = f"Error en sincronización: {str(e)}"
             logger.error(f"❌ {error_msg}")
+            await asyncio.to_thread(self.journal.finish_run, run_id, 'fallida', {"error": str(e)})
             return {
                 "success": False,
                 "message": error_msg,
                 "details": {}
             }
     
-    def _get_empresa_by_name(self, nombre: str) -> Optional[Dict[str, Any]]:
-        """Buscar empresa por nombre o RUT en Supabase"""
+    async def _resume_run(self, run_id: str, results: Dict[str, Any], pending_ids: set) -> set:
+        """
+        Retomar una ejecución desde la bitácora
+        
+        Marca en Airtable los registros que quedaron escritos sin marcar.
+        
+        Returns:
+            IDs de Airtable ya escritos, que el pipeline debe omitir
+        """
+        items = await asyncio.to_thread(self.journal.get_items, run_id)
+        written = [item for item in items.values() if item['etapa'] == STAGE_WRITTEN]
+        acknowledged = [item for item in items.values() if item['etapa'] == STAGE_ACKNOWLEDGED]
+        logger.info(f"📒 Reanudando sincronización {run_id}: {len(written)} escritos sin marcar, {len(acknowledged)} ya marcados")
+        
+        await self._acknowledge(written, results, run_id, pending_ids)
+        return {item['airtable_id'] for item in written + acknowledged}
+    
+    async def _acknowledge(
+        self,
+        written: List[Dict[str, Any]],
+        results: Dict[str, Any],
+        run_id: Optional[str],
+        pending_ids: Optional[set] = None
+    ):
+        """Marcar registros escritos como procesados en Airtable y en la bitácora"""
+        if not written:
+            return
+        pares = [(item['airtable_id'], item['supabase_id']) for item in written]
+        no_marcados = set(await asyncio.to_thread(self.airtable.mark_many_as_processed, pares))
+        marcados = []
+        for item in written:
+            if item['airtable_id'] in no_marcados:
+                # Sigue pendiente en Airtable: se reprocesa en la siguiente ejecución
+                results["failed"] += 1
+                results["errors"].append(f"Error marcando como procesado el registro {item['airtable_id']}")
+                if pending_ids is not None:
+                    pending_ids.add(item['airtable_id'])
+            else:
+                results["processed"] += 1
+                marcados.append(item)
+        await asyncio.to_thread(self.journal.record, run_id, STAGE_ACKNOWLEDGED, marcados)
+        await asyncio.to_thread(self.airtable_mirror.mark_processed, [item['airtable_id'] for item in marcados])
+    
+    async def _run_pipeline(
+        self,
+        modified_since: Optional[datetime],
+        empresas: EmpresaResolver,
+        results: Dict[str, Any],
+        run_id: Optional[str] = None,
+        exclude: Optional[set] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        record_ids: Optional[List[str]] = None,
+        retry_ids: Optional[List[str]] = None,
+        pending_ids: Optional[set] = None
+    ) -> int:
+        """
+        Ejecutar las etapas de la sincronización
+        
+        Las llamadas a Airtable y Supabase son bloqueantes y corren en hilos;
+        los contadores de `results` solo se actualizan desde el event loop.
+        
+        Args:
+            run_id: Ejecución de la bitácora
+            exclude: IDs de Airtable ya escritos en esta ejecución (reanudación)
+            progress: Callback con los contadores tras cada lote marcado
+            record_ids: Leer solo estos registros en lugar de la ventana de `modified_since`
+            retry_ids: Registros pendientes de ejecuciones anteriores, leídos
+                por ID además de la ventana
+            pending_ids: Se completa con los IDs omitidos o fallidos
+        
+        Returns:
+            Total de registros pendientes leídos de Airtable (sin los excluidos)
+        
+        Raises:
+            Exception: si falla la lectura de Airtable o la carga de empresas
+        """
+        queue_size = Config.SYNC_PIPELINE_QUEUE_SIZE
+        pages: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        acks: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        writers = max(Config.SYNC_WRITE_WORKERS, 1)
+        total = 0
+        if pending_ids is None:
+            pending_ids = set()
+        
+        async def fetch_pages():
+            """Etapa 1: páginas de registros pendientes"""
+            nonlocal total
+            if record_ids is not None:
+                iterators = [lambda: self.airtable.iterate_pending_pages_by_ids(record_ids, fields=self.SYNC_FIELDS)]
+            else:
+                iterators = [lambda: self.airtable.iterate_pending_pages(modified_since, fields=self.SYNC_FIELDS)]
+                if retry_ids:
+                    # Después de la ventana, los pendientes anteriores que no aparecieron en ella
+                    iterators.append(lambda: self.airtable.iterate_pending_pages_by_ids(
+                        [record_id for record_id in retry_ids if record_id not in seen], fields=self.SYNC_FIELDS
+                    ))
+            seen = set(exclude or ())
+            try:
+                for make_iterator in iterators:
+                    iterator = make_iterator()
+                    while True:
+                        page = await asyncio.to_thread(next, iterator, None)
+                        if page is None:
+                            break
+                        page = [record for record in page if record['id'] not in seen]
+                        seen.update(record['id'] for record in page)
+                        total += len(page)
+                        await pages.put(page)
+            finally:
+                await pages.put(None)
+        
+        async def resolve():
+            """Etapa 2: validar empresa y armar lotes de escritura"""
+            try:
+                await loading
+                while True:
+                    page = await pages.get()
+                    if page is None:
+                        break
+                    items = [item for item in (self._prepare_record(record, empresas, results) for record in page) if item]
+                    prepared = {item['record']['id'] for item in items}
+                    pending_ids.update(record['id'] for record in page if record['id'] not in prepared)
+                    await asyncio.to_thread(self.journal.record, run_id, STAGE_RESOLVED, [
+                        {'airtable_id': item['record']['id'], 'empresa_id': item['empresa_id']} for item in items
+                    ])
+                    for inicio in range(0, len(items), Config.SYNC_BATCH_SIZE):
+                        await batches.put(items[inicio:inicio + Config.SYNC_BATCH_SIZE])
+            finally:
+                for _ in range(writers):
+                    await batches.put(None)
+        
+        async def write():
+            """Etapa 3: filas y archivos en Supabase"""
+            while True:
+                batch = await batches.get()
+                if batch is None:
+                    break
+                written, errors = await asyncio.to_thread(self._write_batch, batch)
+                results["failed"] += len(batch) - len(written)
+                escritos = {item['airtable_id'] for item in written}
+                pending_ids.update(item['record']['id'] for item in batch if item['record']['id'] not in escritos)
+                results["errors"].extend(errors)
+                await asyncio.to_thread(self.journal.record, run_id, STAGE_WRITTEN, written)
+                if written:
+                    await acks.put(written)
+        
+        async def acknowledge():
+            """Etapa 4: marcar como procesados en Airtable (batch_update de a 10)"""
+            while True:
+                written = await acks.get()
+                if written is None:
+                    break
+                await self._acknowledge(written, results, run_id, pending_ids)
+                if progress:
+                    progress({
+                        "read": total,
+                        **{key: results[key] for key in ("processed", "failed", "skipped")}
+                    })
+        
+        async def write_all():
+            try:
+                await asyncio.gather(*(write() for _ in range(writers)))
+            finally:
+                await acks.put(None)
+        
+        # Empresas y reglas de clasificación se cargan mientras llega la primera página
+        loading = asyncio.ensure_future(asyncio.gather(
+            asyncio.to_thread(empresas.load),
+            asyncio.to_thread(self.classifier.load)
+        ))
+        tasks = [
+            asyncio.ensure_future(fetch_pages()),
+            asyncio.ensure_future(resolve()),
+            asyncio.ensure_future(write_all()),
+            asyncio.ensure_future(acknowledge())
+        ]
         try:
-            # Primero intentar extraer RUT del formato "Nombre (RUT)"
-            rut = self._extraer_rut_de_nombre(nombre)
+            await asyncio.gather(loading, *tasks)
+        except Exception:
+            # Una etapa falló: detener el resto sin dejar tareas colgadas
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(loading, *tasks, return_exceptions=True)
+            raise
+        return total
+    
+    def _prepare_record(self, record: Dict[str, Any], empresas: EmpresaResolver, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Validar un registro y resolver su empresa
+        
+        Returns:
+            Registro listo para escribir o None si se omite
+        """
+        try:
+            # Validar que el registro tenga empresa
+            empresa_name = record.get('empresa')
+            if not empresa_name:
+                logger.warning(f"⚠️ Registro {record['id']} sin empresa")
+                results["skipped"] += 1
+                return None
             
-            if rut:
-                # Buscar por RUT (más confiable)
-                response = self.supabase.table('empresas').select('*').eq('rut', rut).execute()
-                if response.data:
-                    logger.info(f"✅ Empresa encontrada por RUT: {rut}")
-                    return response.data[0]
+            # Limpiar espacios extra
+            empresa_name = empresa_name.strip() if isinstance(empresa_name, str) else empresa_name
             
-            # Si no encuentra por RUT, buscar por nombre exacto
-            response = self.supabase.table('empresas').select('*').eq('nombre', nombre).execute()
-            if response.data:
-                logger.info(f"✅ Empresa encontrada por nombre: {nombre}")
-                return response.data[0]
-                
-            logger.warning(f"⚠️ Empresa no encontrada: {nombre}")
-            return None
+            # Buscar empresa (por RUT o nombre) en las empresas precargadas
+            empresa = empresas.resolve(empresa_name)
+            if not empresa:
+                results["skipped"] += 1
+                return None
+            
+            return {'record': record, 'empresa_id': empresa['id']}
+        
         except Exception as e:
-            logger.error(f"Error buscando empresa {nombre}: {e}")
+            results["failed"] += 1
+            error_msg = f"Error procesando registro {record['id']}: {str(e)}"
+            results["errors"].append(error_msg)
+            logger.error(f"❌ {error_msg}")
             return None
     
-    def _extraer_rut_de_nombre(self, nombre: str) -> Optional[str]:
-        """Extraer RUT del formato 'Nombre (RUT)' o devolver RUT directo"""
-        import re
-        
-        # Patrón para RUT chileno: 12345678-9 o 12.345.678-9
-        patron_rut = r'(\d{1,2}\.?\d{3}\.?\d{3}-[0-9kK])'
-        
-        # Buscar RUT en el texto
-        match = re.search(patron_rut, nombre)
-        if match:
-            rut = match.group(1)
-            # Normalizar RUT (quitar puntos)
-            rut_normalizado = rut.replace('.', '')
-            logger.info(f"🔍 RUT extraído: {rut_normalizado} de '{nombre}'")
-            return rut_normalizado
-        
-        # Si no hay RUT en paréntesis, verificar si el nombre completo es un RUT
-        if re.match(r'^\d{1,2}\.?\d{3}\.?\d{3}-[0-9kK]$', nombre.strip()):
-            return nombre.replace('.', '')
+    def _write_batch(self, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Escribir un lote de registros en Supabase
         
-        return None
+        Crea o reutiliza la fila de cada registro, copia sus adjuntos si
+        FILE_STORAGE_MODE lo indica y escribe los archivos de todo el lote en
+        una llamada por tabla.
+        
+        Returns:
+            (registros escritos completos como {airtable_id, empresa_id, supabase_id},
+             mensajes de error)
+        """
+        synced = []  # (record, empresa_id, supabase_id, tabla_archivos, archivos_info)
+        errors = []
+        
+        for item in items:
+            record, empresa_id = item['record'], item['empresa_id']
+            try:
+                # Procesar archivos si existen
+                archivos_info = []
+                archivos = record.get('archivos', [])
+                for archivo in archivos:
+                    archivo_info = {
+                        'nombre': archivo.get('filename'),
+                        'url': archivo.get('url'),
+                        'tipo': archivo.get('type'),
+                        'tamaño': archivo.get('size'),
+                        'airtable_id': archivo.get('id')
+                    }
+                    archivos_info.append(archivo_info)
+                
+                # Determinar tipo de documento y tabla destino
+                tipo_documento = record.get('tipo_documento', '')
+                if self._is_reporte_mensual(tipo_documento):
+                    # Sincronizar como reporte mensual
+                    supabase_id = self._sync_reporte_mensual(record, empresa_id)
+                    tabla_archivos = 'archivos_reportes'
+                else:
+                    # Sincronizar como información de compañía
+                    supabase_id = self._sync_info_compania(record, empresa_id)
+                    tabla_archivos = 'archivos_info_compania'
+                
+                if supabase_id:
+                    synced.append((record, empresa_id, supabase_id, tabla_archivos, archivos_info))
+                else:
+                    logger.error(f"❌ Error procesando registro {record['id']}")
+            
+            except Exception as e:
+                error_msg = f"Error procesando registro {record['id']}: {str(e)}"
+                errors.append(error_msg)
+                logger.error(f"❌ {error_msg}")
+        
+        # Copia estable de los adjuntos (las URLs de Airtable vencen)
+        if self.mirror.enabled:
+            synced = self._mirror_batch(synced, errors)
+        
+        # Archivos del lote: una escritura por tabla
+        synced = [
+            (record, empresa_id, supabase_id, tabla_archivos, [
+                self._archivo_row(tabla_archivos, supabase_id, empresa_id, archivo)
+                for archivo in archivos_info
+            ])
+            for record, empresa_id, supabase_id, tabla_archivos, archivos_info in synced
+        ]
+        tablas_fallidas = set()
+        for tabla in ('archivos_reportes', 'archivos_info_compania'):
+            filas = [fila for *_, tabla_archivos, filas_registro in synced if tabla_archivos == tabla for fila in filas_registro]
+            try:
+                self._insert_archivos(tabla, filas)
+            except Exception as e:
+                tablas_fallidas.add(tabla)
+                logger.error(f"❌ Error guardando {len(filas)} archivos en {tabla}: {e}")
+        
+        written = []
+        for record, empresa_id, supabase_id, tabla_archivos, filas in synced:
+            if filas and tabla_archivos in tablas_fallidas:
+                # Queda pendiente en Airtable; reintentar es idempotente
+                errors.append(f"Error guardando archivos del registro {record['id']}")
+                continue
+            written.append({'airtable_id': record['id'], 'empresa_id': empresa_id, 'supabase_id': supabase_id})
+        
+        return written, errors
+    
+    def _mirror_batch(self, synced: List[tuple], errors: List[str]) -> List[tuple]:
+        """
+        Copiar los adjuntos del lote y reemplazar sus URLs por las estables
+        
+        Un registro con un adjunto que no se pudo copiar no se escribe: queda
+        pendiente en Airtable y se reintenta en la siguiente ejecución.
+        
+        Returns:
+            Registros del lote cuyos adjuntos quedaron copiados
+        """
+        archivos = [archivo for *_, archivos_info in synced for archivo in archivos_info]
+        if not archivos:
+            return synced
+        copiados = iter(self.mirror.mirror_many(archivos))
+        
+        resultado = []
+        for record, empresa_id, supabase_id, tabla_archivos, archivos_info in synced:
+            copias = [next(copiados) for _ in archivos_info]
+            if any(error for _, error in copias):
+                errors.append(f"Error copiando archivos del registro {record['id']}")
+                continue
+            resultado.append((record, empresa_id, supabase_id, tabla_archivos, [archivo for archivo, _ in copias]))
+        return resultado
+    
+    def _get_watermark(self) -> Optional[datetime]:
+        """Marca de agua de la última sincronización exitosa (con margen de solape)"""
+        state = self.state.get(self.WATERMARK_KEY)
+        if not state or not state.get('since'):
+            return None
+        since = datetime.fromisoformat(state['since'])
+        # Margen por diferencias de reloj con Airtable; reprocesar es idempotente
+        return since - timedelta(seconds=Config.SYNC_WATERMARK_OVERLAP_SECONDS)
+    
+    def _get_retry_ids(self) -> List[str]:
+        """IDs omitidos o fallidos en la última sincronización completada"""
+        state = self.state.get(self.WATERMARK_KEY)
+        return list((state or {}).get('retry_ids') or [])
+    
+    def _save_watermark(self, run_started_at: datetime, mode: str, retry_ids: List[str]):
+        """Guardar la marca de agua y los registros a reintentar tras una sincronización completada"""
+        self.state.set(self.WATERMARK_KEY, {
+            'since': run_started_at.isoformat(),
+            'mode': mode,
+            'retry_ids': retry_ids
+        })
     
     def _is_reporte_mensual(self, tipo_documento: str) -> bool:
         """Determinar si es un reporte mensual"""
-        tipos_reporte = ['balance', 'resultados', 'flujo de caja', 'estados financieros']
-        return any(tipo.lower() in tipo_documento.lower() for tipo in tipos_reporte)
+        return self.classifier.classify(tipo_documento)[1]
+    
+    def _upsert_by_airtable_id(self, table_name: str, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Insertar una fila identificada por airtable_id (ON CONFLICT DO NOTHING)
+        
+        Returns:
+            ID de la fila nueva o, si ya existía, de la existente
+        """
+        response = self.supabase.table(table_name).upsert(
+            data, on_conflict='airtable_id', ignore_duplicates=True
+        ).execute()
+        if response.data:
+            return response.data[0]['id']
+        
+        # Conflicto: la fila ya existía, se obtiene por el índice único
+        existing = self.supabase.table(table_name).select('id').eq('airtable_id', data['airtable_id']).execute()
+        if existing.data:
+            logger.info(f"📋 Registro {data['airtable_id']} ya existe en {table_name}, omitiendo...")
+            return existing.data[0]['id']
+        return None
+    
+    def _archivo_row(self, table_name: str, parent_id: str, empresa_id: str, archivo: Dict[str, Any]) -> Dict[str, Any]:
+        """Fila de archivo para archivos_reportes / archivos_info_compania"""
+        row = {
+            'empresa_id': empresa_id,
+            'nombre_archivo': archivo['nombre'],
+            'url_archivo': archivo['url'],
+            'tipo_archivo': archivo['tipo'],
+            'tamanio_bytes': archivo['tamaño'],
+            'descripcion': f"Archivo de Airtable ID: {archivo['airtable_id']}",
+            'airtable_id': archivo['airtable_id']
+        }
+        if table_name == 'archivos_reportes':
+            row['reporte_id'] = parent_id
+            row['activo'] = True
+        else:
+            row['info_id'] = parent_id
+        return row
     
-    def _sync_reporte_mensual(self, record: Dict[str, Any], empresa_id: str, archivos: List[Dict]) -> Optional[str]:
+    def _insert_archivos(self, table_name: str, archivos_data: List[Dict[str, Any]]):
+        """
+        Insertar los archivos de un lote en una sola llamada
+        
+        ON CONFLICT (airtable_id) DO NOTHING omite los ya sincronizados sin una
+        consulta previa de existencia.
+        
+        Raises:
+            Exception: si la escritura en Supabase falla
+        """
+        if not archivos_data:
+            return
+        response = self.supabase.table(table_name).upsert(
+            archivos_data, on_conflict='airtable_id', ignore_duplicates=True
+        ).execute()
+        nuevos = len(response.data or [])
+        logger.info(f"📎 {nuevos} archivos nuevos en {table_name} ({len(archivos_data) - nuevos} ya existían)")
+    
+    def _sync_reporte_mensual(self, record: Dict[str, Any], empresa_id: str) -> Optional[str]:
         """Sincronizar como reporte mensual"""
         try:
-            # Verificar si ya existe un reporte con este ID de Airtable
             airtable_id = record['id']
-            existing_check = self.supabase.table('reportes_mensuales').select('id').like('comentarios', f'%{airtable_id}%').execute()
-            
-            if existing_check.data:
-                logger.info(f"📋 Reporte {airtable_id} ya existe en Supabase, omitiendo...")
-                return existing_check.data[0]['id']
             
             # Determinar año y mes actual si no se especifica
             fecha_actual = datetime.now()
             anio = fecha_actual.year
             mes = fecha_actual.month
             
-            # Crear registro en reportes_mensuales
+            # Crear registro en reportes_mensuales (o reutilizar el existente)
             reporte_data = {
                 'empresa_id': empresa_id,
                 'anio': anio,
@@ -213,94 +625,33 @@ class SyncService:
                 'titulo': record.get('tipo_documento', 'Documento'),
                 'descripcion': record.get('comentarios', ''),
                 'comentarios': f"Sincronizado desde Airtable ID: {airtable_id}",
-                'estado': 'activo'
+                'estado': 'activo',
+                'airtable_id': airtable_id
             }
             
-            response = self.supabase.table('reportes_mensuales').insert(reporte_data).execute()
-            if not response.data:
-                return None
-            
-            reporte_id = response.data[0]['id']
-            
-            # Crear registros de archivos (solo si no existen)
-            for archivo in archivos:
-                # Verificar si el archivo ya existe
-                existing_file = self.supabase.table('archivos_reportes').select('id').like('descripcion', f"%{archivo['airtable_id']}%").execute()
-                
-                if existing_file.data:
-                    logger.info(f"📎 Archivo {archivo['nombre']} ya existe, omitiendo...")
-                    continue
-                
-                archivo_data = {
-                    'reporte_id': reporte_id,
-                    'empresa_id': empresa_id,
-                    'nombre_archivo': archivo['nombre'],
-                    'url_archivo': archivo['url'],
-                    'tipo_archivo': archivo['tipo'],
-                    'tamanio_bytes': archivo['tamaño'],
-                    'descripcion': f"Archivo de Airtable ID: {archivo['airtable_id']}",
-                    'activo': True
-                }
-                
-                self.supabase.table('archivos_reportes').insert(archivo_data).execute()
-                logger.info(f"📎 Archivo {archivo['nombre']} sincronizado exitosamente")
-            
-            return reporte_id
+            return self._upsert_by_airtable_id('reportes_mensuales', reporte_data)
             
         except Exception as e:
             logger.error(f"Error sincronizando reporte mensual: {e}")
             return None
     
-    def _sync_info_compania(self, record: Dict[str, Any], empresa_id: str, archivos: List[Dict]) -> Optional[str]:
+    def _sync_info_compania(self, record: Dict[str, Any], empresa_id: str) -> Optional[str]:
         """Sincronizar como información de compañía"""
         try:
-            # Verificar si ya existe información con este ID de Airtable
             airtable_id = record['id']
-            existing_check = self.supabase.table('info_compania').select('id').like('comentarios', f'%{airtable_id}%').execute()
-            
-            if existing_check.data:
-                logger.info(f"📋 Info compañía {airtable_id} ya existe en Supabase, omitiendo...")
-                return existing_check.data[0]['id']
             
-            # Crear registro en info_compania
+            # Crear registro en info_compania (o reutilizar el existente)
             info_data = {
                 'empresa_id': empresa_id,
                 'categoria': self._get_categoria_from_tipo(record.get('tipo_documento', '')),
                 'titulo': record.get('tipo_documento', 'Documento'),
                 'descripcion': record.get('comentarios', ''),
                 'comentarios': f"Sincronizado desde Airtable ID: {airtable_id}",
-                'estado': 'activo'
+                'estado': 'activo',
+                'airtable_id': airtable_id
             }
             
-            response = self.supabase.table('info_compania').insert(info_data).execute()
-            if not response.data:
-                return None
-            
-            info_id = response.data[0]['id']
-            
-            # Crear registros de archivos (solo si no existen)
-            for archivo in archivos:
-                # Verificar si el archivo ya existe
-                existing_file = self.supabase.table('archivos_info_compania').select('id').like('descripcion', f"%{archivo['airtable_id']}%").execute()
-                
-                if existing_file.data:
-                    logger.info(f"📎 Archivo {archivo['nombre']} ya existe, omitiendo...")
-                    continue
-                
-                archivo_data = {
-                    'info_id': info_id,
-                    'empresa_id': empresa_id,
-                    'nombre_archivo': archivo['nombre'],
-                    'url_archivo': archivo['url'],
-                    'tipo_archivo': archivo['tipo'],
-                    'tamanio_bytes': archivo['tamaño'],
-                    'descripcion': f"Archivo de Airtable ID: {archivo['airtable_id']}"
-                }
-                
-                self.supabase.table('archivos_info_compania').insert(archivo_data).execute()
-                logger.info(f"📎 Archivo {archivo['nombre']} sincronizado exitosamente")
-            
-            return info_id
+            return self._upsert_by_airtable_id('info_compania', info_data)
             
         except Exception as e:
             logger.error(f"Error sincronizando info compañía: {e}")
@@ -308,53 +659,25 @@ class SyncService:
     
     def _get_categoria_from_tipo(self, tipo_documento: str) -> str:
         """Determinar categoría específica basada en tipo de documento"""
-        tipo_lower = tipo_documento.lower().strip()
-        
-        # Mapeo específico para evitar duplicados
-        if 'balance general' in tipo_lower:
-            return 'Balance General'
-        elif 'estado de resultados' in tipo_lower:
-            return 'Estado de Resultados' 
-        elif 'flujo de caja' in tipo_lower:
-            return 'Flujo de Caja'
-        elif 'estado de situación' in tipo_lower:
-            return 'Estado de Situación'
-        elif 'balance' in tipo_lower:
-            return 'Balance'
-        elif 'resultados' in tipo_lower:
-            return 'Resultados'
-        elif 'flujo' in tipo_lower:
-            return 'Flujo'
-        elif any(word in tipo_lower for word in ['legal', 'contrato', 'escritura', 'registro']):
-            return 'Legal'
-        elif any(word in tipo_lower for word in ['tributario', 'impuesto', 'declaracion', 'renta']):
-            return 'Tributaria'
-        elif any(word in tipo_lower for word in ['carpeta', 'tributaria']):
-            return 'Carpeta Tributaria'
-        else:
-            # Usar el tipo original si no coincide con ninguno
-            return tipo_documento.strip() or 'General'
+        return self.classifier.classify(tipo_documento)[0]
     
     def get_sync_statistics(self) -> Dict[str, Any]:
         """Obtener estadísticas de sincronización"""
         try:
-            airtable_stats = self.airtable.get_statistics()
+            # Estadísticas del espejo: no consumen cuota de la API de Airtable
+            airtable_stats = self.airtable_mirror.get_statistics()
             
-            # Contar registros en Supabase
-            reportes_response = self.supabase.table('reportes_mensuales').select('*', count='exact').execute()
-            info_response = self.supabase.table('info_compania').select('*', count='exact').execute()
-            archivos_reportes_response = self.supabase.table('archivos_reportes').select('*', count='exact').execute()
-            archivos_info_response = self.supabase.table('archivos_info_compania').select('*', count='exact').execute()
+            # Contar registros en Supabase (conteos agregados en el servidor)
+            counts = self.stats.get_stats()['counts']
             
             return {
                 "airtable": airtable_stats,
                 "supabase": {
-                    "reportes_mensuales": reportes_response.count if hasattr(reportes_response, 'count') else len(reportes_response.data),
-                    "info_compania": info_response.count if hasattr(info_response, 'count') else len(info_response.data),
-                    "archivos_reportes": archivos_reportes_response.count if hasattr(archivos_reportes_response, 'count') else len(archivos_reportes_response.data),
-                    "archivos_info_compania": archivos_info_response.count if hasattr(archivos_info_response, 'count') else len(archivos_info_response.data)
-                },
-                "last_sync": datetime.now().isoformat()
+                    "reportes_mensuales": counts['reportes_mensuales'],
+                    "info_compania": counts['info_compania'],
+                    "archivos_reportes": counts['archivos_reportes'],
+                    "archivos_info_compania": counts['archivos_info_compania']
+                }
             }
             
         except Exception as e:
@@ -0,0 +1,83 @@
+"""
+📌 Estado persistente de sincronización ACA 3.0
+Valores clave/valor en Supabase (marcas de agua, cursores, etc.)
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from ..database.supabase import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+class SyncStateStore:
+    """
+    Acceso a la tabla `sync_estado` (ver database/migrations/sync_estado.sql).
+
+    Cada clave guarda un JSON con el estado de un proceso de sincronización,
+    por ejemplo la marca de agua de la última sincronización exitosa.
+    """
+
+    TABLE = 'sync_estado'
+
+    def __init__(self):
+        """Inicializar acceso al estado de sincronización"""
+        self.supabase = get_supabase_client()
+
+    def get(self, clave: str) -> Optional[Dict[str, Any]]:
+        """Obtener el valor de una clave (None si no existe)"""
+        try:
+            response = self.supabase.table(self.TABLE).select('valor').eq('clave', clave).limit(1).execute()
+            return response.data[0]['valor'] if response.data else None
+        except Exception as e:
+            logger.error(f"Error leyendo estado de sincronización '{clave}': {e}")
+            return None
+
+    def set(self, clave: str, valor: Dict[str, Any]) -> bool:
+        """Guardar (upsert) el valor de una clave"""
+        try:
+            self.supabase.table(self.TABLE).upsert({
+                'clave': clave,
+                'valor': valor,
+                'actualizado_en': datetime.now(timezone.utc).isoformat()
+            }, on_conflict='clave').execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error guardando estado de sincronización '{clave}': {e}")
+            return False
+
+    def try_lock(self, nombre: str, duenio: str, ttl_seconds: int) -> Optional[bool]:
+        """
+        Adquirir o renovar un lock entre procesos (ver database/migrations/sync_lock.sql)
+
+        Returns:
+            True si se adquirió, False si otro proceso lo tiene, None si la
+            función no está disponible
+        """
+        try:
+            response = self.supabase.client.rpc('sync_lock_adquirir', {
+                'p_nombre': nombre,
+                'p_duenio': duenio,
+                'p_ttl_segundos': ttl_seconds
+            }).execute()
+            return bool(response.data)
+        except Exception as e:
+            logger.warning(f"⚠️ Lock '{nombre}' no disponible en Supabase: {e}")
+            return None
+
+    def unlock(self, nombre: str, duenio: str):
+        """Liberar un lock adquirido con try_lock"""
+        try:
+            self.supabase.client.rpc('sync_lock_liberar', {
+                'p_nombre': nombre,
+                'p_duenio': duenio
+            }).execute()
+        except Exception as e:
+            logger.error(f"Error liberando lock '{nombre}': {e}")
+
+# Instancia global
+sync_state = SyncStateStore()
+
+def get_sync_state() -> SyncStateStore:
+    """Obtener acceso al estado de sincronización"""
+    return sync_state
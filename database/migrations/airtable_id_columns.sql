@@ -0,0 +1,68 @@
+-- 🔑 COLUMNAS airtable_id PARA DEDUPLICACIÓN DE LA SINCRONIZACIÓN
+-- Reemplaza la búsqueda LIKE '%<id>%' sobre comentarios/descripcion por una
+-- columna con índice único, usable con INSERT ... ON CONFLICT (upsert)
+-- Ejecutar en Supabase SQL Editor (es idempotente)
+
+-- 1. Columnas
+ALTER TABLE reportes_mensuales ADD COLUMN IF NOT EXISTS airtable_id VARCHAR(50);
+ALTER TABLE info_compania ADD COLUMN IF NOT EXISTS airtable_id VARCHAR(50);
+ALTER TABLE archivos_reportes ADD COLUMN IF NOT EXISTS airtable_id VARCHAR(50);
+ALTER TABLE archivos_info_compania ADD COLUMN IF NOT EXISTS airtable_id VARCHAR(50);
+
+-- 2. Backfill desde los textos existentes
+--    reportes/info:  comentarios = 'Sincronizado desde Airtable ID: rec...'
+--    archivos:       descripcion = 'Archivo de Airtable ID: att...'
+--    Si hay duplicados previos solo una fila recibe el ID (el resto queda NULL)
+DO $$
+DECLARE
+    t RECORD;
+    filas INTEGER;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('reportes_mensuales', 'comentarios'),
+            ('info_compania', 'comentarios'),
+            ('archivos_reportes', 'descripcion'),
+            ('archivos_info_compania', 'descripcion')
+        ) AS v(tabla, columna)
+    LOOP
+        EXECUTE format(
+            'UPDATE %1$I d SET airtable_id = s.airtable_id
+             FROM (
+                 SELECT DISTINCT ON (x.airtable_id) x.id, x.airtable_id
+                 FROM (
+                     SELECT id, substring(%2$I FROM ''Airtable ID: ([A-Za-z0-9]+)'') AS airtable_id
+                     FROM %1$I
+                     WHERE airtable_id IS NULL
+                 ) x
+                 WHERE x.airtable_id IS NOT NULL
+                   AND NOT EXISTS (SELECT 1 FROM %1$I e WHERE e.airtable_id = x.airtable_id)
+                 ORDER BY x.airtable_id, x.id
+             ) s
+             WHERE d.id = s.id',
+            t.tabla, t.columna
+        );
+        GET DIAGNOSTICS filas = ROW_COUNT;
+        RAISE NOTICE '🔄 %: % filas con airtable_id', t.tabla, filas;
+    END LOOP;
+END $$;
+
+-- 3. Índices únicos (NULL se permite repetido: filas no sincronizadas)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_reportes_mensuales_airtable_id
+    ON reportes_mensuales (airtable_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_info_compania_airtable_id
+    ON info_compania (airtable_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_archivos_reportes_airtable_id
+    ON archivos_reportes (airtable_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_archivos_info_compania_airtable_id
+    ON archivos_info_compania (airtable_id);
+
+-- 4. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ COLUMNAS airtable_id INSTALADAS';
+    RAISE NOTICE '🔑 Índices únicos para upsert ON CONFLICT (airtable_id)';
+END $$;
@@ -0,0 +1,57 @@
+-- 🪞 ESPEJO LOCAL DE LA TABLA DE AIRTABLE
+-- Copia de "ACA - Gestión Documental" refrescada por fecha de modificación
+-- Los listados y estadísticas del dashboard la consultan en vez de la API de Airtable
+-- Ejecutar en Supabase SQL Editor
+
+-- 1. Registros
+CREATE TABLE IF NOT EXISTS airtable_registros (
+    airtable_id VARCHAR(50) PRIMARY KEY,
+    empresa TEXT,
+    tipo_documento TEXT,
+    estado VARCHAR(50) NOT NULL DEFAULT 'Pendiente',
+    fecha_subida TEXT,
+    comentarios TEXT,
+    archivos JSONB NOT NULL DEFAULT '[]'::jsonb,
+    campos JSONB NOT NULL DEFAULT '{}'::jsonb,          -- todos los campos del registro
+    creado_en_airtable TIMESTAMP WITH TIME ZONE,
+    actualizado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW() -- último refresco que lo vio
+);
+
+CREATE INDEX IF NOT EXISTS idx_airtable_registros_empresa ON airtable_registros (empresa);
+CREATE INDEX IF NOT EXISTS idx_airtable_registros_estado ON airtable_registros (estado);
+CREATE INDEX IF NOT EXISTS idx_airtable_registros_tipo ON airtable_registros (tipo_documento);
+CREATE INDEX IF NOT EXISTS idx_airtable_registros_creado ON airtable_registros (creado_en_airtable DESC);
+
+-- 2. Estadísticas en una sola llamada (mismo formato que AirtableService.get_statistics)
+CREATE OR REPLACE FUNCTION airtable_registros_estadisticas()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_records', (SELECT COUNT(*) FROM airtable_registros),
+        'pending_records', (SELECT COUNT(*) FROM airtable_registros WHERE estado IN ('Pendiente', '')),
+        'by_empresa', COALESCE(
+            (SELECT jsonb_object_agg(e.empresa, e.total) FROM (
+                SELECT COALESCE(empresa, 'Sin empresa') AS empresa, COUNT(*) AS total
+                FROM airtable_registros GROUP BY 1
+            ) e),
+            '{}'::jsonb
+        ),
+        'by_tipo', COALESCE(
+            (SELECT jsonb_object_agg(t.tipo, t.total) FROM (
+                SELECT COALESCE(tipo_documento, 'Sin tipo') AS tipo, COUNT(*) AS total
+                FROM airtable_registros GROUP BY 1
+            ) t),
+            '{}'::jsonb
+        ),
+        'updated_at', (SELECT MAX(actualizado_en) FROM airtable_registros)
+    );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION airtable_registros_estadisticas() IS 'Conteos del espejo de Airtable por estado, empresa y tipo';
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ ESPEJO DE AIRTABLE INSTALADO';
+    RAISE NOTICE '🪞 Nueva tabla: airtable_registros';
+    RAISE NOTICE '⚡ Nueva función: airtable_registros_estadisticas()';
+END $$;
@@ -0,0 +1,42 @@
+-- 🏷️ REGLAS DE CLASIFICACIÓN DE DOCUMENTOS
+-- Tipo documento de Airtable → categoría y destino (reportes_mensuales / info_compania)
+-- La sincronización las recarga en cada ejecución; agregar filas no requiere cambios de código
+-- Ejecutar en Supabase SQL Editor
+
+-- 1. Tabla de reglas
+CREATE TABLE IF NOT EXISTS clasificacion_documentos (
+    id SERIAL PRIMARY KEY,
+    prioridad INTEGER NOT NULL,                      -- menor = se evalúa primero
+    palabras TEXT[] NOT NULL,                        -- basta con que aparezca una (sin distinguir mayúsculas)
+    categoria VARCHAR(100),                          -- NULL: la regla solo marca reporte mensual
+    reporte_mensual BOOLEAN NOT NULL DEFAULT FALSE,  -- alguna palabra presente → reportes_mensuales
+    activo BOOLEAN NOT NULL DEFAULT TRUE,
+    creado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_clasificacion_documentos_prioridad
+    ON clasificacion_documentos (prioridad) WHERE activo;
+
+-- 2. Reglas iniciales (las mismas que DEFAULT_RULES en app/services/document_classifier.py)
+INSERT INTO clasificacion_documentos (prioridad, palabras, categoria, reporte_mensual)
+SELECT * FROM (VALUES
+    (10,  ARRAY['balance general'], 'Balance General', FALSE),
+    (20,  ARRAY['estado de resultados'], 'Estado de Resultados', FALSE),
+    (30,  ARRAY['flujo de caja'], 'Flujo de Caja', TRUE),
+    (40,  ARRAY['estado de situación'], 'Estado de Situación', FALSE),
+    (50,  ARRAY['balance'], 'Balance', TRUE),
+    (60,  ARRAY['resultados'], 'Resultados', TRUE),
+    (70,  ARRAY['flujo'], 'Flujo', FALSE),
+    (80,  ARRAY['legal', 'contrato', 'escritura', 'registro'], 'Legal', FALSE),
+    (90,  ARRAY['tributario', 'impuesto', 'declaracion', 'renta'], 'Tributaria', FALSE),
+    (100, ARRAY['carpeta', 'tributaria'], 'Carpeta Tributaria', FALSE),
+    (110, ARRAY['estados financieros'], NULL, TRUE)
+) AS v(prioridad, palabras, categoria, reporte_mensual)
+WHERE NOT EXISTS (SELECT 1 FROM clasificacion_documentos);
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ REGLAS DE CLASIFICACIÓN INSTALADAS';
+    RAISE NOTICE '🏷️ Nueva tabla: clasificacion_documentos';
+END $$;
@@ -0,0 +1,38 @@
+-- 📊 ESTADÍSTICAS AGREGADAS DEL DASHBOARD
+-- Conteos y agrupaciones calculados en el servidor (una sola llamada RPC)
+-- Ejecutar en Supabase SQL Editor
+
+-- 1. Reportes agrupados por tipo
+CREATE OR REPLACE VIEW vista_reportes_por_tipo AS
+SELECT
+    COALESCE(NULLIF(tipo_reporte, ''), 'Sin categoría') AS tipo_reporte,
+    COUNT(*) AS total
+FROM reportes_mensuales
+GROUP BY 1;
+
+-- 2. Conteos de tablas + agrupación por tipo en un solo JSON
+CREATE OR REPLACE FUNCTION estadisticas_dashboard()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'empresas', (SELECT COUNT(*) FROM empresas),
+        'reportes_mensuales', (SELECT COUNT(*) FROM reportes_mensuales),
+        'info_compania', (SELECT COUNT(*) FROM info_compania),
+        'archivos_reportes', (SELECT COUNT(*) FROM archivos_reportes),
+        'archivos_info_compania', (SELECT COUNT(*) FROM archivos_info_compania),
+        'archivos_reportes_bytes', (SELECT COALESCE(SUM(tamanio_bytes), 0) FROM archivos_reportes),
+        'reportes_por_tipo', COALESCE(
+            (SELECT jsonb_object_agg(v.tipo_reporte, v.total) FROM vista_reportes_por_tipo v),
+            '{}'::jsonb
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION estadisticas_dashboard() IS 'Conteos de tablas y reportes por tipo para dashboard y sincronización';
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ ESTADÍSTICAS DEL DASHBOARD INSTALADAS';
+    RAISE NOTICE '📊 Nueva vista: vista_reportes_por_tipo';
+    RAISE NOTICE '⚡ Nueva función: estadisticas_dashboard()';
+END $$;
@@ -0,0 +1,29 @@
+-- 📄 ÍNDICES PARA PAGINACIÓN POR CURSOR
+-- Permiten que cada página del dashboard sea un index scan acotado
+-- Ejecutar en Supabase SQL Editor
+--
+-- El orden debe coincidir con el de app/database/pagination.py
+-- (timestamp DESC NULLS LAST, id DESC); un índice DESC simple es NULLS FIRST
+-- y Postgres no lo usa para ese orden. Se recrean los índices de la versión
+-- anterior de esta migración.
+
+DROP INDEX IF EXISTS idx_reportes_mensuales_creado_en_id;
+CREATE INDEX idx_reportes_mensuales_creado_en_id
+    ON reportes_mensuales (creado_en DESC NULLS LAST, id DESC);
+
+DROP INDEX IF EXISTS idx_reportes_mensuales_empresa_creado_en_id;
+CREATE INDEX idx_reportes_mensuales_empresa_creado_en_id
+    ON reportes_mensuales (empresa_id, creado_en DESC NULLS LAST, id DESC);
+
+DROP INDEX IF EXISTS idx_archivos_reportes_created_at_id;
+CREATE INDEX idx_archivos_reportes_created_at_id
+    ON archivos_reportes (created_at DESC NULLS LAST, id DESC);
+
+DROP INDEX IF EXISTS idx_empresas_created_at_id;
+CREATE INDEX idx_empresas_created_at_id
+    ON empresas (created_at DESC NULLS LAST, id DESC);
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ ÍNDICES DE PAGINACIÓN CREADOS';
+END $$;
@@ -0,0 +1,73 @@
+-- 🧵 COLA DE TRABAJOS EN BACKGROUND
+-- Trabajos largos (sincronización, exportaciones, notificaciones masivas)
+-- ejecutados por workers dentro de la aplicación
+-- Ejecutar en Supabase SQL Editor
+
+-- 1. Tabla de trabajos
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    tipo VARCHAR(50) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',  -- pendiente / en_curso / completado / fallido / cancelado
+    parametros JSONB NOT NULL DEFAULT '{}'::jsonb,
+    progreso JSONB,
+    resultado JSONB,
+    error TEXT,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    max_intentos INTEGER NOT NULL DEFAULT 3,
+    cancelar BOOLEAN NOT NULL DEFAULT FALSE,
+    worker VARCHAR(100),
+    disponible_en TIMESTAMP WITH TIME ZONE DEFAULT NOW(),  -- backoff entre reintentos
+    creado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    iniciado_en TIMESTAMP WITH TIME ZONE,
+    latido_en TIMESTAMP WITH TIME ZONE,
+    finalizado_en TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_pendientes
+    ON jobs (disponible_en, creado_en) WHERE estado IN ('pendiente', 'en_curso');
+
+CREATE INDEX IF NOT EXISTS idx_jobs_creado_en ON jobs (creado_en DESC);
+
+-- 2. Tomar el siguiente trabajo disponible
+--    SKIP LOCKED permite varios workers (y varios procesos) sin duplicar trabajos.
+--    Un trabajo en curso sin latido reciente (worker caído) se vuelve a tomar,
+--    salvo que se haya pedido cancelarlo: ese se cierra como cancelado.
+CREATE OR REPLACE FUNCTION jobs_tomar(p_worker TEXT, p_tipos TEXT[], p_stale_segundos INTEGER)
+RETURNS SETOF jobs AS $$
+    UPDATE jobs
+    SET estado = 'cancelado',
+        finalizado_en = NOW()
+    WHERE estado = 'en_curso'
+      AND cancelar
+      AND latido_en < NOW() - make_interval(secs => p_stale_segundos);
+
+    UPDATE jobs j
+    SET estado = 'en_curso',
+        worker = p_worker,
+        intentos = j.intentos + 1,
+        iniciado_en = NOW(),
+        latido_en = NOW()
+    WHERE j.id = (
+        SELECT id FROM jobs
+        WHERE tipo = ANY(p_tipos)
+          AND NOT cancelar
+          AND (
+              (estado = 'pendiente' AND disponible_en <= NOW())
+              OR (estado = 'en_curso' AND latido_en < NOW() - make_interval(secs => p_stale_segundos))
+          )
+        ORDER BY disponible_en, creado_en
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING j.*;
+$$ LANGUAGE sql;
+
+COMMENT ON TABLE jobs IS 'Trabajos en background con reintentos y cancelación';
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ COLA DE TRABAJOS CREADA';
+    RAISE NOTICE '🧵 Nueva tabla: jobs';
+    RAISE NOTICE '⚡ Nueva función: jobs_tomar()';
+END $$;
@@ -0,0 +1,159 @@
+-- 📦 LOG DE CONVERSACIONES EN LOTE
+-- Registra un arreglo JSON de conversaciones en una sola llamada RPC
+-- Ejecutar en Supabase SQL Editor (requiere upgrade_conversaciones_v2_fixed.sql)
+
+-- 1. Expandir el arreglo JSON a filas tipadas
+--    Si tiene_acceso viene NULL se resuelve contra usuarios activos;
+--    empresa_id viene resuelto desde el bot cuando el usuario ya se validó
+DROP FUNCTION IF EXISTS log_conversaciones_filas(JSONB);
+CREATE OR REPLACE FUNCTION log_conversaciones_filas(p_rows JSONB)
+RETURNS TABLE (
+    orden BIGINT,
+    chat_id BIGINT,
+    user_id BIGINT,
+    first_name VARCHAR(255),
+    last_name VARCHAR(255),
+    username VARCHAR(255),
+    mensaje TEXT,
+    respuesta TEXT,
+    bot_tipo VARCHAR(20),
+    tiene_acceso BOOLEAN,
+    empresa_id UUID,
+    comando VARCHAR(100),
+    parametros JSONB,
+    tiempo_respuesta_ms INTEGER,
+    message_id BIGINT,
+    con_error BOOLEAN
+) AS $$
+    SELECT
+        e.orden,
+        (e.fila->>'chat_id')::BIGINT,
+        (e.fila->>'user_id')::BIGINT,
+        e.fila->>'first_name',
+        e.fila->>'last_name',
+        e.fila->>'username',
+        e.fila->>'mensaje',
+        e.fila->>'respuesta',
+        COALESCE(e.fila->>'bot_tipo', 'production'),
+        COALESCE(
+            (e.fila->>'tiene_acceso')::BOOLEAN,
+            EXISTS (
+                SELECT 1 FROM usuarios u
+                WHERE u.chat_id = (e.fila->>'chat_id')::BIGINT
+                  AND u.activo = true
+            )
+        ),
+        (e.fila->>'empresa_id')::UUID,
+        e.fila->>'comando',
+        e.fila->'parametros',
+        (e.fila->>'tiempo_respuesta_ms')::INTEGER,
+        (e.fila->>'message_id')::BIGINT,
+        COALESCE((e.fila->>'error')::BOOLEAN, false)
+    FROM jsonb_array_elements(p_rows) WITH ORDINALITY AS e(fila, orden);
+$$ LANGUAGE sql STABLE;
+
+-- 2. Registrar el lote completo (equivalente a N llamadas a log_conversacion_simple)
+CREATE OR REPLACE FUNCTION log_conversaciones_batch(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    total_insertadas INTEGER;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS tmp_log_conversaciones ON COMMIT DROP AS
+    SELECT * FROM log_conversaciones_filas('[]'::jsonb);
+    TRUNCATE tmp_log_conversaciones;
+
+    INSERT INTO tmp_log_conversaciones
+    SELECT * FROM log_conversaciones_filas(p_rows);
+
+    -- 2.1 Registrar/actualizar usuarios en tabla detalle (una fila por chat_id)
+    INSERT INTO usuarios_detalle (
+        chat_id, user_id, first_name, last_name, username,
+        ultima_interaccion, total_mensajes, intentos_acceso,
+        ultima_actividad, tipo_acceso
+    )
+    SELECT
+        ultimo.chat_id, ultimo.user_id, ultimo.first_name, ultimo.last_name, ultimo.username,
+        NOW(), totales.mensajes, totales.intentos,
+        ultimo.mensaje,
+        CASE WHEN ultimo.tiene_acceso THEN 'autorizado' ELSE 'no_autorizado' END
+    FROM (
+        SELECT DISTINCT ON (t.chat_id) t.*
+        FROM tmp_log_conversaciones t
+        ORDER BY t.chat_id, t.orden DESC
+    ) ultimo
+    JOIN (
+        SELECT
+            t.chat_id,
+            COUNT(*) AS mensajes,
+            COUNT(*) FILTER (WHERE NOT t.tiene_acceso) AS intentos
+        FROM tmp_log_conversaciones t
+        GROUP BY t.chat_id
+    ) totales ON totales.chat_id = ultimo.chat_id
+    ON CONFLICT (chat_id)
+    DO UPDATE SET
+        user_id = COALESCE(EXCLUDED.user_id, usuarios_detalle.user_id),
+        first_name = COALESCE(EXCLUDED.first_name, usuarios_detalle.first_name),
+        last_name = COALESCE(EXCLUDED.last_name, usuarios_detalle.last_name),
+        username = COALESCE(EXCLUDED.username, usuarios_detalle.username),
+        ultima_interaccion = NOW(),
+        total_mensajes = usuarios_detalle.total_mensajes + EXCLUDED.total_mensajes,
+        intentos_acceso = usuarios_detalle.intentos_acceso + EXCLUDED.intentos_acceso,
+        ultima_actividad = EXCLUDED.ultima_actividad,
+        updated_at = NOW();
+
+    -- 2.2 Registrar intentos no autorizados
+    INSERT INTO intentos_acceso_negado (
+        chat_id, user_id, first_name, last_name, username,
+        mensaje_enviado, bot_tipo
+    )
+    SELECT
+        t.chat_id, t.user_id, t.first_name, t.last_name, t.username,
+        t.mensaje, t.bot_tipo
+    FROM tmp_log_conversaciones t
+    WHERE NOT t.tiene_acceso
+    ORDER BY t.orden;
+
+    -- 2.3 Registrar conversaciones (empresa solo si tiene acceso;
+    --     se busca en usuarios solo si el bot no la envió)
+    INSERT INTO conversaciones (
+        chat_id, empresa_id, mensaje, respuesta, usuario_nombre,
+        usuario_username, bot_tipo, comando, parametros,
+        tiempo_respuesta_ms, metadata
+    )
+    SELECT
+        t.chat_id,
+        CASE WHEN t.tiene_acceso THEN COALESCE(
+            t.empresa_id,
+            (SELECT u.empresa_id FROM usuarios u WHERE u.chat_id = t.chat_id LIMIT 1)
+        ) END,
+        t.mensaje,
+        t.respuesta,
+        COALESCE(NULLIF(TRIM(COALESCE(t.first_name, '') || ' ' || COALESCE(t.last_name, '')), ''), t.username, 'Usuario Desconocido'),
+        t.username,
+        t.bot_tipo,
+        t.comando,
+        t.parametros,
+        t.tiempo_respuesta_ms,
+        jsonb_build_object(
+            'tiene_acceso', t.tiene_acceso,
+            'user_id', t.user_id,
+            'message_id', t.message_id,
+            'error', t.con_error,
+            'timestamp', NOW()
+        )
+    FROM tmp_log_conversaciones t
+    ORDER BY t.orden;
+
+    GET DIAGNOSTICS total_insertadas = ROW_COUNT;
+    RETURN total_insertadas;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION log_conversaciones_batch(JSONB) IS 'Registra un lote de conversaciones (arreglo JSON) en una sola llamada';
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ LOG DE CONVERSACIONES EN LOTE INSTALADO';
+    RAISE NOTICE '⚡ Nueva función: log_conversaciones_batch(JSONB)';
+END $$;
@@ -0,0 +1,16 @@
+-- 📌 ESTADO DE SINCRONIZACIÓN
+-- Guarda la marca de agua de la última sincronización exitosa con Airtable
+-- Ejecutar en Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS sync_estado (
+    clave VARCHAR(100) PRIMARY KEY,
+    valor JSONB NOT NULL DEFAULT '{}'::jsonb,
+    actualizado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE sync_estado IS 'Estado persistente de procesos de sincronización (marcas de agua, cursores)';
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ TABLA sync_estado CREADA';
+END $$;
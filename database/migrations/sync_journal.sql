@@ -0,0 +1,40 @@
+-- 📒 BITÁCORA DE SINCRONIZACIONES
+-- Registra cada ejecución y la etapa alcanzada por cada registro de Airtable
+-- para poder reanudar una sincronización interrumpida
+-- Ejecutar en Supabase SQL Editor
+
+-- 1. Ejecuciones
+CREATE TABLE IF NOT EXISTS sync_runs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    modo VARCHAR(20) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'en_curso',  -- en_curso / completada / fallida
+    desde TIMESTAMP WITH TIME ZONE,                  -- marca de agua usada al leer Airtable
+    iniciado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    finalizado_en TIMESTAMP WITH TIME ZONE,
+    resumen JSONB
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_runs_iniciado_en ON sync_runs (iniciado_en DESC);
+
+-- 2. Registros por ejecución
+CREATE TABLE IF NOT EXISTS sync_run_items (
+    run_id UUID NOT NULL REFERENCES sync_runs(id) ON DELETE CASCADE,
+    airtable_id VARCHAR(50) NOT NULL,
+    etapa VARCHAR(20) NOT NULL,                      -- resolved / written / acknowledged
+    empresa_id UUID,
+    supabase_id UUID,
+    actualizado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (run_id, airtable_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_run_items_run_etapa ON sync_run_items (run_id, etapa);
+
+COMMENT ON TABLE sync_runs IS 'Ejecuciones de la sincronización Airtable → Supabase';
+COMMENT ON TABLE sync_run_items IS 'Etapa alcanzada por cada registro de Airtable en una ejecución';
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ BITÁCORA DE SINCRONIZACIÓN CREADA';
+    RAISE NOTICE '📒 Nuevas tablas: sync_runs, sync_run_items';
+END $$;
@@ -0,0 +1,57 @@
+-- 🔒 LOCK DE SINCRONIZACIÓN ENTRE WORKERS
+-- Evita que dos procesos (workers de uvicorn, sincronización manual y
+-- programada) sincronicen Airtable al mismo tiempo
+-- Requiere sync_estado.sql. Ejecutar en Supabase SQL Editor
+--
+-- PostgREST atiende cada llamada con una conexión distinta del pool, por lo que
+-- un pg_advisory_lock de sesión no se puede mantener entre llamadas. El advisory
+-- lock de transacción serializa la adquisición y el lock en sí es un lease con
+-- vencimiento guardado en sync_estado (se libera solo si el proceso muere).
+
+-- 1. Adquirir (o renovar) el lock
+CREATE OR REPLACE FUNCTION sync_lock_adquirir(p_nombre TEXT, p_duenio TEXT, p_ttl_segundos INTEGER)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_clave TEXT := 'lock:' || p_nombre;
+    v_valor JSONB;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(v_clave));
+
+    SELECT valor INTO v_valor FROM sync_estado WHERE clave = v_clave;
+    IF v_valor IS NOT NULL
+       AND v_valor->>'duenio' <> p_duenio
+       AND (v_valor->>'expira')::timestamptz > NOW() THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO sync_estado (clave, valor, actualizado_en)
+    VALUES (
+        v_clave,
+        jsonb_build_object('duenio', p_duenio, 'expira', NOW() + make_interval(secs => p_ttl_segundos)),
+        NOW()
+    )
+    ON CONFLICT (clave) DO UPDATE
+        SET valor = EXCLUDED.valor, actualizado_en = NOW();
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. Liberar el lock (solo su dueño)
+CREATE OR REPLACE FUNCTION sync_lock_liberar(p_nombre TEXT, p_duenio TEXT)
+RETURNS BOOLEAN AS $$
+BEGIN
+    DELETE FROM sync_estado
+    WHERE clave = 'lock:' || p_nombre
+      AND valor->>'duenio' = p_duenio;
+    RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION sync_lock_adquirir(TEXT, TEXT, INTEGER) IS 'Lease con vencimiento para ejecuciones exclusivas entre workers';
+
+-- 3. Completado
+DO $$
+BEGIN
+    RAISE NOTICE '✅ LOCK DE SINCRONIZACIÓN INSTALADO';
+    RAISE NOTICE '🔒 Nuevas funciones: sync_lock_adquirir(), sync_lock_liberar()';
+END $$;
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+🧪 Emisor falso de webhooks de Airtable
+Prueba POST /webhooks/airtable sin una base real de Airtable
+
+Levanta un servidor HTTP que imita los endpoints de Airtable usados por la
+sincronización por webhook (payloads, listado de registros y batch update)
+y envía notificaciones firmadas a la app, incluyendo duplicados y ráfagas
+para comprobar la deduplicación y el agrupamiento.
+
+Uso:
+    1. Exportar en la app (además de Supabase):
+         AIRTABLE_API_KEY=fake
+         AIRTABLE_BASE_ID=appFAKE0000000001
+         AIRTABLE_TABLE_NAME=tbl00000000000001
+         AIRTABLE_API_URL=http://127.0.0.1:8765
+         AIRTABLE_WEBHOOK_ID=achFAKE0000000001
+         AIRTABLE_WEBHOOK_MAC_SECRET=ZmFrZS1zZWNyZXQ=
+    2. Iniciar la app:  python -m app.main
+    3. Ejecutar:        python testing/airtable/fake_webhook_sender.py --empresa "Mi Empresa (12.345.678-9)"
+    4. Revisar /status ("airtable_webhook") y la tabla reportes_mensuales
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import re
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BASE_ID = 'appFAKE0000000001'
+TABLE_ID = 'tbl00000000000001'
+WEBHOOK_ID = 'achFAKE0000000001'
+MAC_SECRET = 'ZmFrZS1zZWNyZXQ='
+
+class FakeAirtable:
+    """Estado del servidor falso: registros y payloads del webhook"""
+
+    def __init__(self, empresa: str, total: int):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.payloads = []
+        self.requests = []
+        for numero in range(1, total + 1):
+            record_id = f"recFAKE{numero:010d}"
+            self.records[record_id] = {
+                'id': record_id,
+                'createdTime': datetime.now(timezone.utc).isoformat(),
+                'fields': {
+                    'Empresa': empresa,
+                    'Tipo documento': 'Balance General',
+                    'Estado subida': 'Pendiente',
+                    'Comentarios': f'Registro de prueba {numero}',
+                    'Archivo adjunto': []
+                }
+            }
+
+    def add_payload(self, record_ids):
+        with self.lock:
+            self.payloads.append({
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'baseTransactionNumber': len(self.payloads) + 1,
+                'payloadFormat': 'v0',
+                'actionMetadata': {'source': 'client', 'sourceMetadata': {}},
+                'changedTablesById': {
+                    TABLE_ID: {'changedRecordsById': {record_id: {} for record_id in record_ids}}
+                }
+            })
+
+def make_handler(fake: FakeAirtable):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, data, status=200):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            fake.requests.append(f"GET {url.path}")
+
+            if url.path == f"/v0/bases/{BASE_ID}/webhooks/{WEBHOOK_ID}/payloads":
+                cursor = int(query.get('cursor', ['1'])[0])
+                with fake.lock:
+                    payloads = fake.payloads[cursor - 1:]
+                    self._send({
+                        'payloads': payloads,
+                        'cursor': len(fake.payloads) + 1,
+                        'mightHaveMore': False
+                    })
+                return
+
+            if url.path == f"/v0/{BASE_ID}/{TABLE_ID}":
+                formula = query.get('filterByFormula', [''])[0]
+                ids = set(re.findall(r"RECORD_ID\(\) = '(rec\w+)'", formula))
+                with fake.lock:
+                    records = [
+                        record for record_id, record in fake.records.items()
+                        if record_id in ids and record['fields'].get('Estado subida') == 'Pendiente'
+                    ]
+                self._send({'records': records})
+                return
+
+            self._send({'error': 'NOT_FOUND'}, status=404)
+
+        def do_PATCH(self):
+            url = urlparse(self.path)
+            fake.requests.append(f"PATCH {url.path}")
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length) or b'{}')
+            updated = []
+            with fake.lock:
+                for update in data.get('records', []):
+                    record = fake.records.get(update['id'])
+                    if record:
+                        record['fields'].update(update['fields'])
+                        updated.append(record)
+            self._send({'records': updated})
+
+    return Handler
+
+def send_notification(app_url: str, timestamp: str) -> int:
+    """Enviar una notificación firmada como lo hace Airtable"""
+    body = json.dumps({
+        'base': {'id': BASE_ID},
+        'webhook': {'id': WEBHOOK_ID},
+        'timestamp': timestamp
+    })
+    mac = hmac.new(base64.b64decode(MAC_SECRET), body.encode('ascii'), hashlib.sha256).hexdigest()
+    request = urllib.request.Request(
+        f"{app_url}/webhooks/airtable",
+        data=body.encode('ascii'),
+        headers={'Content-Type': 'application/json', 'X-Airtable-Content-MAC': f"hmac-sha256={mac}"},
+        method='POST'
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.status
+
+def main():
+    parser = argparse.ArgumentParser(description="Emisor falso de webhooks de Airtable")
+    parser.add_argument('--app-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--empresa', required=True, help="Texto Empresa de los registros (debe existir en Supabase)")
+    parser.add_argument('--records', type=int, default=5)
+    parser.add_argument('--wait', type=float, default=10, help="Segundos a esperar la sincronización")
+    args = parser.parse_args()
+
+    print("🧪 Emisor falso de webhooks de Airtable")
+    print("=" * 50)
+
+    fake = FakeAirtable(args.empresa, args.records)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(fake))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🗂️ Airtable falso en http://127.0.0.1:{args.port} con {args.records} registros pendientes")
+
+    # Ráfaga: un payload por registro y una notificación por payload, más un reenvío
+    record_ids = list(fake.records)
+    timestamps = []
+    for record_id in record_ids:
+        fake.add_payload([record_id])
+        timestamp = datetime.now(timezone.utc).isoformat()
+        timestamps.append(timestamp)
+        print(f"📨 Notificación {timestamp}: {send_notification(args.app_url, timestamp)}")
+    print(f"🔁 Reenvío duplicado: {send_notification(args.app_url, timestamps[0])}")
+
+    print(f"\n⏳ Esperando {args.wait:.0f}s la sincronización...")
+    time.sleep(args.wait)
+    server.shutdown()
+
+    procesados = [record_id for record_id, record in fake.records.items() if record['fields'].get('Estado subida') == 'Procesado']
+    lecturas = [request for request in fake.requests if request.startswith('GET') and '/webhooks/' in request]
+    print(f"\n📊 Lecturas de payloads: {len(lecturas)} (para {len(timestamps)} notificaciones)")
+    print(f"📊 Requests a Airtable: {len(fake.requests)}")
+    print(f"✅ Registros marcados como procesados: {len(procesados)}/{len(record_ids)}")
+    return len(procesados) == len(record_ids)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
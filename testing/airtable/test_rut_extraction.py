@@ -8,14 +8,13 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from app.services.sync_service import get_sync_service
+from app.database.supabase import get_supabase_client
+from app.services.empresa_resolver import EmpresaResolver, extraer_rut
 
 def test_rut_extraction():
     print("🧪 Testing Extracción de RUT para ACA 3.0")
     print("=" * 50)
     
-    sync_service = get_sync_service()
-    
     # Casos de prueba
     test_cases = [
         "Empresa Ejemplo 2 Ltda. (98765432-1)",
@@ -29,14 +28,19 @@ def test_rut_extraction():
     
     print("\n🔍 Probando extracción de RUT:")
     for caso in test_cases:
-        rut = sync_service._extraer_rut_de_nombre(caso)
+        rut = extraer_rut(caso)
         print(f"  Input: '{caso}'")
         print(f"  RUT extraído: {rut if rut else '❌ No encontrado'}")
         print()
     
     print("\n🏢 Probando búsqueda de empresas:")
+    empresas = EmpresaResolver(get_supabase_client())
+    try:
+        empresas.load()
+    except Exception as e:
+        print(f"❌ No se pudieron cargar las empresas: {e}")
     for caso in test_cases:
-        empresa = sync_service._get_empresa_by_name(caso)
+        empresa = empresas.resolve(caso)
         if empresa:
             print(f"✅ '{caso}' → {empresa['nombre']} (RUT: {empresa['rut']})")
         else:
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+🪝 Test del receptor de webhooks de Airtable
+Verifica firma, descarte de reenvíos, agrupación de notificaciones y avance
+del cursor (no requiere red: Airtable, el scheduler y sync_estado son falsos)
+"""
+
+import asyncio
+import base64
+import hmac
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'a.b.c')
+os.environ.setdefault('SUPABASE_SERVICE_KEY', 'a.b.c')
+
+from app.services import airtable_webhook as webhook_module
+from app.services.airtable_webhook import AirtableWebhookReceiver
+
+WEBHOOK_ID = 'achTESTWEBHOOK0001'
+MAC_SECRET = base64.b64encode(b'secreto-de-prueba').decode('ascii')
+CURSOR_KEY = f"{AirtableWebhookReceiver.CURSOR_KEY}:{WEBHOOK_ID}"
+
+class _State:
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+class _Airtable:
+    """Payloads falsos: cada lectura devuelve los cambios acumulados desde el cursor"""
+
+    def __init__(self):
+        self.payloads = []
+        self.reads = []
+
+    def add(self, *record_ids):
+        self.payloads.append(list(record_ids))
+
+    def fetch_webhook_changes(self, webhook_id, cursor):
+        self.reads.append(cursor)
+        record_ids = sorted({record_id for payload in self.payloads[cursor - 1:] for record_id in payload})
+        return record_ids, len(self.payloads) + 1
+
+class _Scheduler:
+    """Scheduler falso: registra las ejecuciones y puede estar ocupado"""
+
+    def __init__(self, busy: int = 0, delay: float = 0):
+        self.busy = busy
+        self.delay = delay
+        self.runs = []
+
+    async def run(self, trigger, record_ids=None):
+        self.runs.append(list(record_ids))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.busy:
+            self.busy -= 1
+            return {"success": False, "message": "Ya hay una sincronización en curso"}
+        return {"success": True}
+
+@contextmanager
+def _fakes(state, airtable, scheduler):
+    """Reemplazar las dependencias globales del módulo"""
+    originals = (webhook_module.get_sync_state, webhook_module.get_airtable_service, webhook_module.get_sync_scheduler)
+    webhook_module.get_sync_state = lambda: state
+    webhook_module.get_airtable_service = lambda: airtable
+    webhook_module.get_sync_scheduler = lambda: scheduler
+    try:
+        yield
+    finally:
+        webhook_module.get_sync_state, webhook_module.get_airtable_service, webhook_module.get_sync_scheduler = originals
+
+def _receiver() -> AirtableWebhookReceiver:
+    receiver = AirtableWebhookReceiver()
+    receiver.webhook_id = WEBHOOK_ID
+    receiver.mac_secret = MAC_SECRET
+    receiver.coalesce_seconds = 0.05
+    receiver.retry_seconds = 0.02
+    return receiver
+
+def _body(second: int, webhook_id: str = WEBHOOK_ID) -> str:
+    return json.dumps({
+        'base': {'id': 'appTESTBASE000001'},
+        'webhook': {'id': webhook_id},
+        'timestamp': f"2024-05-01T10:00:{second:02d}.000Z"
+    })
+
+def _mac(body: str) -> str:
+    digest = hmac.new(base64.b64decode(MAC_SECRET), body.encode('ascii'), 'sha256').hexdigest()
+    return f"hmac-sha256={digest}"
+
+def _notification(receiver: AirtableWebhookReceiver, second: int, webhook_id: str = WEBHOOK_ID):
+    body = _body(second, webhook_id)
+    return receiver.verify(body, _mac(body))
+
+async def _settle(receiver: AirtableWebhookReceiver):
+    """Esperar a que termine la lectura en curso"""
+    if receiver._task:
+        await receiver._task
+
+def test_verify_rejects_bad_signature():
+    """Solo se aceptan notificaciones firmadas con el secreto del webhook"""
+    receiver = _receiver()
+    body = _body(0)
+    assert receiver.verify(body, _mac(body)).webhook.id == WEBHOOK_ID
+    for header in ('hmac-sha256=00', '', None):
+        try:
+            receiver.verify(body, header)
+        except ValueError:
+            continue
+        raise AssertionError(f"firma aceptada: {header!r}")
+
+def test_duplicate_and_unknown_notifications_are_ignored():
+    """Un reenvío de Airtable o un webhook ajeno no programan otra lectura"""
+    state, airtable, scheduler = _State(), _Airtable(), _Scheduler()
+    airtable.add('recA')
+
+    async def scenario():
+        receiver = _receiver()
+        assert receiver.notify(_notification(receiver, 1))
+        assert not receiver.notify(_notification(receiver, 1))
+        assert not receiver.notify(_notification(receiver, 2, webhook_id='achOTROWEBHOOK0001'))
+        await _settle(receiver)
+        return receiver
+
+    with _fakes(state, airtable, scheduler):
+        receiver = asyncio.run(scenario())
+    stats = receiver.get_stats()
+    assert stats['received'] == 1 and stats['duplicates'] == 1
+    assert scheduler.runs == [['recA']]
+
+def test_notifications_are_coalesced():
+    """Las notificaciones dentro de la ventana se atienden con una sola lectura"""
+    state, airtable, scheduler = _State(), _Airtable(), _Scheduler()
+
+    async def scenario():
+        receiver = _receiver()
+        for second in range(5):
+            airtable.add(f"rec{second}", 'recComun')
+            receiver.notify(_notification(receiver, second))
+        await _settle(receiver)
+        return receiver
+
+    with _fakes(state, airtable, scheduler):
+        receiver = asyncio.run(scenario())
+    assert airtable.reads == [1]
+    assert scheduler.runs == [['rec0', 'rec1', 'rec2', 'rec3', 'rec4', 'recComun']]
+    stats = receiver.get_stats()
+    assert stats['received'] == 5 and stats['coalesced'] == 4 and stats['runs'] == 1
+
+def test_notification_during_sync_triggers_one_more_read():
+    """Lo que llega durante la sincronización se lee en una sola pasada más"""
+    state, airtable, scheduler = _State(), _Airtable(), _Scheduler(delay=0.05)
+
+    async def scenario():
+        receiver = _receiver()
+        airtable.add('recA')
+        receiver.notify(_notification(receiver, 1))
+        await asyncio.sleep(receiver.coalesce_seconds + 0.02)
+        for second in (2, 3):
+            airtable.add(f"recB{second}")
+            receiver.notify(_notification(receiver, second))
+        await _settle(receiver)
+
+    with _fakes(state, airtable, scheduler):
+        asyncio.run(scenario())
+    # La segunda lectura parte del cursor que dejó la primera
+    assert airtable.reads == [1, 2]
+    assert scheduler.runs == [['recA'], ['recB2', 'recB3']]
+    assert state.get(CURSOR_KEY) == {'cursor': 4}
+
+def test_cursor_advances_only_after_sync():
+    """Con otra sincronización en curso el cursor no avanza y se reintenta"""
+    state = _State({CURSOR_KEY: {'cursor': 3}})
+    airtable, scheduler = _Airtable(), _Scheduler(busy=2)
+    airtable.payloads = [['recViejo1'], ['recViejo2'], ['recNuevo']]
+
+    async def scenario():
+        receiver = _receiver()
+        receiver.notify(_notification(receiver, 1))
+        await _settle(receiver)
+        return receiver
+
+    with _fakes(state, airtable, scheduler):
+        receiver = asyncio.run(scenario())
+    # Dos intentos pospuestos y el tercero sincroniza desde el mismo cursor
+    assert airtable.reads == [3, 3, 3]
+    assert scheduler.runs == [['recNuevo']] * 3
+    assert state.get(CURSOR_KEY) == {'cursor': 4}
+    assert receiver.get_stats()['last_error'] is None
+
+def test_gives_up_after_max_retries():
+    """Tras MAX_RETRIES intentos se deja para la sincronización programada"""
+    state = _State()
+    airtable, scheduler = _Airtable(), _Scheduler(busy=100)
+    airtable.add('recA')
+
+    async def scenario():
+        receiver = _receiver()
+        receiver.notify(_notification(receiver, 1))
+        await _settle(receiver)
+        return receiver
+
+    with _fakes(state, airtable, scheduler):
+        receiver = asyncio.run(scenario())
+    assert len(scheduler.runs) == AirtableWebhookReceiver.MAX_RETRIES + 1
+    assert state.get(CURSOR_KEY) is None
+    assert receiver.get_stats()['last_error']
+
+if __name__ == "__main__":
+    for test in (
+        test_verify_rejects_bad_signature,
+        test_duplicate_and_unknown_notifications_are_ignored,
+        test_notifications_are_coalesced,
+        test_notification_during_sync_triggers_one_more_read,
+        test_cursor_advances_only_after_sync,
+        test_gives_up_after_max_retries
+    ):
+        test()
+        print(f"✅ {test.__name__}")
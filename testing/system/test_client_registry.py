@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+🔌 Test del registro de clientes Supabase
+Verifica que storage y tablas no compartan el cliente HTTP (no requiere red)
+"""
+
+import os
+import sys
+import tempfile
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'a.b.c')
+os.environ.setdefault('SUPABASE_SERVICE_KEY', 'a.b.c')
+
+from app.database import client_registry as registry_module
+from app.database.client_registry import ROLE_SERVICE, SupabaseClientRegistry
+
+def _rest_base_url(client) -> str:
+    return str(client.table('usuarios').select('id').session.base_url)
+
+def test_storage_then_table():
+    """Acceder a storage antes que a una tabla no cambia la URL de PostgREST"""
+    registry = SupabaseClientRegistry()
+    try:
+        client = registry.get_client(ROLE_SERVICE)
+        assert _rest_base_url(client).endswith('/rest/v1/')
+        storage_url = str(client.storage.from_('archivos')._client.base_url)
+        rest_url = _rest_base_url(client)
+        assert rest_url.endswith('/rest/v1/'), rest_url
+        assert storage_url.endswith('/storage/v1/'), storage_url
+        client.functions
+        assert _rest_base_url(client).endswith('/rest/v1/')
+    finally:
+        registry.close()
+
+def test_shared_transport():
+    """Todos los sub-clientes usan el mismo pool de conexiones"""
+    registry = SupabaseClientRegistry()
+    try:
+        client = registry.get_client(ROLE_SERVICE)
+        transports = {
+            id(client.table('usuarios').select('id').session._transport),
+            id(client.storage.from_('archivos')._client._transport)
+        }
+        assert transports == {id(registry._transport)}
+    finally:
+        registry.close()
+
+def test_file_mirror_storage_then_table():
+    """Tras copiar un adjunto a Supabase Storage las consultas siguen yendo a PostgREST"""
+    from app.services.file_mirror import MODE_SUPABASE, AttachmentMirror
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.path))
+        if request.method == 'HEAD':
+            return httpx.Response(400)
+        if '/storage/v1/' in request.url.path:
+            return httpx.Response(200, json={'Key': 'archivos/ab/abc'})
+        return httpx.Response(200, json=[])
+
+    registry = SupabaseClientRegistry()
+    registry._transport = httpx.MockTransport(handler)
+    global_registry = registry_module.client_registry
+    registry_module.client_registry = registry
+    try:
+        client = registry.get_client(ROLE_SERVICE)
+        client.table('usuarios').select('id').execute()
+
+        mirror = AttachmentMirror()
+        mirror.mode = MODE_SUPABASE
+        with tempfile.NamedTemporaryFile(delete=False) as temp:
+            temp.write(b'contenido')
+        try:
+            mirror._store_supabase(temp.name, 'ab/abc', 'application/pdf')
+        finally:
+            os.unlink(temp.name)
+
+        client.table('usuarios').select('id').execute()
+        assert requests[0] == ('GET', '/rest/v1/usuarios'), requests
+        assert any(path.startswith('/storage/v1/') for _, path in requests[1:-1]), requests
+        assert requests[-1] == ('GET', '/rest/v1/usuarios'), requests
+    finally:
+        registry_module.client_registry = global_registry
+        registry.close()
+
+if __name__ == "__main__":
+    for test in (test_storage_then_table, test_shared_transport, test_file_mirror_storage_then_table):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+📦 Test de la cola de logs de conversaciones
+Verifica el envío en lotes y el vaciado al detener los bots (no requiere red)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'a.b.c')
+os.environ.setdefault('SUPABASE_SERVICE_KEY', 'a.b.c')
+
+from app.services.conversation_log_writer import ConversationLogWriter
+
+class _Sink:
+    """Destino falso que guarda cada lote recibido"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, rows):
+        if self.fail:
+            raise RuntimeError("supabase caído")
+        self.batches.append([row['n'] for row in rows])
+
+def test_flush_by_batch_size():
+    """Al llenarse un lote se escribe sin esperar el intervalo"""
+    async def scenario():
+        sink = _Sink()
+        writer = ConversationLogWriter(sink, max_queue_size=100, batch_size=3, flush_interval=60)
+        for n in range(7):
+            assert await writer.enqueue({'n': n})
+        await asyncio.sleep(0.05)
+        # Al despertar, el worker vacía la cola en lotes de batch_size
+        assert sink.batches == [[0, 1, 2], [3, 4, 5], [6]], sink.batches
+
+        # Menos de un lote no despierta al worker antes del intervalo
+        await writer.enqueue({'n': 7})
+        await asyncio.sleep(0.05)
+        assert len(sink.batches) == 3
+        assert writer.get_stats()['pending'] == 1
+
+        await writer.drain()
+        assert sink.batches[-1] == [7]
+        return writer
+
+    writer = asyncio.run(scenario())
+    stats = writer.get_stats()
+    assert stats['written'] == 8 and stats['pending'] == 0 and stats['batches'] == 4
+
+def test_flush_by_interval():
+    """Un lote incompleto se escribe al cumplirse el intervalo"""
+    async def scenario():
+        sink = _Sink()
+        writer = ConversationLogWriter(sink, max_queue_size=100, batch_size=50, flush_interval=0.05)
+        await writer.enqueue({'n': 1})
+        await writer.enqueue({'n': 2})
+        assert sink.batches == []
+        await asyncio.sleep(0.2)
+        assert sink.batches == [[1, 2]], sink.batches
+        await writer.drain()
+
+    asyncio.run(scenario())
+
+def test_drain_writes_pending_rows():
+    """drain escribe todo lo encolado y detiene el worker"""
+    async def scenario():
+        sink = _Sink()
+        writer = ConversationLogWriter(sink, max_queue_size=100, batch_size=4, flush_interval=60)
+        for n in range(10):
+            await writer.enqueue({'n': n})
+        await writer.drain()
+        assert writer._worker is None
+        return sink, writer
+
+    sink, writer = asyncio.run(scenario())
+    assert [n for batch in sink.batches for n in batch] == list(range(10))
+    assert all(len(batch) <= 4 for batch in sink.batches)
+    assert writer.get_stats()['pending'] == 0
+
+def test_full_queue_drops_after_timeout():
+    """Con la cola llena se espera enqueue_timeout y luego se descarta"""
+    async def scenario():
+        sink = _Sink()
+        writer = ConversationLogWriter(sink, max_queue_size=2, batch_size=10, flush_interval=60, enqueue_timeout=0.01)
+        assert await writer.enqueue({'n': 1})
+        assert await writer.enqueue({'n': 2})
+        assert not await writer.enqueue({'n': 3})
+        await writer.drain()
+        return sink, writer
+
+    sink, writer = asyncio.run(scenario())
+    assert sink.batches == [[1, 2]]
+    stats = writer.get_stats()
+    assert stats['dropped'] == 1 and stats['written'] == 2
+
+def test_failed_batch_is_counted():
+    """Un lote que falla se cuenta y no detiene la cola"""
+    async def scenario():
+        writer = ConversationLogWriter(_Sink(fail=True), max_queue_size=10, batch_size=2, flush_interval=60)
+        await writer.enqueue({'n': 1})
+        await writer.drain()
+        return writer
+
+    stats = asyncio.run(scenario()).get_stats()
+    assert stats['failed'] == 1 and stats['written'] == 0
+
+def test_stop_bots_drains_even_if_a_bot_fails():
+    """stop_bots vacía la cola aunque un bot falle al detenerse"""
+    from app.bots import bot_manager as bot_manager_module
+
+    class _BrokenUpdater:
+        async def stop(self):
+            raise RuntimeError("updater colgado")
+
+    class _BrokenApp:
+        updater = _BrokenUpdater()
+
+    class _Logger:
+        def __init__(self, writer):
+            self.writer = writer
+
+        async def flush(self):
+            await self.writer.drain()
+
+    async def scenario():
+        sink = _Sink()
+        writer = ConversationLogWriter(sink, max_queue_size=10, batch_size=10, flush_interval=60)
+        await writer.enqueue({'n': 1})
+        await writer.enqueue({'n': 2})
+
+        manager = bot_manager_module.BotManager()
+        manager.admin_app = _BrokenApp()
+        original = bot_manager_module.get_conversation_logger
+        bot_manager_module.get_conversation_logger = lambda: _Logger(writer)
+        try:
+            await manager.stop_bots()
+        finally:
+            bot_manager_module.get_conversation_logger = original
+        return sink
+
+    assert asyncio.run(scenario()).batches == [[1, 2]]
+
+if __name__ == "__main__":
+    for test in (
+        test_flush_by_batch_size,
+        test_flush_by_interval,
+        test_drain_writes_pending_rows,
+        test_full_queue_drops_after_timeout,
+        test_failed_batch_is_counted,
+        test_stop_bots_drains_even_if_a_bot_fails
+    ):
+        test()
+        print(f"✅ {test.__name__}")
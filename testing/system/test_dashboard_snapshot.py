@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+📸 Test del snapshot del dashboard
+Verifica el comportamiento stale-while-revalidate (no requiere red)
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'a.b.c')
+os.environ.setdefault('SUPABASE_SERVICE_KEY', 'a.b.c')
+
+from app.services.dashboard_snapshot import DashboardSnapshot
+
+class _Builder:
+    """Builder falso: cuenta llamadas y puede bloquearse o fallar"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = None
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError("supabase caído")
+        return {'version': self.calls}
+
+def _age(snapshot: DashboardSnapshot, seconds: int):
+    """Envejecer el snapshot sin esperar"""
+    snapshot.generated_at = datetime.now() - timedelta(seconds=seconds)
+
+def test_first_requests_share_one_build():
+    """Sin snapshot, los requests concurrentes esperan una sola construcción"""
+    async def scenario():
+        builder = _Builder()
+        builder.release = asyncio.Event()
+        snapshot = DashboardSnapshot(builder, refresh_seconds=60, max_age_seconds=30)
+
+        requests = [asyncio.create_task(snapshot.get()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert builder.calls == 1
+        builder.release.set()
+        results = await asyncio.gather(*requests)
+        return builder, snapshot, results
+
+    builder, snapshot, results = asyncio.run(scenario())
+    assert builder.calls == 1
+    assert all(result['version'] == 1 and 'snapshot_generated_at' in result for result in results)
+    assert snapshot.get_stats()['served'] == 5
+
+def test_fresh_snapshot_does_not_rebuild():
+    """Un snapshot vigente se sirve desde memoria"""
+    async def scenario():
+        builder = _Builder()
+        snapshot = DashboardSnapshot(builder, refresh_seconds=60, max_age_seconds=30)
+        await snapshot.get()
+        for _ in range(10):
+            assert (await snapshot.get())['version'] == 1
+        await asyncio.sleep(0.01)
+        return builder, snapshot
+
+    builder, snapshot = asyncio.run(scenario())
+    assert builder.calls == 1
+    assert snapshot.get_stats()['stale_served'] == 0
+
+def test_stale_snapshot_served_while_revalidating():
+    """Un snapshot vencido se devuelve al instante y se reconstruye una sola vez"""
+    async def scenario():
+        builder = _Builder()
+        snapshot = DashboardSnapshot(builder, refresh_seconds=60, max_age_seconds=30)
+        await snapshot.get()
+        _age(snapshot, 120)
+
+        builder.release = asyncio.Event()
+        stale = [await snapshot.get() for _ in range(3)]
+        assert [result['version'] for result in stale] == [1, 1, 1]
+        # Una sola reconstrucción en curso aunque lleguen varios requests
+        await asyncio.sleep(0.01)
+        assert builder.calls == 2
+
+        builder.release.set()
+        await snapshot.trigger_refresh()
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+    stats = snapshot.get_stats()
+    assert stats['stale_served'] == 3 and stats['builds'] == 2
+    assert snapshot.age_seconds < 5
+
+def test_failed_rebuild_keeps_last_snapshot():
+    """Si la reconstrucción falla se sigue sirviendo el último snapshot"""
+    async def scenario():
+        builder = _Builder()
+        snapshot = DashboardSnapshot(builder, refresh_seconds=60, max_age_seconds=30)
+        await snapshot.get()
+        _age(snapshot, 120)
+        builder.fail = True
+        await snapshot.get()
+        await snapshot.trigger_refresh()
+        return await snapshot.get()
+
+    assert asyncio.run(scenario())['version'] == 1
+
+def test_refresher_rebuilds_periodically():
+    """El refresher reconstruye en background y se detiene limpio"""
+    async def scenario():
+        builder = _Builder()
+        snapshot = DashboardSnapshot(builder, refresh_seconds=0.02, max_age_seconds=30)
+        snapshot.start_refresher()
+        await asyncio.sleep(0.1)
+        await snapshot.stop_refresher()
+        calls = builder.calls
+        await asyncio.sleep(0.05)
+        return builder, calls
+
+    builder, calls = asyncio.run(scenario())
+    assert calls >= 3
+    assert builder.calls == calls
+
+if __name__ == "__main__":
+    for test in (
+        test_first_requests_share_one_build,
+        test_fresh_snapshot_does_not_rebuild,
+        test_stale_snapshot_served_while_revalidating,
+        test_failed_rebuild_keeps_last_snapshot,
+        test_refresher_rebuilds_periodically
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+🏷️ Test del clasificador de documentos
+Compara las reglas compiladas con la cadena de if que reemplazaron y
+verifica las fuentes de reglas (no requiere red)
+"""
+
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'a.b.c')
+os.environ.setdefault('SUPABASE_SERVICE_KEY', 'a.b.c')
+
+from app.config import Config
+from app.services.document_classifier import DEFAULT_RULES, DocumentClassifier
+
+# Combinaciones aleatorias comparadas además de todos los pares
+RANDOM_CASES = 8000
+
+def _legacy_is_reporte_mensual(tipo_documento: str) -> bool:
+    """SyncService._is_reporte_mensual antes del clasificador"""
+    tipos_reporte = ['balance', 'resultados', 'flujo de caja', 'estados financieros']
+    return any(tipo.lower() in tipo_documento.lower() for tipo in tipos_reporte)
+
+def _legacy_categoria(tipo_documento: str) -> str:
+    """SyncService._get_categoria_from_tipo antes del clasificador"""
+    tipo_lower = tipo_documento.lower().strip()
+    if 'balance general' in tipo_lower:
+        return 'Balance General'
+    elif 'estado de resultados' in tipo_lower:
+        return 'Estado de Resultados'
+    elif 'flujo de caja' in tipo_lower:
+        return 'Flujo de Caja'
+    elif 'estado de situación' in tipo_lower:
+        return 'Estado de Situación'
+    elif 'balance' in tipo_lower:
+        return 'Balance'
+    elif 'resultados' in tipo_lower:
+        return 'Resultados'
+    elif 'flujo' in tipo_lower:
+        return 'Flujo'
+    elif any(word in tipo_lower for word in ['legal', 'contrato', 'escritura', 'registro']):
+        return 'Legal'
+    elif any(word in tipo_lower for word in ['tributario', 'impuesto', 'declaracion', 'renta']):
+        return 'Tributaria'
+    elif any(word in tipo_lower for word in ['carpeta', 'tributaria']):
+        return 'Carpeta Tributaria'
+    else:
+        return tipo_documento.strip() or 'General'
+
+def _keywords():
+    palabras = [palabra for rule in DEFAULT_RULES for palabra in rule['palabras']]
+    # Textos sin regla y variantes que rozan una palabra clave
+    return palabras + ['informe', 'anual', 'estado', 'caja', 'estado de cuenta', 'financieros']
+
+def _cases():
+    """Todos los pares ordenados más combinaciones aleatorias reproducibles"""
+    palabras = _keywords()
+    yield ''
+    yield '   '
+    for palabra in palabras:
+        yield palabra
+    for a, b in itertools.permutations(palabras, 2):
+        yield f"{a} {b}"
+    rng = random.Random(21)
+    separadores = [' ', ' - ', ', ', ' y ', '  ', '/']
+    for _ in range(RANDOM_CASES):
+        partes = rng.sample(palabras, rng.randint(1, 4))
+        partes = [parte.upper() if rng.random() < 0.2 else parte.title() if rng.random() < 0.2 else parte for parte in partes]
+        texto = rng.choice(separadores).join(partes)
+        if rng.random() < 0.3:
+            texto = f"  {texto} 2024  "
+        yield texto
+
+def test_default_rules_match_legacy_chain():
+    """Las reglas por defecto dan la misma categoría y destino que la cadena de if"""
+    classifier = DocumentClassifier()
+    casos = 0
+    for texto in _cases():
+        esperado = (_legacy_categoria(texto), _legacy_is_reporte_mensual(texto))
+        assert classifier.classify(texto) == esperado, (texto, classifier.classify(texto), esperado)
+        casos += 1
+    assert casos > RANDOM_CASES
+
+def test_priority_ignores_position_in_text():
+    """Gana la regla de mayor prioridad aunque otra palabra aparezca antes"""
+    classifier = DocumentClassifier()
+    assert classifier.classify('Flujo anual y Balance General') == ('Balance General', True)
+    assert classifier.classify('Contrato de renta') == ('Legal', False)
+    assert classifier.classify('Carpeta tributaria con impuesto') == ('Tributaria', False)
+    assert classifier.classify('Estados Financieros 2024') == ('Estados Financieros 2024', True)
+    assert classifier.classify(None) == ('General', False)
+
+def test_rules_from_file_and_fallback():
+    """Sin tabla se usan las reglas del archivo; si falla, las de por defecto"""
+    class _BrokenSupabase:
+        def table(self, name):
+            raise RuntimeError("tabla inexistente")
+
+    rules = [
+        {'palabras': ['nómina'], 'categoria': 'Remuneraciones', 'reporte_mensual': True},
+        {'palabras': 'balance', 'categoria': 'Contable', 'reporte_mensual': False}
+    ]
+    original = Config.DOCUMENT_CLASSIFICATION_FILE
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as archivo:
+        json.dump(rules, archivo)
+    try:
+        Config.DOCUMENT_CLASSIFICATION_FILE = archivo.name
+        classifier = DocumentClassifier(_BrokenSupabase())
+        classifier.classify('Balance General')
+        assert classifier.load() == 2
+        assert classifier.source == archivo.name
+        assert classifier.classify('Nómina de marzo') == ('Remuneraciones', True)
+        # La recarga descarta lo memorizado con las reglas anteriores
+        assert classifier.classify('Balance General') == ('Contable', False)
+
+        Config.DOCUMENT_CLASSIFICATION_FILE = archivo.name + '.no-existe'
+        assert classifier.load() == len(DEFAULT_RULES)
+        assert classifier.source == 'default'
+        assert classifier.classify('Balance General') == ('Balance General', True)
+    finally:
+        Config.DOCUMENT_CLASSIFICATION_FILE = original
+        os.unlink(archivo.name)
+
+if __name__ == "__main__":
+    for test in (
+        test_default_rules_match_legacy_chain,
+        test_priority_ignores_position_in_text,
+        test_rules_from_file_and_fallback
+    ):
+        test()
+        print(f"✅ {test.__name__}")
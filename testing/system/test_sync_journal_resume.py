@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+📒 Test de reanudación de sincronizaciones desde la bitácora
+Verifica que una sincronización interrumpida se retome sin reescribir
+registros (no requiere red: Airtable, Supabase y la bitácora son falsos)
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'a.b.c')
+os.environ.setdefault('SUPABASE_SERVICE_KEY', 'a.b.c')
+
+from app.config import Config
+from app.services.document_classifier import DocumentClassifier
+from app.services.sync_journal import STAGE_ACKNOWLEDGED, STAGE_RESOLVED, STAGE_WRITTEN
+from app.services.sync_service import SyncService
+
+WINDOW_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+class _Query:
+    """Consulta encadenable que siempre devuelve las mismas filas"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return _Response(self.rows)
+
+class _Supabase:
+    """Solo la tabla de empresas (la escritura se reemplaza en el servicio)"""
+
+    def table(self, name):
+        assert name == 'empresas', name
+        return _Query([{'id': 'emp-1', 'rut': '76.123.456-7', 'nombre': 'Empresa Demo'}])
+
+class _Airtable:
+    """Airtable falso: registros pendientes hasta que se marcan"""
+
+    enabled = True
+
+    def __init__(self, record_ids, fail_marking: bool = False):
+        self.pending = {
+            record_id: {'id': record_id, 'empresa': 'Empresa Demo', 'tipo_documento': 'Otro', 'archivos': []}
+            for record_id in record_ids
+        }
+        self.fail_marking = fail_marking
+        self.windows = []
+        self.marked = []
+
+    def iterate_pending_pages(self, modified_since=None, fields=None):
+        self.windows.append(modified_since)
+        records = list(self.pending.values())
+        for inicio in range(0, len(records), 2):
+            yield records[inicio:inicio + 2]
+
+    def iterate_pending_pages_by_ids(self, record_ids, fields=None):
+        yield [self.pending[record_id] for record_id in record_ids if record_id in self.pending]
+
+    def mark_many_as_processed(self, pares):
+        if self.fail_marking:
+            raise RuntimeError("Airtable no responde")
+        for record_id, _ in pares:
+            self.pending.pop(record_id, None)
+            self.marked.append(record_id)
+        return []
+
+class _Journal:
+    """Bitácora en memoria con la misma interfaz que SyncJournal"""
+
+    def __init__(self):
+        self.runs = []
+        self.items = {}
+
+    def start_run(self, modo, iniciado_en, desde=None):
+        run_id = f"run-{len(self.runs) + 1}"
+        self.runs.append({'id': run_id, 'modo': modo, 'estado': 'en_curso', 'iniciado_en': iniciado_en, 'desde': desde})
+        self.items[run_id] = {}
+        return run_id
+
+    def finish_run(self, run_id, estado, resumen):
+        for run in self.runs:
+            if run['id'] == run_id:
+                run['estado'] = estado
+
+    def record(self, run_id, etapa, items):
+        for item in items:
+            self.items[run_id][item['airtable_id']] = {
+                'airtable_id': item['airtable_id'],
+                'etapa': etapa,
+                'empresa_id': item.get('empresa_id'),
+                'supabase_id': item.get('supabase_id')
+            }
+
+    def get_resumable_run(self):
+        runs = [run for run in self.runs if run['modo'] != 'webhook']
+        if not runs or runs[-1]['estado'] == 'completada':
+            return None
+        return dict(runs[-1])
+
+    def get_items(self, run_id):
+        return dict(self.items.get(run_id, {}))
+
+class _State:
+    def __init__(self):
+        self.data = {'airtable_watermark': {'since': WINDOW_START.isoformat()}}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+class _Mirror:
+    def mark_processed(self, record_ids):
+        pass
+
+def _service(airtable: _Airtable, journal: _Journal) -> SyncService:
+    """SyncService con dependencias falsas; registra los registros escritos"""
+    service = SyncService.__new__(SyncService)
+    service.airtable = airtable
+    service.airtable_mirror = _Mirror()
+    service.supabase = _Supabase()
+    service.state = _State()
+    service.journal = journal
+    service.classifier = DocumentClassifier()
+    service.written = []
+
+    def write_batch(batch):
+        service.written.extend(item['record']['id'] for item in batch)
+        return [
+            {'airtable_id': item['record']['id'], 'empresa_id': item['empresa_id'], 'supabase_id': f"sb-{item['record']['id']}"}
+            for item in batch
+        ], []
+
+    service._write_batch = write_batch
+    return service
+
+def test_resume_skips_written_and_acknowledged():
+    """Los escritos solo se marcan, los marcados se omiten y el resto se procesa"""
+    journal = _Journal()
+    run_id = journal.start_run('incremental', datetime(2024, 2, 1, tzinfo=timezone.utc), WINDOW_START)
+    journal.record(run_id, STAGE_ACKNOWLEDGED, [{'airtable_id': 'recA', 'empresa_id': 'emp-1', 'supabase_id': 'sb-recA'}])
+    journal.record(run_id, STAGE_WRITTEN, [{'airtable_id': 'recB', 'empresa_id': 'emp-1', 'supabase_id': 'sb-recB'}])
+    journal.record(run_id, STAGE_RESOLVED, [{'airtable_id': 'recC', 'empresa_id': 'emp-1'}])
+
+    # recA sigue apareciendo como pendiente para comprobar que se excluye
+    airtable = _Airtable(['recA', 'recB', 'recC', 'recD'])
+    service = _service(airtable, journal)
+    result = asyncio.run(service.sync_from_airtable(resume=True))
+
+    assert result['success'], result
+    assert result['details']['mode'] == 'resume'
+    assert sorted(service.written) == ['recC', 'recD']
+    assert airtable.marked[0] == 'recB'
+    assert sorted(airtable.marked) == ['recB', 'recC', 'recD']
+    assert result['details']['processed'] == 3
+    # Misma ventana que la ejecución interrumpida y ninguna ejecución nueva
+    assert airtable.windows == [WINDOW_START]
+    assert [run['id'] for run in journal.runs] == [run_id]
+    assert journal.runs[0]['estado'] == 'completada'
+    assert {record_id: item['etapa'] for record_id, item in journal.items[run_id].items()} == {
+        record_id: STAGE_ACKNOWLEDGED for record_id in ('recA', 'recB', 'recC', 'recD')
+    }
+    assert service.state.get('airtable_watermark')['since'] == datetime(2024, 2, 1, tzinfo=timezone.utc).isoformat()
+
+def test_interrupted_run_is_resumed_without_rewrites():
+    """Una ejecución que falla al marcar se reanuda sin volver a escribir"""
+    original = Config.SYNC_BATCH_SIZE
+    Config.SYNC_BATCH_SIZE = 2
+    try:
+        journal = _Journal()
+        airtable = _Airtable([f"rec{n}" for n in range(6)], fail_marking=True)
+        first = _service(airtable, journal)
+        result = asyncio.run(first.sync_from_airtable())
+        assert not result['success']
+        assert journal.runs[0]['estado'] == 'fallida'
+        written_before = {
+            record_id for record_id, item in journal.items['run-1'].items() if item['etapa'] == STAGE_WRITTEN
+        }
+        assert written_before and written_before <= set(first.written)
+
+        airtable.fail_marking = False
+        second = _service(airtable, journal)
+        result = asyncio.run(second.sync_from_airtable(resume=True))
+    finally:
+        Config.SYNC_BATCH_SIZE = original
+
+    assert result['success'], result
+    assert not written_before & set(second.written)
+    assert airtable.pending == {}
+    assert sorted(airtable.marked) == [f"rec{n}" for n in range(6)]
+    assert journal.runs[-1]['estado'] == 'completada' and len(journal.runs) == 1
+
+def test_resume_without_interrupted_run_is_incremental():
+    """Sin ejecución pendiente, resume hace una sincronización incremental normal"""
+    journal = _Journal()
+    airtable = _Airtable(['recA'])
+    service = _service(airtable, journal)
+    result = asyncio.run(service.sync_from_airtable(resume=True))
+
+    assert result['success'] and result['details']['mode'] == 'incremental'
+    assert service.written == ['recA']
+    assert len(journal.runs) == 1 and journal.runs[0]['estado'] == 'completada'
+
+if __name__ == "__main__":
+    for test in (
+        test_resume_skips_written_and_acknowledged,
+        test_interrupted_run_is_resumed_without_rewrites,
+        test_resume_without_interrupted_run_is_incremental
+    ):
+        test()
+        print(f"✅ {test.__name__}")
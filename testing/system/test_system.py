@@ -105,7 +105,7 @@ def test_user_validation():
         # Probar con chat_id de ejemplo
         test_chat_id = 123456789
         
-        validation = security.validate_user(test_chat_id)
+        validation = asyncio.run(security.validate_user(test_chat_id))
         if validation['valid']:
             print(f"✅ Usuario válido: {validation['user_data']['nombre']}")
             print(f"   Empresa: {validation['user_data']['empresa_nombre']}")
@@ -114,7 +114,7 @@ def test_user_validation():
         
         # Probar con chat_id inexistente
         invalid_chat_id = 999999999
-        validation = security.validate_user(invalid_chat_id)
+        validation = asyncio.run(security.validate_user(invalid_chat_id))
         if not validation['valid']:
             print(f"✅ Validación correcta para usuario inexistente")
         else: